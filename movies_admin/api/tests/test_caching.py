@@ -0,0 +1,44 @@
+import time
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from movies.catalog import CATALOG_CHANGED_AT_KEY
+from movies.models import Genre, Person
+
+
+class ConditionalRequestTests(TestCase):
+    """
+    Last-Modified and the ETag of /api/v1/movies/ move on every catalog
+    change, including deletes that leave max(updated_at) as it was.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.person = Person.objects.create(first_name='First', last_name='Person')
+        # Updated last, max(updated_at) stays as it is when the person goes.
+        Genre.objects.create(title='Drama')
+        # A change a minute ago: Last-Modified has a one second resolution.
+        cache.set(CATALOG_CHANGED_AT_KEY, time.time() - 60, None)
+
+    def get(self, **headers):
+        return self.client.get('/api/v1/movies/', **headers)
+
+    def test_not_modified(self):
+        response = self.get()
+        self.assertEqual(self.get(HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304)
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_modified_by_delete(self):
+        response = self.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.person.delete()
+        self.assertEqual(self.get(HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 200)
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+    def test_unknown_change_time(self):
+        cache.delete(CATALOG_CHANGED_AT_KEY)
+        response = self.get()
+        self.assertFalse(response.has_header('Last-Modified'))
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
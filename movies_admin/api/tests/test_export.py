@@ -0,0 +1,69 @@
+import json
+import tracemalloc
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+
+from api.v1.export import export_lines
+from movies.models import FilmWork, Genre
+from movies.rows import BATCH_SIZE
+
+
+def exported(output, rows):
+    """
+    (lines, peak traced memory) of exporting the first rows film works.
+    """
+    queryset = FilmWork.objects.order_by('updated_at', 'id')[:rows]
+    tracemalloc.start()
+    try:
+        lines = sum(chunk.count('\n') for chunk in export_lines(output, queryset))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return lines, peak
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Streams through a PostgreSQL server-side cursor')
+class ExportTests(TestCase):
+    """
+    /api/v1/movies/export/ streams in batches: peak memory does not grow
+    with the number of film works.
+    """
+    rows = 5 * BATCH_SIZE
+    # Allowed ratio of the peak for all rows to the peak for half of them.
+    max_growth = 1.3
+
+    @classmethod
+    def setUpTestData(cls):
+        genres = Genre.objects.bulk_create([Genre(title=f'genre {number}') for number in range(3)])
+        film_works = FilmWork.objects.bulk_create([
+            FilmWork(title=f'film {number}', description='description ' * 20, type=FilmWork.FilmWorkType.movie,
+                     age_qualification=FilmWork.AgeQualification.A, file_path=f'{number}.mp4')
+            for number in range(cls.rows)
+        ])
+        FilmWork.genres.through.objects.bulk_create([
+            FilmWork.genres.through(filmwork_id=film_work.pk, genre_id=genre.pk)
+            for film_work in film_works for genre in genres
+        ])
+
+    def assertBoundedMemory(self, output, header_lines):
+        half_lines, half_peak = exported(output, self.rows // 2)
+        lines, peak = exported(output, self.rows)
+        self.assertEqual(half_lines, self.rows // 2 + header_lines)
+        self.assertEqual(lines, self.rows + header_lines)
+        self.assertLessEqual(peak, half_peak * self.max_growth,
+                             f'Peak memory grew {round(peak / half_peak, 2)}x for 2x the rows')
+
+    def test_ndjson_memory(self):
+        self.assertBoundedMemory('ndjson', header_lines=0)
+
+    def test_csv_memory(self):
+        self.assertBoundedMemory('csv', header_lines=1)
+
+    def test_response(self):
+        response = self.client.get('/api/v1/movies/export/')
+        self.assertEqual(response.status_code, 200)
+        documents = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(len(documents), self.rows)
+        self.assertEqual(len(documents[0]['genres']), 3)
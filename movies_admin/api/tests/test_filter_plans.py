@@ -0,0 +1,49 @@
+import uuid
+
+from api.v1.filters import MovieFilter, search_query
+from movies.models import FilmWork, Genre
+from movies.tests.test_query_plans import QueryPlanTestCase
+
+
+def filtered(**params):
+    return MovieFilter(params, queryset=FilmWork.objects.all()).qs
+
+
+class FilterPlanTests(QueryPlanTestCase):
+    """
+    Each /api/v1/movies/ filter is served by an index. The person filters
+    become semi-joins over the cast table.
+    """
+
+    def test_type(self):
+        self.assertUsesIndex(filtered(type='Movie'), 'film_work_type_rating_idx')
+
+    def test_genre_id(self):
+        self.assertUsesIndex(filtered(genre=str(uuid.uuid4())), 'movies_filmwork_genres_genre_id')
+
+    def test_genre_title_lookup(self):
+        # The genre filter resolves titles through movies.reference first.
+        self.assertUsesIndex(Genre.objects.filter(title__in=['drama']).values_list('pk', 'title'),
+                             'movies_genre_title')
+
+    def test_person(self):
+        self.assertUsesIndex(filtered(person=str(uuid.uuid4())), 'film_work_person_role_idx')
+
+    def test_person_and_role(self):
+        self.assertUsesIndex(filtered(person=str(uuid.uuid4()), role='actor'), 'film_work_person_role_idx')
+
+    def test_rating(self):
+        # PostgreSQL 18 may skip scan the (type, rating) index instead.
+        self.assertUsesIndex(filtered(rating_min='7', rating_max='8'),
+                             'film_work_rating_id_idx', 'film_work_type_rating_idx')
+
+    def test_creation_date(self):
+        self.assertUsesIndex(filtered(creation_date_after='1990-01-01', creation_date_before='1999-12-31'),
+                             'film_work_creation_id_idx')
+
+    def test_age_qualification(self):
+        self.assertUsesIndex(filtered(age_qualification='12'), 'film_work_age_id_idx')
+
+    def test_full_text_search(self):
+        self.assertUsesIndex(FilmWork.objects.filter(search_vector=search_query('star wars')),
+                             'film_work_search_vector_idx')
@@ -0,0 +1,100 @@
+import logging
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TransactionTestCase
+
+from movies.catalog import bump_catalog_version
+from movies.models import ChangeEvent, FilmWork, Genre, Person
+from utils.instrumentation import measured
+
+API_PATHS = [
+    '/api/v1/movies/?page=1',
+    '/api/v1/movies/?page=2&sort=-rating',
+    '/api/v1/movies/?type=Movie&rating_min=5',
+    '/api/v1/movies/?query=star',
+    '/api/v1/movies/?pagination=cursor',
+    '/api/v1/movies/{film_work}/',
+    '/api/v1/persons/',
+    '/api/v1/persons/{person}/',
+    '/api/v1/genres/',
+    '/api/v1/genres/{genre}/',
+    '/api/v1/changes/?after={change}',
+    '/api/v1/health/',
+]
+ADMIN_PATHS = [
+    '/api/v1/db-pool/',
+    '/admin/movies/filmwork/',
+    '/admin/movies/filmwork/?q=star',
+    '/admin/movies/filmwork/{film_work}/change/',
+    '/admin/movies/person/',
+    '/admin/movies/person/{person}/change/',
+    '/admin/movies/genre/',
+    '/admin/movies/genre/{genre}/change/',
+]
+
+
+def create_catalog(film_works=60):
+    genres = Genre.objects.bulk_create([Genre(title=f'genre {number}') for number in range(3)])
+    persons = Person.objects.bulk_create([
+        Person(first_name=f'first {number}', last_name=f'last {number}') for number in range(6)
+    ])
+    for number in range(film_works):
+        film_work = FilmWork.objects.create(
+            title=f'Star {number}' if number % 2 else f'Film {number}', description='description',
+            type=FilmWork.FilmWorkType.movie if number % 3 else FilmWork.FilmWorkType.serial,
+            rating=number % 10, age_qualification=FilmWork.AgeQualification.C, file_path=f'{number}.mp4',
+        )
+        film_work.genres.set(genres[number % 3:])
+        film_work.directors.set(persons[:1])
+        film_work.actors.set(persons[1 + number % 3:])
+        film_work.writers.set(persons[5:])
+    return genres, persons
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Budgets are PostgreSQL query counts')
+class QueryBudgetTests(TransactionTestCase):
+    """
+    Every API and admin endpoint declares a query budget on its view and
+    stays within it. Requests run outside a test transaction, like they are
+    served: in one the atomic blocks of the views add savepoint queries.
+    """
+    serialized_rollback = True
+
+    def setUp(self):
+        genres, persons = create_catalog()
+        self.ids = {
+            'film_work': FilmWork.objects.first().pk,
+            'person': persons[0].pk,
+            'genre': genres[0].pk,
+            'change': ChangeEvent.objects.order_by('id').values_list('id', flat=True).first(),
+        }
+        self.user = get_user_model().objects.create_superuser('budget', password=None)
+        # Over budget requests fail the test, they need no log line too.
+        logger = logging.getLogger('utils.instrumentation')
+        level = logger.level
+        logger.setLevel(logging.ERROR)
+        self.addCleanup(logger.setLevel, level)
+
+    def assertWithinBudget(self, path):
+        # Budgets are for a warm server: the first request fills the
+        # per-process reference caches. A new catalog version keeps cached
+        # responses from hiding the queries of the second.
+        for _ in range(2):
+            bump_catalog_version()
+            metrics = measured(self.client, path)
+        self.assertEqual(metrics.status, 200)
+        self.assertIsNotNone(metrics.budget, f'{metrics.endpoint} declares no query budget')
+        self.assertLessEqual(metrics.queries, metrics.budget, metrics.endpoint)
+
+    def test_api(self):
+        for path in API_PATHS:
+            with self.subTest(path=path):
+                self.assertWithinBudget(path.format(**self.ids))
+
+    def test_admin(self):
+        self.client.force_login(self.user)
+        for path in ADMIN_PATHS:
+            with self.subTest(path=path):
+                self.assertWithinBudget(path.format(**self.ids))
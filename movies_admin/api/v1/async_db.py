@@ -0,0 +1,84 @@
+import asyncio
+import json
+import re
+from contextlib import asynccontextmanager
+
+import asyncpg
+from django.conf import settings
+from django.db import connections
+
+PLACEHOLDER = re.compile(r'%([s%])')
+
+_pools = {}
+
+
+def to_asyncpg_sql(sql):
+    # Django compiles to psycopg2 style %s placeholders, asyncpg takes $1, $2...
+    numbers = iter(range(1, sql.count('%s') + 1))
+    return PLACEHOLDER.sub(lambda match: f'${next(numbers)}' if match.group(1) == 's' else '%', sql)
+
+
+def connect_kwargs(using):
+    database = settings.DATABASES[using]
+    return {
+        'database': database['NAME'],
+        'user': database['USER'] or None,
+        'password': database['PASSWORD'] or None,
+        'host': database['HOST'] or None,
+        'port': database['PORT'] or None,
+    }
+
+
+async def init_connection(connection):
+    # Decode json like psycopg2 does, so rows look the same on both paths.
+    await connection.set_type_codec('json', encoder=json.dumps, decoder=json.loads, schema='pg_catalog')
+
+
+async def get_pool(using):
+    loop = asyncio.get_running_loop()
+    key = (using, loop)
+    if key not in _pools:
+        _pools[key] = asyncio.ensure_future(asyncpg.create_pool(
+            min_size=settings.ASYNC_DB_POOL_MIN_SIZE,
+            max_size=settings.ASYNC_DB_POOL_MAX_SIZE,
+            init=init_connection,
+            **connect_kwargs(using)
+        ))
+    try:
+        return await _pools[key]
+    except Exception:
+        # Let the next request try again rather than keep the error.
+        _pools.pop(key, None)
+        raise
+
+
+@asynccontextmanager
+async def acquire(using='default', pooled=True):
+    """
+    Connection from the asyncpg pool of the running event loop.
+
+    The pool lives as long as the loop, which under an ASGI server is the
+    life of the worker. Outside of one, e.g. an async view served by WSGI
+    through async_to_sync, every request gets a new loop, so pooled=False
+    opens a connection for the block only.
+    """
+    if pooled:
+        pool = await get_pool(using)
+        async with pool.acquire() as connection:
+            yield connection
+        return
+    connection = await asyncpg.connect(**connect_kwargs(using))
+    try:
+        await init_connection(connection)
+        yield connection
+    finally:
+        await connection.close()
+
+
+def is_postgresql(using='default'):
+    return connections[using].vendor == 'postgresql'
+
+
+async def fetch(sql, params, using='default', pooled=True):
+    async with acquire(using, pooled) as connection:
+        return await connection.fetch(to_asyncpg_sql(sql), *params)
@@ -0,0 +1,145 @@
+import asyncio
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.core.paginator import InvalidPage, Page, Paginator
+from django.http import HttpResponse, HttpResponseNotAllowed
+from rest_framework.request import Request
+
+from api.v1.async_db import fetch, is_postgresql
+from api.v1.filters import MovieFilter, MovieSearchFilter
+from api.v1.pagination import MoviePagination
+from api.v1.renderers import ORJSONRenderer
+from api.v1.serializer import MovieSerializer
+from movies.models import FilmWork
+from movies.rows import (AGGREGATES, MOVIE_FIELDS, RELATIONS, aggregate_values, apply_genre_titles, genre_ids,
+                         grouped_relation_sql, movie_rows)
+from movies.reference import genre_cache
+
+renderer = ORJSONRenderer()
+
+
+def json_response(data, status=200):
+    return HttpResponse(renderer.render(data), content_type='application/json', status=status)
+
+
+def is_asgi(request):
+    # Only ASGI requests run in a loop that outlives them, see async_db.acquire.
+    return hasattr(request, 'scope')
+
+
+async def fetch_count(queryset, pooled):
+    if not is_postgresql(queryset.db):
+        return await sync_to_async(queryset.count)()
+    sql, params = queryset.order_by().values('id').query.sql_with_params()
+    records = await fetch(f'SELECT COUNT(*) FROM ({sql}) subquery', params, queryset.db, pooled)
+    return records[0][0]
+
+
+async def fetch_rows(queryset, pooled):
+    """
+    The rows of movie_rows, read in one query for the film works and then
+    one concurrent query per aggregated column.
+    """
+    if not is_postgresql(queryset.db):
+        return await sync_to_async(lambda: list(movie_rows(queryset)))()
+
+    sql, params = queryset.values(*MOVIE_FIELDS).query.sql_with_params()
+    rows = [dict(record) for record in await fetch(sql, params, queryset.db, pooled)]
+    ids = [row['id'] for row in rows]
+    relations = {film_work_id: {relation: [] for relation in RELATIONS} for film_work_id in ids}
+    if ids:
+        results = await asyncio.gather(*(
+            fetch(grouped_relation_sql(aggregate), [ids], queryset.db, pooled) for aggregate in AGGREGATES
+        ))
+        for aggregate, records in zip(AGGREGATES, results):
+            for film_work_id, values in records:
+                relations[film_work_id].update(aggregate_values(aggregate, values))
+    for row in rows:
+        row.update(relations[row['id']])
+
+    # Only genres missing from the reference cache need the ORM.
+    titles, missing = genre_cache.lookup(genre_ids(rows))
+    if missing:
+        titles.update(await sync_to_async(genre_cache.titles)(missing, using=queryset.db))
+    apply_genre_titles(rows, titles)
+    return rows
+
+
+async def resolve_genre(params, using):
+    """
+    ?genre= with a title swapped for the genre id. MovieFilter resolves
+    titles through the reference cache, which may query the database and so
+    cannot run in the event loop. An unknown title becomes the nil UUID,
+    which matches no film work.
+    """
+    value = params.get('genre')
+    if not value:
+        return params
+    try:
+        uuid.UUID(value)
+    except ValueError:
+        genre_id = await sync_to_async(genre_cache.id_for)(value, using=using)
+        params = params.copy()
+        params['genre'] = str(genre_id or uuid.UUID(int=0))
+    return params
+
+
+async def movie_list(request):
+    """
+    Async GET /api/v1/async/movies/, the page pagination of MovieViewSet.list
+    with the same filters and response. The count and the page are read at
+    the same time.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    request = Request(request)
+    pooled = is_asgi(request._request)
+
+    # With genre titles resolved, building the queryset does no I/O, so the
+    # filters are shared as they are.
+    queryset = FilmWork.objects.all()
+    params = await resolve_genre(request.query_params, queryset.db)
+    filterset = MovieFilter(params, queryset=queryset, request=request)
+    if not filterset.is_valid():
+        return json_response({field: list(errors) for field, errors in filterset.errors.items()}, status=400)
+    queryset = MovieSearchFilter().filter_queryset(request, filterset.qs, None)
+
+    pagination = MoviePagination()
+    pagination.request = request
+    per_page = pagination.get_page_size(request)
+    paginator = Paginator([], per_page)
+    number = request.query_params.get(pagination.page_query_param, 1)
+
+    def page_rows(number):
+        offset = max(number - 1, 0) * per_page
+        return fetch_rows(queryset[offset:offset + per_page], pooled)
+
+    try:
+        if number in pagination.last_page_strings:
+            paginator.count = await fetch_count(queryset, pooled)
+            number = paginator.num_pages
+            rows = await page_rows(number)
+        else:
+            number = int(number)
+            paginator.count, rows = await asyncio.gather(fetch_count(queryset, pooled), page_rows(number))
+        number = paginator.validate_number(number)
+    except (InvalidPage, ValueError):
+        return json_response({'detail': 'Invalid page.'}, status=404)
+
+    pagination.page = Page(rows, number, paginator)
+    serializer = MovieSerializer()
+    data = pagination.get_paginated_response([serializer.to_representation(row) for row in rows]).data
+    return json_response(data)
+
+
+async def movie_detail(request, pk):
+    """
+    Async GET /api/v1/async/movies/<id>/, like MovieViewSet.retrieve.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    rows = await fetch_rows(FilmWork.objects.filter(id=pk), is_asgi(request))
+    if not rows:
+        return json_response({'detail': 'Not found.'}, status=404)
+    return json_response(MovieSerializer().to_representation(rows[0]))
@@ -0,0 +1,187 @@
+import uuid
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.serializers import as_serializer_error
+
+from api.v1.serializer import MovieBulkItemSerializer
+from movies.catalog import schedule_bump
+from movies.changes import record_changes
+from movies.documents import schedule_refresh
+from movies.models import ChangeEvent, FilmWork, FilmWorkPerson, Genre, Person
+from movies.rows import PERSON_RELATIONS, RELATIONS
+
+FILM_WORK_COLUMNS = ('id', 'title', 'description', 'creation_date', 'rating', 'type',
+                     'age_qualification', 'file_path', 'created_at', 'updated_at')
+# Columns left alone when an existing film work is updated.
+INSERT_ONLY_COLUMNS = ('id', 'created_at')
+RELATED_MODELS = {
+    'genres': Genre,
+    'actors': Person,
+    'directors': Person,
+    'writers': Person,
+}
+
+
+def chunks(values, size):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def existing_ids(model, ids, using):
+    # One id__in query per model, split only where the database limits the
+    # number of query parameters (SQLite).
+    size = connections[using].features.max_query_params or len(ids) or 1
+    found = set()
+    for chunk in chunks(ids, size):
+        found.update(model._default_manager.using(using).filter(pk__in=chunk).values_list('pk', flat=True))
+    return found
+
+
+def upsert(model, columns, rows, using):
+    """
+    INSERT ... ON CONFLICT (pk) DO UPDATE, which QuerySet.bulk_create only
+    learns in Django 4.1. Works on PostgreSQL and SQLite 3.24+.
+    """
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    fields = [model._meta.get_field(column) for column in columns]
+    update = ', '.join(
+        f'{quote(field.column)} = EXCLUDED.{quote(field.column)}'
+        for field in fields if field.name not in INSERT_ONLY_COLUMNS
+    )
+    row_sql = '({})'.format(', '.join(['%s'] * len(fields)))
+    batch_size = connection.ops.bulk_batch_size(fields, rows) or len(rows)
+    with connection.cursor() as cursor:
+        for batch in chunks(rows, batch_size):
+            params = [field.get_db_prep_save(value, connection)
+                      for row in batch for field, value in zip(fields, row)]
+            cursor.execute(
+                f'INSERT INTO {quote(model._meta.db_table)} ({", ".join(quote(field.column) for field in fields)}) '
+                f'VALUES {", ".join([row_sql] * len(batch))} '
+                f'ON CONFLICT ({quote(model._meta.pk.column)}) DO UPDATE SET {update}',
+                params
+            )
+
+
+def defer_search_vectors(using, defer):
+    # Local to the transaction, and undone with it on rollback.
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT set_config('movies.defer_search_vector', %s, true)", ['on' if defer else 'off'])
+
+
+def validate_items(data, using):
+    if not isinstance(data, list):
+        raise ValidationError({'non_field_errors': ['Expected a list of film works.']})
+    if len(data) > settings.MOVIES_BULK_MAX_ITEMS:
+        raise ValidationError({'non_field_errors': [
+            f'Ensure this list has no more than {settings.MOVIES_BULK_MAX_ITEMS} film works.']})
+
+    # One serializer for the whole batch, like ListSerializer does: building
+    # the fields of a ModelSerializer costs more than validating an item.
+    serializer = MovieBulkItemSerializer()
+    items, errors = [], []
+    seen = set()
+    for item in data:
+        try:
+            attrs = dict(serializer.run_validation(item))
+        except ValidationError as exc:
+            items.append(None)
+            errors.append(as_serializer_error(exc))
+            continue
+        attrs.setdefault('id', uuid.uuid4())
+        for relation in RELATIONS:
+            attrs[relation] = list(dict.fromkeys(attrs[relation]))
+        item_errors = {}
+        if attrs['id'] in seen:
+            item_errors['id'] = ['Duplicate id in this batch.']
+        seen.add(attrs['id'])
+        items.append(attrs)
+        errors.append(item_errors)
+
+    requested = {}
+    for attrs in filter(None, items):
+        for relation in RELATIONS:
+            requested.setdefault(RELATED_MODELS[relation], set()).update(attrs[relation])
+    found = {model: existing_ids(model, ids, using) for model, ids in requested.items()}
+    for attrs, item_errors in zip(items, errors):
+        if attrs is None:
+            continue
+        for relation in RELATIONS:
+            missing = [pk for pk in attrs[relation] if pk not in found[RELATED_MODELS[relation]]]
+            if missing:
+                item_errors[relation] = [f'Invalid pk "{pk}" - object does not exist.' for pk in missing]
+
+    if any(errors):
+        raise ValidationError({'results': [
+            {'status': 'invalid', 'errors': item_errors} if item_errors else {'status': 'valid'}
+            for item_errors in errors
+        ]})
+    return items
+
+
+def save_items(items, using):
+    if not items:
+        return []
+    now = timezone.now()
+    ids = [attrs['id'] for attrs in items]
+    updated = existing_ids(FilmWork, ids, using)
+    rows = [(
+        attrs['id'], attrs.get('title', ''), attrs.get('description'), attrs.get('creation_date'),
+        attrs.get('rating'), attrs['type'], attrs['age_qualification'], attrs['file_path'], now, now,
+    ) for attrs in items]
+
+    with transaction.atomic(using=using):
+        # Relations are written first; the foreign keys are checked on commit.
+        # The upsert below sets every title, so on PostgreSQL its row trigger
+        # builds each search vector once with the new relations, and the
+        # through table triggers can skip their refresh (migrations 0008, 0009).
+        defer_search_vectors(using, True)
+        genres = FilmWork.genres.through._default_manager.using(using)
+        cast = FilmWorkPerson._default_manager.using(using)
+        if updated:
+            for chunk in chunks(updated, connections[using].features.max_query_params or len(updated)):
+                genres.filter(filmwork_id__in=chunk).delete()
+                cast.filter(film_work_id__in=chunk).delete()
+        genres.bulk_create([
+            genres.model(filmwork_id=attrs['id'], genre_id=pk) for attrs in items for pk in attrs['genres']
+        ])
+        cast.bulk_create([
+            FilmWorkPerson(film_work_id=attrs['id'], person_id=pk, role=getattr(FilmWork, relation).role)
+            for attrs in items for relation in PERSON_RELATIONS for pk in attrs[relation]
+        ])
+        defer_search_vectors(using, False)
+        upsert(FilmWork, FILM_WORK_COLUMNS, rows, using)
+        # Raw SQL and bulk_create send no signals.
+        schedule_refresh(set(ids), using)
+        schedule_bump()
+        record_changes([
+            ('filmwork', pk, ChangeEvent.Action.updated if pk in updated else ChangeEvent.Action.created, {pk})
+            for pk in ids
+        ], using)
+
+    return [{'id': str(pk), 'status': 'updated' if pk in updated else 'created'} for pk in ids]
+
+
+def bulk_upsert(data):
+    """
+    Creates or replaces film works given in the MovieSerializer layout, with
+    relations as lists of ids. The whole batch is validated first and saved
+    in one transaction, with one upsert for the film works and one delete
+    plus one insert each for genres and the cast. Relation order follows the
+    lists, and results follow the order of the batch.
+    """
+    using = router.db_for_write(FilmWork)
+    items = validate_items(data, using)
+    results = save_items(items, using)
+    return {
+        'created': sum(result['status'] == 'created' for result in results),
+        'updated': sum(result['status'] == 'updated' for result in results),
+        'results': results,
+    }
@@ -0,0 +1,70 @@
+import hashlib
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_cache_control
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from rest_framework.response import Response
+
+from movies.catalog import catalog_changed_at, catalog_version
+
+
+def normalized_params(request):
+    # Parameter order and empty values do not change the response.
+    params = request.GET
+    return sorted((key, value) for key in params for value in params.getlist(key) if value != '')
+
+
+def response_key(request, version):
+    # Paginated responses carry absolute next/previous links, so the host is
+    # part of the key.
+    url = request.build_absolute_uri(request.path)
+    digest = hashlib.md5(f'{url}?{normalized_params(request)}'.encode()).hexdigest()
+    return f'movies:response:{version}:{digest}'
+
+
+def catalog_etag(request, *args, **kwargs):
+    return hashlib.md5(response_key(request, catalog_version()).encode()).hexdigest()
+
+
+def last_modified(request, *args, **kwargs):
+    # The time of the last catalog change, which unlike max(updated_at) also
+    # moves on deletes. None once the cache lost it: the ETag still works.
+    changed_at = catalog_changed_at()
+    return datetime.fromtimestamp(changed_at, tz=timezone.utc) if changed_at else None
+
+
+conditional = method_decorator(condition(etag_func=catalog_etag, last_modified_func=last_modified))
+
+
+class CatalogCacheMixin:
+    """
+    Caches list and retrieve responses until the catalog version changes.
+
+    Conditional requests are answered with 304 before the view runs. The
+    ETag includes the catalog version and Last-Modified is the time of its
+    last change, so both move on every change, deletes included.
+    """
+
+    @conditional
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    @conditional
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        key = response_key(request, catalog_version())
+        data = cache.get(key)
+        if data is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, response.data, settings.MOVIES_CACHE_TIMEOUT)
+        else:
+            response = Response(data)
+        # Clients keep the response but must revalidate it on every use.
+        patch_cache_control(response, no_cache=True)
+        return response
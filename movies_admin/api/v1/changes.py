@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.db.models import Max
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import IntegerField
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from movies.models import ChangeEvent
+
+EVENT_FIELDS = ('id', 'model', 'object_id', 'action', 'film_work_ids', 'created_at')
+
+
+def integer_param(params, name, default, **limits):
+    if not params.get(name):
+        return default
+    try:
+        return IntegerField(**limits).run_validation(params[name])
+    except ValidationError as exc:
+        raise ValidationError({name: exc.detail})
+
+
+def change_feed_response(request):
+    """
+    The events of the change log after ?after=, oldest first, at most
+    ?limit= of them, with the film works they affect.
+
+    Consumers keep last_id and pass it as ?after= on their next call.
+    Reading a part of the log that compact_changes deleted answers 410:
+    sync the whole catalog (GET /api/v1/movies/export/), then resume from the
+    last_id of that answer.
+    """
+    params = request.query_params
+    after = integer_param(params, 'after', 0, min_value=0)
+    limit = integer_param(params, 'limit', settings.CHANGE_FEED_PAGE_SIZE,
+                          min_value=1, max_value=settings.CHANGE_FEED_PAGE_SIZE)
+
+    oldest = ChangeEvent.objects.order_by('id').values('id', 'action').first()
+    if oldest is not None and oldest['action'] == ChangeEvent.Action.compacted and after < oldest['id']:
+        last_id = ChangeEvent.objects.aggregate(last_id=Max('id'))['last_id']
+        return Response({
+            'detail': f'Events up to {oldest["id"]} were compacted, sync the catalog and resume from last_id.',
+            'last_id': last_id,
+        }, status=410)
+
+    events = list(ChangeEvent.objects.filter(id__gt=after).order_by('id').values(*EVENT_FIELDS)[:limit + 1])
+    has_more = len(events) > limit
+    events = events[:limit]
+    last_id = events[-1]['id'] if events else after
+    film_work_ids = sorted({pk for event in events for pk in event['film_work_ids']})
+    return Response({
+        'events': [event for event in events if event['action'] != ChangeEvent.Action.compacted],
+        'film_work_ids': film_work_ids,
+        'last_id': last_id,
+        'has_more': has_more,
+        'next': replace_query_param(request.build_absolute_uri(), 'after', last_id),
+    })
@@ -0,0 +1,109 @@
+import uuid
+
+import django_filters
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import Exists, F, FloatField, OuterRef, Q
+from django.db.models.functions import Cast
+from rest_framework.filters import SearchFilter
+
+from movies.models import FilmWork, Role
+from movies.reference import genre_cache
+
+SEARCH_CONFIGS = ('russian', 'english')
+PERSON_ROLES = {
+    'actor': Role.PersonRole.actor,
+    'writer': Role.PersonRole.writer,
+    'director': Role.PersonRole.director,
+}
+SORT_FIELDS = ('rating', 'creation_date', 'title')
+
+
+def search_query(text):
+    query = None
+    for config in SEARCH_CONFIGS:
+        part = SearchQuery(text, config=config, search_type='plain')
+        query = part if query is None else query | part
+    return query
+
+
+class MovieSearchFilter(SearchFilter):
+    """
+    ?query= full text search over FilmWork.search_vector, best match first.
+
+    The rank is cast to double precision so it survives the round trip
+    through a keyset cursor unchanged. Databases other than PostgreSQL fall
+    back to icontains on title and description.
+    """
+    search_param = 'query'
+    search_title = 'Query'
+    search_description = 'Full text search over titles, descriptions, genres and persons.'
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '').strip()
+        if not text:
+            return queryset
+        if connection.vendor != 'postgresql':
+            return queryset.filter(Q(title__icontains=text) | Q(description__icontains=text))
+        query = search_query(text)
+        queryset = queryset.filter(search_vector=query).annotate(
+            rank=Cast(SearchRank(F('search_vector'), query), FloatField())
+        )
+        # An explicit ?sort= wins over relevance.
+        if queryset.query.order_by:
+            return queryset
+        return queryset.order_by('-rank', 'id')
+
+
+def related_exists(field_name, **lookups):
+    # A semi-join on the through table: unlike a JOIN it never repeats a
+    # film work, so counts and pages stay correct without DISTINCT.
+    field = FilmWork._meta.get_field(field_name)
+    through = field.remote_field.through
+    return Exists(through.objects.filter(**{field.m2m_field_name(): OuterRef('id')}, **lookups))
+
+
+class MovieOrderingFilter(django_filters.OrderingFilter):
+    def filter(self, qs, value):
+        qs = super().filter(qs, value)
+        if value:
+            # id breaks ties so page and cursor pagination stay stable.
+            qs = qs.order_by(*qs.query.order_by, 'id')
+        return qs
+
+
+class MovieFilter(django_filters.FilterSet):
+    type = django_filters.ChoiceFilter(choices=FilmWork.FilmWorkType.choices)
+    genre = django_filters.CharFilter(method='filter_genre', help_text='Genre id or title')
+    person = django_filters.UUIDFilter(method='filter_person', help_text='Person id')
+    role = django_filters.ChoiceFilter(choices=[(role, role) for role in PERSON_ROLES], method='filter_role',
+                                       help_text='Role of person, any role by default')
+    rating = django_filters.RangeFilter()
+    creation_date = django_filters.DateFromToRangeFilter()
+    age_qualification = django_filters.ChoiceFilter(choices=FilmWork.AgeQualification.choices)
+    sort = MovieOrderingFilter(fields=SORT_FIELDS)
+
+    class Meta:
+        model = FilmWork
+        fields = ['type', 'genre', 'person', 'role', 'rating', 'creation_date', 'age_qualification']
+
+    def filter_genre(self, queryset, name, value):
+        try:
+            genre_id = uuid.UUID(value)
+        except ValueError:
+            # Titles are resolved by the reference cache, so the through
+            # table is probed by genre id either way.
+            genre_id = genre_cache.id_for(value, using=queryset.db)
+            if genre_id is None:
+                return queryset.none()
+        return queryset.filter(related_exists('genres', genre_id=genre_id))
+
+    def filter_person(self, queryset, name, value):
+        # One probe of the (person, role, film work) index of the cast.
+        role = self.form.cleaned_data.get('role')
+        lookups = {'role': PERSON_ROLES[role]} if role else {}
+        return queryset.filter(related_exists('persons', person_id=value, **lookups))
+
+    def filter_role(self, queryset, name, value):
+        # Only narrows ?person=, see filter_person.
+        return queryset
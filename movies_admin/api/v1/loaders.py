@@ -0,0 +1,55 @@
+from movies.rows import load_relations
+
+
+class RelationLoader:
+    """
+    Genre titles and person names of the film works serialized while
+    serving one request.
+
+    Film works are queued with prime(); the first get() of a film work that
+    is not loaded yet loads every queued one in a single load_relations
+    call, so a list costs the same queries as one film work, whatever the
+    queryset was prefetched with. Loaded relations are kept until the
+    request ends.
+    """
+
+    def __init__(self):
+        self._queued = {}
+        self._loaded = {}
+
+    def prime(self, film_works):
+        for film_work in film_works:
+            using = film_work._state.db or 'default'
+            if (using, film_work.pk) not in self._loaded:
+                self._queued.setdefault(using, set()).add(film_work.pk)
+
+    def get(self, film_work):
+        using = film_work._state.db or 'default'
+        key = (using, film_work.pk)
+        if key not in self._loaded:
+            self.prime([film_work])
+            self._load(using)
+        return {relation: list(values) for relation, values in self._loaded[key].items()}
+
+    def _load(self, using):
+        film_work_ids = self._queued.pop(using, set())
+        for film_work_id, relations in load_relations(list(film_work_ids), using).items():
+            self._loaded[using, film_work_id] = relations
+
+
+def relation_loader(context):
+    """
+    The RelationLoader of the request in a serializer context. Serializers
+    used without a request, e.g. in management commands, share one loader
+    per context.
+    """
+    request = context.get('request')
+    # The Django request, so DRF requests wrapping it share its loader.
+    holder = getattr(request, '_request', request)
+    if holder is None:
+        if 'relation_loader' not in context:
+            context['relation_loader'] = RelationLoader()
+        return context['relation_loader']
+    if not hasattr(holder, 'relation_loader'):
+        holder.relation_loader = RelationLoader()
+    return holder.relation_loader
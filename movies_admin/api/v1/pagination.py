@@ -1,7 +1,14 @@
-from collections import OrderedDict
+import json
+import math
+from base64 import urlsafe_b64decode, urlsafe_b64encode
 
-from rest_framework.pagination import PageNumberPagination
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from utils.counting import estimate_count
 
 
 class MoviePagination(PageNumberPagination):
@@ -20,16 +27,196 @@ class MoviePagination(PageNumberPagination):
     def get_paginated_response(self, data):
         meta = self.get_page_metadata()
         if isinstance(data, list):
-            data = OrderedDict([
-                ('count', self.page.paginator.count),
-                ('next', self.get_next_link()),
-                ('previous', self.get_previous_link()),
-                ('results', data),
-                ('meta', meta)
-            ])
+            data = {
+                'count': self.page.paginator.count,
+                'next': self.get_next_link(),
+                'previous': self.get_previous_link(),
+                'results': data,
+                'meta': meta
+            }
         else:
             if 'meta' in data:
                 data['meta'].update(meta)
             else:
                 data['meta'] = meta
         return Response(data)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset pagination over (ordering..., id), by id unless the queryset is
+    ordered.
+
+    Pages are selected with a WHERE on the last seen key instead of OFFSET, so
+    deep pages cost the same as the first one, and total_results comes from
+    utils.counting.estimate_count unless the client passes exact_count=1.
+    """
+    page_size = 50
+    page_size_query_param = 'per_page'
+    max_page_size = 50
+    cursor_query_param = 'cursor'
+    exact_count_query_param = 'exact_count'
+    default_ordering = ('id',)
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.per_page = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+        self.fields = [self._get_field(queryset, name) for name in self.ordering]
+        self.queryset = queryset
+
+        cursor = self.decode_cursor(request)
+        if cursor is None:
+            position, reverse, self.page_number = None, False, 1
+        else:
+            position, reverse, self.page_number = cursor
+
+        queryset = queryset.order_by(*self._order_expressions(reverse))
+        if position is not None:
+            queryset = queryset.filter(self._keyset_filter(position, reverse))
+
+        results = list(queryset[:self.per_page + 1])
+        has_more = len(results) > self.per_page
+        results = results[:self.per_page]
+        if reverse:
+            results.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        self.page = results
+        return results
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_ordering(self, queryset):
+        ordering = [field for field in queryset.query.order_by if isinstance(field, str)]
+        if not ordering:
+            return self.default_ordering
+        if not any(field.lstrip('-') in ('id', 'pk') for field in ordering):
+            ordering.append('id')
+        return tuple('id' if field == 'pk' else field for field in ordering)
+
+    def get_total_results(self):
+        exact = self.request.query_params.get(self.exact_count_query_param) in ('1', 'true')
+        return estimate_count(self.queryset.order_by(), exact=exact)
+
+    def get_page_metadata(self):
+        total_results = self.get_total_results()
+        return {
+            'total_results': total_results,
+            'total_pages': math.ceil(total_results / self.per_page),
+            'page': self.page_number,
+            'per_page': self.per_page
+        }
+
+    def get_paginated_response(self, data):
+        meta = self.get_page_metadata()
+        return Response({
+            'count': meta['total_results'],
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+            'meta': meta
+        })
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self._position(self.page[-1]), False, self.page_number + 1)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.page_number == 2:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        if not self.page:
+            return None
+        return self.encode_cursor(self._position(self.page[0]), True, self.page_number - 1)
+
+    def encode_cursor(self, position, reverse, page_number):
+        payload = json.dumps({
+            'k': [None if value is None else str(value) for value in position],
+            'r': int(reverse),
+            'p': page_number,
+        }, separators=(',', ':'))
+        cursor = urlsafe_b64encode(payload.encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded.encode()).decode())
+            values = payload['k']
+            if len(values) != len(self.fields):
+                raise ValueError
+            position = [None if value is None else field.to_python(value)
+                        for field, value in zip(self.fields, values)]
+            return position, bool(payload['r']), max(int(payload['p']), 1)
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_schema_operation_parameters(self, view):
+        return []
+
+    def _get_field(self, queryset, name):
+        name = name.lstrip('-')
+        if name in queryset.query.annotations:
+            return queryset.query.annotations[name].output_field
+        return queryset.model._meta.get_field(name)
+
+    def _position(self, item):
+        names = [name.lstrip('-') for name in self.ordering]
+        if isinstance(item, dict):
+            return [item[name] for name in names]
+        return [getattr(item, name) for name in names]
+
+    def _order_expressions(self, reverse):
+        # Nulls always sort after values when walking forward, so the keyset
+        # conditions below hold for nullable sort keys too.
+        expressions = []
+        for name, model_field in zip(self.ordering, self.fields):
+            expression = F(name.lstrip('-'))
+            descending = name.startswith('-') != reverse
+            nulls = {'nulls_first': True} if reverse else {'nulls_last': True}
+            if not model_field.null:
+                nulls = {}
+            expressions.append(expression.desc(**nulls) if descending else expression.asc(**nulls))
+        return expressions
+
+    def _keyset_filter(self, position, reverse):
+        # (a, b, id) > (x, y, z) expanded into
+        # a > x OR (a = x AND b > y) OR (a = x AND b = y AND id > z)
+        condition = Q()
+        equal = Q()
+        for name, model_field, value in zip(self.ordering, self.fields, position):
+            field = name.lstrip('-')
+            lookup = 'lt' if name.startswith('-') != reverse else 'gt'
+            if value is None:
+                strict = Q(**{f'{field}__isnull': False}) if reverse else None
+                same = Q(**{f'{field}__isnull': True})
+            else:
+                strict = Q(**{f'{field}__{lookup}': value})
+                if model_field.null and not reverse:
+                    strict |= Q(**{f'{field}__isnull': True})
+                same = Q(**{field: value})
+            if strict is not None:
+                condition |= equal & strict
+            equal &= same
+        return condition
+
+
+class MovieCursorPagination(KeysetPagination):
+    default_ordering = ('created_at', 'id')
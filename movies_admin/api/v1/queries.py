@@ -0,0 +1,114 @@
+from django.db import connections
+from django.db.models.query import ValuesIterable
+
+from movies.catalog import catalog_version, genre_film_counts
+from movies.models import FilmWorkPerson, Person, Role
+from movies.reference import role_cache
+from movies.rows import aggregated_rows
+
+PERSON_FIELDS = ('id', 'first_name', 'last_name')
+# Film works of a person are grouped by role: {'actor': [...], ...}.
+ROLE_KEYS = {role.value: role.name for role in Role.PersonRole}
+
+
+def resolve_role_titles(rows, using='default'):
+    titles = role_cache.titles({role_id for row in rows for role_id in row['roles']}, using=using)
+    for row in rows:
+        row['roles'] = [titles[role_id] for role_id in row['roles'] if role_id in titles]
+
+
+def credit_values(values):
+    film_works = {key: [] for key in ROLE_KEYS.values()}
+    for role, film_work_id in values or []:
+        film_works[ROLE_KEYS[role]].append(str(film_work_id))
+    return film_works
+
+
+def _person_subqueries(film_works):
+    roles = Person.roles.through._meta
+    person, role = roles.get_field('person'), roles.get_field('role')
+    subqueries = [
+        f'(SELECT ARRAY_AGG(t.{role.column} ORDER BY t.id) FROM {roles.db_table} t '
+        f'WHERE t.{person.column} = page.id)'
+    ]
+    if film_works:
+        cast = FilmWorkPerson._meta
+        columns = {name: cast.get_field(name).column for name in ('person', 'role', 'film_work')}
+        subqueries.append(
+            f'(SELECT JSON_AGG(JSON_BUILD_ARRAY(t.{columns["role"]}, t.{columns["film_work"]}) ORDER BY t.id) '
+            f'FROM {cast.db_table} t WHERE t.{columns["person"]} = page.id)'
+        )
+    return subqueries
+
+
+class PersonRowIterable(ValuesIterable):
+    film_works = False
+
+    def __iter__(self):
+        queryset = self.queryset
+        if connections[queryset.db].vendor == 'postgresql':
+            items = []
+            for item, values in aggregated_rows(queryset, _person_subqueries(self.film_works)):
+                item['roles'] = values[0] or []
+                if self.film_works:
+                    item['film_works'] = credit_values(values[1])
+                items.append(item)
+        else:
+            items = list(super().__iter__())
+            self._load_relations(items, queryset.db)
+        resolve_role_titles(items, queryset.db)
+        yield from items
+
+    def _load_relations(self, items, using):
+        by_id = {item['id']: item for item in items}
+        for item in items:
+            item['roles'] = []
+        roles = Person.roles.through.objects.using(using).filter(person_id__in=by_id).order_by('id')
+        for person_id, role_id in roles.values_list('person_id', 'role_id'):
+            by_id[person_id]['roles'].append(role_id)
+        if not self.film_works:
+            return
+        credits = {person_id: [] for person_id in by_id}
+        rows = FilmWorkPerson.objects.using(using).filter(person_id__in=by_id).order_by('id')
+        for person_id, role, film_work_id in rows.values_list('person_id', 'role', 'film_work_id'):
+            credits[person_id].append((role, film_work_id))
+        for person_id, values in credits.items():
+            by_id[person_id]['film_works'] = credit_values(values)
+
+
+class PersonFilmographyRowIterable(PersonRowIterable):
+    film_works = True
+
+
+def person_rows(queryset, film_works=False):
+    """
+    Turns a Person queryset into dict rows with the titles of Person.roles
+    and, with film_works, the ids of their film works grouped by role.
+
+    On PostgreSQL both are aggregate subqueries around the page, so a page
+    or a person is read in one query. Role titles come from the reference
+    cache.
+    """
+    rows = queryset.values(*PERSON_FIELDS)
+    rows._iterable_class = PersonFilmographyRowIterable if film_works else PersonRowIterable
+    return rows
+
+
+class GenreRowIterable(ValuesIterable):
+    def __iter__(self):
+        items = list(super().__iter__())
+        if items:
+            counts = genre_film_counts(catalog_version(), using=self.queryset.db)
+            for item in items:
+                item['film_count'] = counts.get(item['id'], 0)
+        yield from items
+
+
+def genre_rows(queryset):
+    """
+    Turns a Genre queryset into dict rows with the number of film works of
+    each genre, see movies.catalog.genre_film_counts.
+    """
+    rows = queryset.values('id', 'title', 'description')
+    rows._iterable_class = GenreRowIterable
+    return rows
@@ -0,0 +1,33 @@
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from utils.instrumentation import timed
+
+OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer on orjson, which writes dicts, lists, strings, numbers,
+    UUIDs, dates and datetimes itself. Anything else, such as Decimal or lazy
+    strings, goes through the DRF encoder, so the output is the same bytes
+    as the compact unicode output of JSONRenderer.
+
+    Requests for indented output (Accept: application/json; indent=4) are
+    left to JSONRenderer.
+    """
+    encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        with timed('render_json'):
+            ret = orjson.dumps(data, default=self.encoder.default, option=OPTIONS)
+        # Like JSONRenderer, keep the output valid inside a <script> tag.
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
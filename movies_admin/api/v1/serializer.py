@@ -1,29 +1,118 @@
-from rest_framework.fields import ChoiceField
+from django.db.models import Manager
+from rest_framework.fields import CharField, DictField, IntegerField, ListField, UUIDField
 from rest_framework.relations import PrimaryKeyRelatedField
-from rest_framework.serializers import ModelSerializer
+from rest_framework.serializers import ListSerializer, ModelSerializer
 
+from api.v1.loaders import relation_loader
 from movies.models import FilmWork, Genre, Person
+from movies.rows import PERSON_RELATIONS, RELATIONS, MovieRowSerializer, person_name
+from utils.instrumentation import timed
 
 
-class MovieSerializer(ModelSerializer):
+class TimedListSerializer(ListSerializer):
+
+    @property
+    def data(self):
+        with timed('serialize'):
+            return super().data
+
+    def to_representation(self, data):
+        # Film works are queued first, so the relations of the whole list
+        # are loaded together on the first item.
+        items = list(data.all() if isinstance(data, Manager) else data)
+        relation_loader(self.context).prime(item for item in items if isinstance(item, FilmWork))
+        return [self.child.to_representation(item) for item in items]
+
+
+class MovieSerializer(MovieRowSerializer):
     genres = PrimaryKeyRelatedField(queryset=Genre.objects.all(), many=True, required=False)
     actors = PrimaryKeyRelatedField(queryset=Person.objects.all(), many=True, required=False)
     directors = PrimaryKeyRelatedField(queryset=Person.objects.all(), many=True, required=False)
     writers = PrimaryKeyRelatedField(queryset=Person.objects.all(), many=True, required=False)
-    type = ChoiceField(choices=FilmWork.FilmWorkType.choices)
 
-    class Meta:
-        model = FilmWork
-        fields = ['id', 'title', 'description', 'creation_date',
-                  'rating', 'type', 'genres', 'actors', 'directors',
-                  'writers']
+    class Meta(MovieRowSerializer.Meta):
+        list_serializer_class = TimedListSerializer
+
+    @property
+    def data(self):
+        with timed('serialize'):
+            return super().data
 
     def to_representation(self, instance):
-        representaion = super(MovieSerializer, self).to_representation(instance)
-        representaion['genres'] = [genre.title for genre in instance.genres.all()]
-        representaion['actors'] = [f'{actor.first_name} {actor.last_name}' for actor in instance.actors.all()]
-        representaion['writers'] = [f'{writers.first_name} {writers.last_name}' for writers in instance.writers.all()]
-        representaion['directors'] = [f'{directors.first_name} {directors.last_name}' for directors in instance.directors.all()]
-        return representaion
+        if isinstance(instance, dict):
+            return super().to_representation(instance)
+        relations = self.relations(instance)
+        representation = {}
+        for field in self._readable_fields:
+            if field.field_name in RELATIONS:
+                representation[field.field_name] = relations[field.field_name]
+                continue
+            value = field.get_attribute(instance)
+            representation[field.field_name] = None if value is None else field.to_representation(value)
+        return representation
+
+    def relations(self, instance):
+        if {'genres', 'cast'} <= getattr(instance, '_prefetched_objects_cache', {}).keys():
+            relations = {'genres': [genre.title for genre in instance.genres.all()]}
+            for relation in PERSON_RELATIONS:
+                relations[relation] = [person_name(person.first_name, person.last_name)
+                                       for person in getattr(instance, relation).all()]
+            return relations
+        # Ids collected by the list serializer, or this film work alone,
+        # loaded once per request.
+        return relation_loader(self.context).get(instance)
+
+
+class MovieBulkItemSerializer(MovieSerializer):
+    """
+    One film work of POST /api/v1/movies/bulk/. Relations are lists of ids
+    that api.v1.bulk checks for the whole batch at once, instead of a query
+    per id in PrimaryKeyRelatedField.
+    """
+    id = UUIDField(required=False)
+    genres = ListField(child=UUIDField(), required=False, default=list)
+    actors = ListField(child=UUIDField(), required=False, default=list)
+    directors = ListField(child=UUIDField(), required=False, default=list)
+    writers = ListField(child=UUIDField(), required=False, default=list)
+
+    class Meta(MovieSerializer.Meta):
+        fields = MovieSerializer.Meta.fields + ['age_qualification', 'file_path']
+
 
+class MovieExportSerializer(MovieSerializer):
+    """
+    Film work of GET /api/v1/movies/export/. updated_at lets consumers pass
+    the last value they saw as ?since= on their next pull.
+    """
 
+    class Meta(MovieSerializer.Meta):
+        fields = MovieSerializer.Meta.fields + ['updated_at']
+
+
+class PersonSerializer(ModelSerializer):
+    """
+    Person of /api/v1/persons/, from api.v1.queries.person_rows.
+    """
+    roles = ListField(child=CharField(), read_only=True)
+
+    class Meta:
+        model = Person
+        fields = ['id', 'first_name', 'last_name', 'roles']
+
+
+class PersonDetailSerializer(PersonSerializer):
+    film_works = DictField(child=ListField(child=UUIDField()), read_only=True)
+
+    class Meta(PersonSerializer.Meta):
+        fields = PersonSerializer.Meta.fields + ['film_works']
+
+
+class GenreSerializer(ModelSerializer):
+    """
+    Genre of /api/v1/genres/, from api.v1.queries.genre_rows.
+    """
+    film_count = IntegerField(read_only=True)
+
+    class Meta:
+        model = Genre
+        fields = ['id', 'title', 'description', 'film_count']
@@ -1,7 +1,16 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
-from api.v1 import views
+from api.v1 import async_views, views
 
-movie_router = DefaultRouter()
-movie_router.register(r'movies', views.MovieViewSet)
+router = DefaultRouter()
+router.register(r'movies', views.MovieViewSet)
+router.register(r'persons', views.PersonViewSet)
+router.register(r'genres', views.GenreViewSet)
 
-urlpatterns = movie_router.urls
+urlpatterns = router.urls + [
+    path('async/movies/', async_views.movie_list),
+    path('async/movies/<uuid:pk>/', async_views.movie_detail),
+    path('changes/', views.changes),
+    path('health/', views.health),
+    path('db-pool/', views.db_pool_stats),
+]
@@ -1,14 +1,174 @@
+from django.conf import settings
+from django.db import DatabaseError, connection
+from django_filters.rest_framework import DjangoFilterBackend
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework.decorators import action, api_view, permission_classes, renderer_classes
 from rest_framework.mixins import ListModelMixin, RetrieveModelMixin
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
-from api.v1.pagination import MoviePagination
-from api.v1.serializer import MovieSerializer
-from movies.models import FilmWork
+from api.v1.bulk import bulk_upsert
+from api.v1.caching import CatalogCacheMixin
+from api.v1.changes import change_feed_response
+from api.v1.export import EXPORT_FORMATS, export_response
+from api.v1.filters import MovieFilter, MovieSearchFilter
+from api.v1.pagination import KeysetPagination, MovieCursorPagination, MoviePagination
+from api.v1.queries import genre_rows, person_rows
+from api.v1.renderers import ORJSONRenderer
+from api.v1.serializer import (GenreSerializer, MovieBulkItemSerializer, MovieSerializer, PersonDetailSerializer,
+                               PersonSerializer)
+from movies.models import FilmWork, Genre, Person
+from movies.rows import document_rows, movie_rows
+from utils.instrumentation import query_budget
+from utils.pooled_postgresql.pool import pool_stats
 
 
-class MovieViewSet(ListModelMixin, RetrieveModelMixin, GenericViewSet):
+class MovieViewSet(CatalogCacheMixin, ListModelMixin, RetrieveModelMixin, GenericViewSet):
     serializer_class = MovieSerializer
     pagination_class = MoviePagination
+    cursor_pagination_class = MovieCursorPagination
     permission_classes = [AllowAny]
-    queryset = FilmWork.objects.prefetch_related('genres', 'actors', 'writers', 'directors')
+    filter_backends = [DjangoFilterBackend, MovieSearchFilter]
+    filterset_class = MovieFilter
+    renderer_classes = [ORJSONRenderer, BrowsableAPIRenderer]
+    queryset = FilmWork.objects.all()
+    # Checked by api.tests.test_query_budgets.
+    query_budgets = {'list': 2, 'retrieve': 1}
+
+    def get_queryset(self):
+        if settings.FILM_WORK_DOCUMENTS:
+            return document_rows(super().get_queryset())
+        return movie_rows(super().get_queryset())
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            pagination_class = self.get_pagination_class()
+            self._paginator = None if pagination_class is None else pagination_class()
+        return self._paginator
+
+    def get_pagination_class(self):
+        request = getattr(self, 'request', None)
+        if request is not None:
+            params = request.query_params
+            if params.get('pagination') == 'cursor' or 'cursor' in params:
+                return self.cursor_pagination_class
+        return self.pagination_class
+
+    @swagger_auto_schema(request_body=MovieBulkItemSerializer(many=True), responses={
+        200: 'Counts of created and updated film works, and the id and status of each item',
+        400: 'Status of each item, with errors for the invalid ones',
+    })
+    @action(detail=False, methods=['post'], permission_classes=[IsAdminUser], filter_backends=[], pagination_class=None)
+    def bulk(self, request):
+        """
+        Creates or replaces a batch of film works in one transaction. Nothing
+        is saved unless every item is valid; errors are reported per item.
+        """
+        return Response(bulk_upsert(request.data))
+
+    @swagger_auto_schema(manual_parameters=[
+        openapi.Parameter('output', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=list(EXPORT_FORMATS),
+                          default='ndjson'),
+        openapi.Parameter('since', openapi.IN_QUERY, type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME,
+                          description='Only film works updated at or after this time'),
+    ], responses={200: 'Every film work with genres and persons, one per line, ordered by updated_at'})
+    @action(detail=False, methods=['get'], filter_backends=[], pagination_class=None)
+    def export(self, request):
+        """
+        Streams the whole catalog in one response, for consumers that would
+        otherwise walk every page of the list.
+        """
+        return export_response(request.query_params)
+
+
+class PersonViewSet(CatalogCacheMixin, ListModelMixin, RetrieveModelMixin, GenericViewSet):
+    """
+    Persons by id, one keyset page at a time. The detail lists the ids of
+    their film works by role.
+    """
+    serializer_class = PersonSerializer
+    pagination_class = KeysetPagination
+    permission_classes = [AllowAny]
+    renderer_classes = [ORJSONRenderer, BrowsableAPIRenderer]
+    queryset = Person.objects.order_by('id')
+    query_budgets = {'list': 2, 'retrieve': 1}
+
+    def get_queryset(self):
+        return person_rows(super().get_queryset(), film_works=self.action == 'retrieve')
+
+    def get_serializer_class(self):
+        if self.action == 'retrieve':
+            return PersonDetailSerializer
+        return super().get_serializer_class()
+
+
+class GenreViewSet(CatalogCacheMixin, ListModelMixin, RetrieveModelMixin, GenericViewSet):
+    """
+    Genres by title, one keyset page at a time, with their number of film
+    works.
+    """
+    serializer_class = GenreSerializer
+    pagination_class = KeysetPagination
+    permission_classes = [AllowAny]
+    renderer_classes = [ORJSONRenderer, BrowsableAPIRenderer]
+    queryset = Genre.objects.order_by('title')
+    # The film counts are one more query per catalog version.
+    query_budgets = {'list': 3, 'retrieve': 2}
+
+    def get_queryset(self):
+        return genre_rows(super().get_queryset())
+
+
+@query_budget(2)
+@swagger_auto_schema(method='get', manual_parameters=[
+    openapi.Parameter('after', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, default=0,
+                      description='last_id of the previous call'),
+    openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, default=settings.CHANGE_FEED_PAGE_SIZE),
+], responses={
+    200: 'Change events after the given id, oldest first, and the film works they affect',
+    410: 'Events after the given id were compacted, sync the catalog and resume from last_id',
+})
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@renderer_classes([ORJSONRenderer, BrowsableAPIRenderer])
+def changes(request):
+    """
+    Change log of film works, persons, genres and their relations, for
+    consumers that sync in the number of changes instead of the size of
+    the catalog.
+    """
+    return change_feed_response(request)
+
+
+@query_budget(1)
+@swagger_auto_schema(method='get', responses={200: 'The database answers', 503: 'The database is unreachable'})
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def health(request):
+    """
+    Readiness check for load balancers and orchestrators: runs SELECT 1 on a
+    connection of the worker that serves the request.
+    """
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    except DatabaseError:
+        return Response({'database': 'unavailable'}, status=503)
+    return Response({'database': 'ok'})
+
+
+@query_budget(2)
+@swagger_auto_schema(method='get', responses={200: 'Connection pool counters per database alias'})
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def db_pool_stats(request):
+    """
+    Counters of the connection pools of the worker that serves the request:
+    size, in_use and idle connections, checkouts, waits and their duration.
+    Empty with DB_POOL_SIZE=0.
+    """
+    return Response(pool_stats())
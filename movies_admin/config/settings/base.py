@@ -1,7 +1,7 @@
 import os
 import sys
 
-from decouple import config
+from decouple import Csv, config
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 # SECURITY WARNING: keep the secret key used in production secret!
@@ -10,7 +10,7 @@ SECRET_KEY = config('SECRET_KEY')
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = False
 
-ALLOWED_HOSTS = [config['HOST']]
+ALLOWED_HOSTS = [config('HOST')]
 
 
 # Application definition
@@ -29,6 +29,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'utils.instrumentation.RequestMetricsMiddleware',
+    'utils.compression.CompressionMiddleware',
+    'utils.replicas.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -63,18 +66,116 @@ AUTH_USER_MODEL = 'movies.User'
 # Database
 # https://docs.djangoproject.com/en/3.1/ref/settings/#databases
 
+# Each worker process keeps up to DB_POOL_SIZE connections open and lends
+# them to requests, see utils.pooled_postgresql. Django returns them at the
+# end of every request, so CONN_MAX_AGE only applies with DB_POOL_SIZE=0.
+DB_POOL_SIZE = config('DB_POOL_SIZE', default=10, cast=int)
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql_psycopg2',
+        'ENGINE': 'utils.pooled_postgresql' if DB_POOL_SIZE else 'django.db.backends.postgresql_psycopg2',
         'NAME': config('DB_NAME', default=''),
         'USER': config('DB_USER', default='postgres'),
         'PASSWORD': config('DB_PASSWORD', default=''),
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default=5432, cast=int),
-        'CONN_MAX_AGE': 1,
+        'CONN_MAX_AGE': 0 if DB_POOL_SIZE else config('DB_CONN_MAX_AGE', default=1, cast=int),
+        'POOL': {
+            'MAX_SIZE': DB_POOL_SIZE,
+            # Seconds before a connection is closed and replaced.
+            'MAX_AGE': config('DB_POOL_MAX_AGE', default=600, cast=int),
+            # Connections idle for this many seconds are pinged before reuse.
+            'CHECK_AFTER': config('DB_POOL_CHECK_AFTER', default=5, cast=float),
+            # Seconds a request waits for a connection when all are in use.
+            'TIMEOUT': config('DB_POOL_TIMEOUT', default=10, cast=float),
+        },
+    }
+}
+
+# Read replicas of the default database as host or host:port, comma
+# separated. API and admin changelist reads go to them, see utils.replicas.
+for number, replica in enumerate(config('DB_REPLICA_HOSTS', default='', cast=Csv()), start=1):
+    host, _, port = replica.partition(':')
+    DATABASES[f'replica_{number}'] = dict(
+        DATABASES['default'],
+        HOST=host,
+        PORT=int(port) if port else DATABASES['default']['PORT'],
+        POOL=dict(DATABASES['default']['POOL']),
+        TEST={'MIRROR': 'default'},
+    )
+
+DATABASE_ROUTERS = ['utils.replicas.ReplicaRouter']
+
+# Seconds reads stay on the primary after a client wrote or the catalog
+# changed, longer than the replication lag.
+DB_REPLICA_PIN_SECONDS = config('DB_REPLICA_PIN_SECONDS', default=5, cast=float)
+
+# Locmem by default, which only suits a single process. Response caching,
+# ETags and the reference caches all depend on versions kept in this cache,
+# so with several workers, or an ETL or admin process writing next to them,
+# point CACHE_BACKEND/CACHE_LOCATION at a shared backend (e.g. memcached).
+# Otherwise a write is only seen by its own process until
+# MOVIES_CACHE_TIMEOUT runs out. `manage.py check` warns (movies.W001).
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default=''),
     }
 }
 
+# Lifetime of cached /api/v1/movies/ responses, see movies.catalog.
+MOVIES_CACHE_TIMEOUT = config('MOVIES_CACHE_TIMEOUT', default=300, cast=int)
+
+# Genre and role titles kept by each process, see movies.reference.
+REFERENCE_CACHE_MAX_SIZE = config('REFERENCE_CACHE_MAX_SIZE', default=10000, cast=int)
+REFERENCE_CACHE_TTL = config('REFERENCE_CACHE_TTL', default=300, cast=int)
+
+# Serve /api/v1/movies/ from the denormalized FilmWorkDocument table.
+# Run `manage.py rebuild_documents` after enabling it.
+FILM_WORK_DOCUMENTS = config('FILM_WORK_DOCUMENTS', default=False, cast=bool)
+
+# asyncpg pool of each ASGI worker, used by the /api/v1/async/ endpoints.
+ASYNC_DB_POOL_MIN_SIZE = config('ASYNC_DB_POOL_MIN_SIZE', default=1, cast=int)
+ASYNC_DB_POOL_MAX_SIZE = config('ASYNC_DB_POOL_MAX_SIZE', default=10, cast=int)
+
+# Largest batch accepted by POST /api/v1/movies/bulk/.
+MOVIES_BULK_MAX_ITEMS = config('MOVIES_BULK_MAX_ITEMS', default=1000, cast=int)
+
+# Events per /api/v1/changes/ response, and the days they are kept by
+# `manage.py compact_changes`.
+CHANGE_FEED_PAGE_SIZE = config('CHANGE_FEED_PAGE_SIZE', default=500, cast=int)
+CHANGE_LOG_RETENTION_DAYS = config('CHANGE_LOG_RETENTION_DAYS', default=7, cast=int)
+
+# Responses smaller than this many bytes are not compressed, see
+# utils.compression. Brotli quality goes from 0 (fastest) to 11.
+COMPRESSION_MIN_SIZE = config('COMPRESSION_MIN_SIZE', default=1000, cast=int)
+COMPRESSION_BROTLI_QUALITY = config('COMPRESSION_BROTLI_QUALITY', default=5, cast=int)
+
+# Share of requests whose queries and timings are measured and sent as a
+# Server-Timing header and a log line, see utils.instrumentation.
+REQUEST_METRICS_SAMPLE_RATE = config('REQUEST_METRICS_SAMPLE_RATE', default=0.01, cast=float)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'utils.instrumentation': {
+            'handlers': ['console'],
+            'level': config('REQUEST_METRICS_LOG_LEVEL', default='INFO'),
+            'propagate': False,
+        },
+    },
+}
+
+# Incremental export of film work documents, see `manage.py etl_sync`.
+ETL_STATE_FILE = config('ETL_STATE_FILE', default='etl_state.json')
+ETL_SINK_URL = config('ETL_SINK_URL', default='')
+ETL_INDEX = config('ETL_INDEX', default='movies')
+ETL_BATCH_SIZE = config('ETL_BATCH_SIZE', default=100, cast=int)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.1/ref/settings/#auth-password-validators
@@ -0,0 +1,28 @@
+"""
+A primary and a replica as two local SQLite databases, to try the replica
+routing without a PostgreSQL standby:
+
+    ./manage.py migrate --settings=config.settings.replicas
+    ./manage.py add_fixtures --settings=config.settings.replicas
+    cp primary.sqlite3 replica.sqlite3
+    ./manage.py runserver --settings=config.settings.replicas
+
+The replica is a copy that never catches up, so whatever is written after
+the copy is only seen where the router reads from the primary. The routing
+itself is covered by utils.tests.test_replicas.
+"""
+from .base import *
+
+PROJECT_DIR = os.path.dirname(BASE_DIR)
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(PROJECT_DIR, 'primary.sqlite3'),
+    },
+    'replica_1': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(PROJECT_DIR, 'replica.sqlite3'),
+        'TEST': {'MIRROR': 'default'},
+    },
+}
@@ -0,0 +1,20 @@
+"""
+Settings of `manage.py test`, which uses them unless --settings or
+DJANGO_SETTINGS_MODULE says otherwise. The test database is created on the
+PostgreSQL server of DB_*, the tests need it like the site does.
+"""
+import os
+
+os.environ.setdefault('SECRET_KEY', 'test')
+os.environ.setdefault('HOST', 'testserver')
+
+from .base import *
+
+# The tests run in one process, its local cache is the one they check.
+SILENCED_SYSTEM_CHECKS = ['movies.W001']
+
+# A replica that is the test database under another connection. Reads only
+# go to it where utils.tests.test_replicas enables the router: it is not in
+# the transaction of a TestCase and would not see the rows of the test.
+DATABASES.setdefault('replica_1', dict(DATABASES['default'], TEST={'MIRROR': 'default'}))
+DATABASE_ROUTERS = []
@@ -0,0 +1,30 @@
+import logging
+import time
+from functools import wraps
+
+logger = logging.getLogger(__name__)
+
+
+def backoff(exceptions, start_sleep_time=0.1, factor=2, border_sleep_time=10, max_tries=None):
+    """
+    Retries the wrapped function on exceptions, sleeping
+    start_sleep_time * factor ** n seconds between attempts, capped at
+    border_sleep_time. max_tries=None retries forever.
+    """
+    def func_wrapper(func):
+        @wraps(func)
+        def inner(*args, **kwargs):
+            tries = 0
+            sleep_time = start_sleep_time
+            while True:
+                try:
+                    return func(*args, **kwargs)
+                except exceptions as exc:
+                    tries += 1
+                    if max_tries is not None and tries >= max_tries:
+                        raise
+                    logger.warning('%s failed (%s), retrying in %.1f s', func.__qualname__, exc, sleep_time)
+                    time.sleep(sleep_time)
+                    sleep_time = min(sleep_time * factor, border_sleep_time)
+        return inner
+    return func_wrapper
@@ -0,0 +1,36 @@
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from movies.models import FilmWork, FilmWorkPerson, Genre, Person
+
+
+def changed_rows(model, position, batch_size):
+    """
+    Returns the next batch of (id, updated_at) pairs after position, ordered
+    by (updated_at, id) so equal timestamps never stall or repeat a batch.
+    """
+    queryset = model.objects.order_by('updated_at', 'id')
+    if position:
+        updated_at = parse_datetime(position['updated_at'])
+        queryset = queryset.filter(Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, id__gt=position['id']))
+    return list(queryset.values_list('id', 'updated_at')[:batch_size])
+
+
+def film_works_of_film_works(ids):
+    return set(ids)
+
+
+def film_works_of_persons(ids):
+    return set(FilmWorkPerson.objects.filter(person_id__in=ids).values_list('film_work_id', flat=True))
+
+
+def film_works_of_genres(ids):
+    through = FilmWork.genres.through
+    return set(through.objects.filter(genre_id__in=ids).values_list('filmwork_id', flat=True))
+
+
+SOURCES = (
+    ('film_work', FilmWork, film_works_of_film_works),
+    ('person', Person, film_works_of_persons),
+    ('genre', Genre, film_works_of_genres),
+)
@@ -0,0 +1,101 @@
+import logging
+import time
+
+from django.db.models import Max
+
+from etl.extractor import SOURCES, changed_rows
+from movies.models import ChangeEvent, FilmWork
+from movies.rows import MovieRowSerializer, movie_rows
+
+logger = logging.getLogger(__name__)
+
+# State key of the last change log event read for deletions.
+DELETIONS = 'deletions'
+
+
+class ETLPipeline:
+    def __init__(self, sink, state, batch_size=100):
+        self.sink = sink
+        self.state = state
+        self.batch_size = batch_size
+        self.serializer = MovieRowSerializer()
+
+    def run(self):
+        started = time.perf_counter()
+        # Deletions first: a film work deleted and created again with the
+        # same id is then indexed again by the film work source.
+        deleted, documents = self.sync_deletions()
+        for name, model, fan_out in SOURCES:
+            documents += self.sync_source(name, model, fan_out)
+        elapsed = time.perf_counter() - started
+        return {
+            'documents': documents,
+            'deleted': deleted,
+            'seconds': round(elapsed, 3),
+            'documents_per_second': round(documents / elapsed) if elapsed else 0,
+        }
+
+    def sync_source(self, name, model, fan_out):
+        documents = 0
+        while True:
+            rows = changed_rows(model, self.state.get_state(name), self.batch_size)
+            if not rows:
+                return documents
+            documents += self.load(sorted(fan_out([row_id for row_id, _ in rows])))
+            last_id, last_updated_at = rows[-1]
+            # The mark only moves after the sink accepted every affected
+            # document, so a restart resumes from the last finished batch.
+            self.state.set_state(name, {'updated_at': last_updated_at.isoformat(), 'id': str(last_id)})
+            logger.info('%s: synced up to %s', name, last_updated_at)
+
+    def sync_deletions(self):
+        """
+        Deleted film works leave nothing behind for changed_rows to find, and
+        deleting a person or genre changes their film works without moving
+        updated_at. Both are read from the change log instead: deleted film
+        works are removed from the sink, film works of deleted persons and
+        genres are loaded again. Returns (deleted, loaded) counts.
+        """
+        position = self.state.get_state(DELETIONS)
+        if position is None:
+            # A new sink starts empty, earlier deletions are of no use to it.
+            last_id = ChangeEvent.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+            self.state.set_state(DELETIONS, {'id': last_id})
+            return 0, 0
+
+        oldest = ChangeEvent.objects.order_by('id').values('id', 'action').first()
+        if oldest is not None and oldest['action'] == ChangeEvent.Action.compacted and position['id'] < oldest['id']:
+            logger.warning('deletions: events up to %s were compacted, rebuild the index to drop deleted '
+                           'film works', oldest['id'])
+
+        deleted = documents = 0
+        while True:
+            events = list(
+                ChangeEvent.objects.filter(id__gt=position['id'], action=ChangeEvent.Action.deleted)
+                .order_by('id').values_list('id', 'model', 'film_work_ids')[:self.batch_size]
+            )
+            if not events:
+                return deleted, documents
+            removed, changed = set(), set()
+            for _, model, film_work_ids in events:
+                (removed if model == FilmWork._meta.model_name else changed).update(film_work_ids)
+            # Created again since: loaded instead of deleted.
+            existing = {str(pk) for pk in FilmWork.objects.filter(id__in=removed).values_list('id', flat=True)}
+            removed -= existing
+            if removed:
+                self.sink.delete(sorted(removed))
+            documents += self.load(sorted((changed | existing) - removed))
+            deleted += len(removed)
+            position = {'id': events[-1][0]}
+            self.state.set_state(DELETIONS, position)
+            logger.info('deletions: synced up to event %s', position['id'])
+
+    def load(self, film_work_ids):
+        for start in range(0, len(film_work_ids), self.batch_size):
+            batch = film_work_ids[start:start + self.batch_size]
+            # Genre titles from the database: the reference cache of a long
+            # running sync would not see renames made by other processes
+            # unless the default cache is shared.
+            rows = movie_rows(FilmWork.objects.filter(id__in=batch), cached_titles=False)
+            self.sink.write([self.serializer.to_representation(row) for row in rows])
+        return len(film_work_ids)
@@ -0,0 +1,79 @@
+import json
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+
+from etl.backoff import backoff
+
+RETRY_EXCEPTIONS = (URLError, ConnectionError, TimeoutError)
+
+
+class SinkError(Exception):
+    pass
+
+
+class JsonLinesSink:
+    """
+    Appends documents to a file, one per line. A deleted film work is a
+    {"id": ..., "deleted": true} line.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    @backoff(OSError)
+    def write(self, documents):
+        with open(self.path, 'a', encoding='utf-8') as sink_file:
+            for document in documents:
+                sink_file.write(json.dumps(document, ensure_ascii=False))
+                sink_file.write('\n')
+
+    def delete(self, film_work_ids):
+        self.write([{'id': str(film_work_id), 'deleted': True} for film_work_id in film_work_ids])
+
+
+class HttpBulkSink:
+    """
+    Sends documents to an Elasticsearch compatible /_bulk endpoint as
+    index actions keyed by the film work id, and deleted film works as
+    delete actions.
+    """
+
+    def __init__(self, url, index, timeout=30):
+        self.url = url.rstrip('/')
+        self.index = index
+        self.timeout = timeout
+
+    def build_body(self, documents):
+        lines = []
+        for document in documents:
+            lines.append(json.dumps({'index': {'_index': self.index, '_id': document['id']}}))
+            lines.append(json.dumps(document, ensure_ascii=False))
+        return ('\n'.join(lines) + '\n').encode('utf-8')
+
+    def build_delete_body(self, film_work_ids):
+        lines = [json.dumps({'delete': {'_index': self.index, '_id': str(film_work_id)}})
+                 for film_work_id in film_work_ids]
+        return ('\n'.join(lines) + '\n').encode('utf-8')
+
+    def write(self, documents):
+        self.send(self.build_body(documents))
+
+    def delete(self, film_work_ids):
+        # Deleting a missing document is not an item error, so replaying a
+        # deletion is harmless.
+        self.send(self.build_delete_body(film_work_ids))
+
+    @backoff(RETRY_EXCEPTIONS)
+    def send(self, body):
+        request = Request(f'{self.url}/_bulk', data=body, method='POST',
+                          headers={'Content-Type': 'application/x-ndjson'})
+        try:
+            with urlopen(request, timeout=self.timeout) as response:
+                result = json.loads(response.read() or b'{}')
+        except HTTPError as exc:
+            # Only overload and server side errors are worth retrying.
+            if exc.code >= 500 or exc.code == 429:
+                raise
+            raise SinkError(f'Bulk request rejected with HTTP {exc.code}') from exc
+        if result.get('errors'):
+            raise SinkError('Bulk request finished with item errors')
@@ -0,0 +1,34 @@
+import json
+import os
+
+
+class JsonFileStorage:
+    def __init__(self, file_path):
+        self.file_path = file_path
+
+    def retrieve_state(self):
+        if not os.path.exists(self.file_path):
+            return {}
+        with open(self.file_path, encoding='utf-8') as state_file:
+            return json.load(state_file)
+
+    def save_state(self, state):
+        # Write to a temporary file and rename it so a crash mid-write never
+        # leaves a truncated state file behind.
+        tmp_path = f'{self.file_path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as state_file:
+            json.dump(state, state_file)
+        os.replace(tmp_path, self.file_path)
+
+
+class State:
+    def __init__(self, storage):
+        self.storage = storage
+        self.state = storage.retrieve_state()
+
+    def get_state(self, key, default=None):
+        return self.state.get(key, default)
+
+    def set_state(self, key, value):
+        self.state[key] = value
+        self.storage.save_state(self.state)
@@ -1,11 +1,27 @@
 from django.core.management.base import BaseCommand
 from utils.add_fixture import add_film_work, add_persons, add_genres, add_users
+from utils.bulk_fixture import add_bulk_fixtures
 
 
 class Command(BaseCommand):
     help = 'Generate testing data'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--bulk', action='store_true',
+                            help='Generate rows in memory and insert them in batches (needs an empty catalog)')
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--genres', type=int, default=20)
+        parser.add_argument('--persons', type=int, default=1000)
+        parser.add_argument('--film-works', type=int, default=10000)
+        parser.add_argument('--batch-size', type=int, default=10000)
+        parser.add_argument('--copy', action='store_true', help='Use COPY FROM STDIN on PostgreSQL')
+        parser.add_argument('--seed', type=int, default=123)
+        parser.add_argument('--workers', type=int, default=1, help='Processes generating bulk shards')
+
     def handle(self, *args, **options):
+        if options['bulk']:
+            add_bulk_fixtures(self, options)
+            return
         add_users(self),
         add_genres(self),
         add_persons(self),
@@ -0,0 +1,85 @@
+import random
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from faker import Faker
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api.v1.views import MovieViewSet
+from movies.models import FilmWork, Genre, Person, User
+from movies.rows import PERSON_RELATIONS
+from utils.benchmark import format_result, measure
+
+BULK_URL = 'http://testserver/api/v1/movies/bulk/'
+
+
+class Command(BaseCommand):
+    help = 'Compare single item creates with POST /api/v1/movies/bulk/. Nothing is saved.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=500)
+        parser.add_argument('--cast', type=int, default=10, help='Persons per role and film work')
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        genre_ids = list(Genre.objects.values_list('id', flat=True)[:100])
+        person_ids = list(Person.objects.values_list('id', flat=True)[:5000])
+        if not genre_ids or len(person_ids) < options['cast']:
+            raise CommandError('Load fixtures first, e.g. `manage.py add_fixtures`')
+
+        fake = Faker()
+        items = [{
+            'title': fake.sentence(nb_words=3),
+            'description': fake.text(),
+            'creation_date': fake.date(),
+            'rating': round(random.uniform(0, 10), 1),
+            'type': random.choice(FilmWork.FilmWorkType.values),
+            'age_qualification': random.choice(FilmWork.AgeQualification.values),
+            'file_path': fake.file_path(),
+            'genres': [str(pk) for pk in random.sample(genre_ids, min(3, len(genre_ids)))],
+            **{relation: [str(pk) for pk in random.sample(person_ids, options['cast'])]
+               for relation in PERSON_RELATIONS},
+        } for _ in range(options['items'])]
+
+        view = MovieViewSet.as_view({'post': 'bulk'}, **MovieViewSet.bulk.kwargs)
+        factory = APIRequestFactory()
+        admin = User(username='bench', is_staff=True)
+
+        def post(payload):
+            request = factory.post(BULK_URL, payload, format='json')
+            force_authenticate(request, user=admin)
+            response = view(request)
+            if response.status_code != 200:
+                raise CommandError(f'Bulk request failed: {response.data}')
+            return response
+
+        def single():
+            with transaction.atomic():
+                for item in items:
+                    fields = {key: value for key, value in item.items() if key not in ('genres',) + PERSON_RELATIONS}
+                    film_work = FilmWork.objects.create(id=uuid.uuid4(), **fields)
+                    film_work.genres.set(item['genres'])
+                    for relation in PERSON_RELATIONS:
+                        getattr(film_work, relation).set(item[relation])
+                transaction.set_rollback(True)
+
+        def bulk():
+            with transaction.atomic():
+                post(items)
+                transaction.set_rollback(True)
+
+        def bulk_update():
+            payload = [dict(item, id=str(uuid.uuid4())) for item in items]
+            with transaction.atomic():
+                post(payload)
+                post(payload)
+                transaction.set_rollback(True)
+
+        self.stdout.write(f'{len(items)} film works with {3 * options["cast"]} persons each')
+        for name, func, count in (('single item creates', single, len(items)),
+                                  ('bulk create', bulk, len(items)),
+                                  ('bulk create then update', bulk_update, 2 * len(items))):
+            result = measure(func, repeat=options['repeat'])
+            throughput = round(count / result['median_ms'] * 1000)
+            self.stdout.write(format_result(name, result) + f', {throughput} items/s')
@@ -0,0 +1,119 @@
+import statistics
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connections
+from django.db.backends.signals import connection_created
+from django.db.utils import load_backend
+from django.test import Client
+from django.test.utils import override_settings
+
+from utils.benchmark import percentile
+from utils.pooled_postgresql.pool import get_pool
+
+PLAIN_ENGINE = 'django.db.backends.postgresql_psycopg2'
+POOLED_ENGINE = 'utils.pooled_postgresql'
+VARIANTS = {
+    'no reuse': {'ENGINE': PLAIN_ENGINE, 'CONN_MAX_AGE': 0},
+    'CONN_MAX_AGE=1': {'ENGINE': PLAIN_ENGINE, 'CONN_MAX_AGE': 1},
+    'pooled': {'ENGINE': POOLED_ENGINE, 'CONN_MAX_AGE': 0},
+}
+
+
+class Command(BaseCommand):
+    help = ('Compare request latency with a new connection per request, the former CONN_MAX_AGE=1 '
+            'and the connection pool of utils.pooled_postgresql')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help='Requests per thread and variant')
+        parser.add_argument('--threads', type=int, default=4, help='Request threads, like gthread workers')
+        parser.add_argument('--pause', type=float, default=0,
+                            help='Seconds between the requests of a thread, to model lighter traffic')
+        parser.add_argument('--path', action='append', help='Paths to request in turn, /api/v1/health/ by default')
+        parser.add_argument('--with-cache', action='store_true',
+                            help='Keep the response cache; off by default so every request reads the database')
+
+    def run(self, variant, options):
+        settings_dict = dict(connections.databases['default'], **VARIANTS[variant])
+        settings_dict.setdefault('POOL', {})
+        settings_dict['POOL'] = dict(settings_dict['POOL'], MAX_SIZE=settings_dict['POOL'].get('MAX_SIZE') or
+                                     options['threads'])
+        backend = load_backend(settings_dict['ENGINE'])
+        paths = options['path'] or ['/api/v1/health/']
+        latencies, errors = [], []
+        opened = []
+
+        def count(sender, connection, **kwargs):
+            opened.append(connection)
+
+        def worker():
+            # Each thread has its own DatabaseWrapper, as in a threaded server.
+            connections['default'] = backend.DatabaseWrapper(settings_dict, 'default')
+            client = Client()
+            try:
+                for number in range(options['requests']):
+                    start = time.perf_counter()
+                    response = client.get(paths[number % len(paths)])
+                    # What the request_finished signal does after a real request.
+                    close_old_connections()
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    if response.status_code != 200:
+                        errors.append(response.status_code)
+                    if options['pause']:
+                        time.sleep(options['pause'])
+            finally:
+                connections['default'].close()
+
+        pool = get_pool('default', settings_dict) if settings_dict['ENGINE'] == POOLED_ENGINE else None
+        created = pool.stats()['created'] if pool else 0
+        connection_created.connect(count)
+        try:
+            threads = [threading.Thread(target=worker) for _ in range(options['threads'])]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+        finally:
+            connection_created.disconnect(count)
+
+        # With the pool, connection_created fires on every checkout, not
+        # only when a connection is opened.
+        connects = pool.stats()['created'] - created if pool else len(opened)
+        if pool:
+            pool.close()
+        return {
+            'requests': len(latencies),
+            'errors': len(errors),
+            'rps': round(len(latencies) / elapsed, 1),
+            'p50_ms': round(statistics.median(latencies), 2),
+            'p95_ms': round(percentile(latencies, 95), 2),
+            'p99_ms': round(percentile(latencies, 99), 2),
+            'connects': connects,
+        }
+
+    def handle(self, *args, **options):
+        if connections['default'].vendor != 'postgresql':
+            raise CommandError('Needs a PostgreSQL database')
+        overrides = {} if options['with_cache'] else {
+            'CACHES': {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+        }
+        connections['default'].close()
+
+        results = {}
+        with override_settings(**overrides):
+            for variant in VARIANTS:
+                result = results[variant] = self.run(variant, options)
+                self.stdout.write(
+                    f'{variant}: p50 {result["p50_ms"]} ms, p95 {result["p95_ms"]} ms, p99 {result["p99_ms"]} ms, '
+                    f'{result["rps"]} requests/s, {result["connects"]} connections opened for '
+                    f'{result["requests"]} requests, {result["errors"]} errors'
+                )
+
+        baseline, pooled = results['CONN_MAX_AGE=1'], results['pooled']
+        self.stdout.write(self.style.SUCCESS(
+            f'pooled vs CONN_MAX_AGE=1: p50 {pooled["p50_ms"]} vs {baseline["p50_ms"]} ms, '
+            f'p99 {pooled["p99_ms"]} vs {baseline["p99_ms"]} ms'
+        ))
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIRequestFactory
+
+from api.v1.pagination import MovieCursorPagination
+from api.v1.views import MovieViewSet
+from movies.models import FilmWork
+from utils.benchmark import format_result, measure, uncached
+
+MOVIES_URL = 'http://testserver/api/v1/movies/'
+
+
+class Command(BaseCommand):
+    help = 'Compare page number and cursor pagination latency of /api/v1/movies/'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', nargs='+', type=int, default=[1, 5000])
+        parser.add_argument('--per-page', type=int, default=50)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        per_page = options['per_page']
+        total = FilmWork.objects.count()
+        last_page = max(1, -(-total // per_page))
+        view = MovieViewSet.as_view({'get': 'list'})
+        factory = APIRequestFactory()
+
+        self.stdout.write(f'{total} film works, {per_page} per page')
+        for page in options['pages']:
+            if page > last_page:
+                self.stdout.write(self.style.WARNING(f'Page {page} does not exist, using last page {last_page}'))
+                page = last_page
+
+            page_url = f'{MOVIES_URL}?page={page}&per_page={per_page}'
+            cursor_url = self.get_cursor_url(page, per_page)
+            for mode, url in (('page', page_url), ('cursor', cursor_url)):
+                result = measure(lambda: uncached(view, factory.get(url)), repeat=options['repeat'])
+                self.stdout.write(format_result(f'{mode:>6} mode, page {page}', result))
+
+    def get_cursor_url(self, page, per_page):
+        paginator = MovieCursorPagination()
+        paginator.base_url = f'{MOVIES_URL}?per_page={per_page}'
+        if page == 1:
+            return f'{paginator.base_url}&pagination=cursor'
+
+        ordering = [name.lstrip('-') for name in paginator.default_ordering]
+        position = FilmWork.objects.order_by(*paginator.default_ordering).values_list(*ordering)[
+            (page - 1) * per_page - 1]
+        return paginator.encode_cursor(position, False, page)
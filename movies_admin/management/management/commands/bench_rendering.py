@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from api.v1.renderers import ORJSONRenderer
+from api.v1.serializer import MovieSerializer
+from movies.models import FilmWork
+from movies.rows import movie_rows
+from utils.benchmark import format_result, measure
+from utils.compression import compress
+
+
+class Command(BaseCommand):
+    help = ('Compare JSONRenderer and ORJSONRenderer on serialized movie pages, and the bytes on the wire '
+            'with gzip and brotli')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--per-page', type=int, default=50)
+        parser.add_argument('--pages', type=int, default=20)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        per_page = options['per_page']
+        pages = options['pages']
+        # Serialized once, so only rendering and compression are measured.
+        queryset = movie_rows(FilmWork.objects.order_by('created_at', 'id'))
+        data = [MovieSerializer(queryset[page * per_page:(page + 1) * per_page], many=True).data
+                for page in range(pages)]
+        if not data[0]:
+            raise CommandError('No film works, load them with `manage.py add_fixtures`')
+
+        renderers = (('json', JSONRenderer()), ('orjson', ORJSONRenderer()))
+        for page, items in enumerate(data):
+            if renderers[0][1].render(items) != renderers[1][1].render(items):
+                raise CommandError(f'Page {page} differs between JSONRenderer and ORJSONRenderer')
+        self.stdout.write(self.style.SUCCESS(f'{pages} pages of {per_page} are byte-identical'))
+
+        for name, renderer in renderers:
+            result = measure(lambda: [renderer.render(items) for items in data], repeat=options['repeat'])
+            per_page_ms = round(result['median_ms'] / pages, 3)
+            self.stdout.write(format_result(f'{name:>8}', result) + f' for {pages} pages, {per_page_ms} ms a page')
+
+        contents = [ORJSONRenderer().render(items) for items in data]
+        raw = sum(map(len, contents)) / pages
+        self.stdout.write(f'{"identity":>8}: {round(raw)} bytes a page')
+        for encoding in ('gzip', 'br'):
+            result = measure(lambda: [compress(content, encoding) for content in contents], repeat=options['repeat'])
+            size = sum(len(compress(content, encoding)) for content in contents) / pages
+            self.stdout.write(f'{encoding:>8}: {round(size)} bytes a page ({size / raw:.0%}), '
+                              f'{round(result["median_ms"] / pages, 3)} ms a page to compress')
+        self.stdout.write(f'Brotli quality {settings.COMPRESSION_BROTLI_QUALITY}, responses under '
+                          f'{settings.COMPRESSION_MIN_SIZE} bytes are not compressed')
@@ -0,0 +1,63 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+from decouple import Csv, config
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from management.management.commands.loadtest import SERVERS, run_load, wait_until_up
+
+
+class Command(BaseCommand):
+    help = ('Requests per second of the movie endpoints under gunicorn reading from the primary only, '
+            'then from one, two, ... of the replicas. Responses are not cached, so every request reads '
+            'the database')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--replica-hosts', default=','.join(config('DB_REPLICA_HOSTS', default='', cast=Csv())),
+                            help='Replicas as host or host:port, comma separated; DB_REPLICA_HOSTS by default')
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--concurrency', type=int, default=32, help='Simultaneous keep-alive clients')
+        parser.add_argument('--duration', type=float, default=15, help='Seconds per number of replicas')
+        parser.add_argument('--warmup', type=float, default=3, help='Seconds of load before measuring')
+        parser.add_argument('--pages', type=int, default=100, help='Requests spread over pages 1..N')
+        parser.add_argument('--path', default='/api/v1/movies/?page={page}')
+        parser.add_argument('--port', type=int, default=8111)
+
+    def start_server(self, replica_hosts, options):
+        env = dict(os.environ, DB_REPLICA_HOSTS=','.join(replica_hosts),
+                   CACHE_BACKEND='django.core.cache.backends.dummy.DummyCache',
+                   DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'config.settings.production'))
+        command = [part.format(workers=options['workers'], port=options['port']) for part in SERVERS['wsgi']]
+        try:
+            return subprocess.Popen(command, cwd=os.path.dirname(settings.BASE_DIR), env=env,
+                                    stdout=subprocess.DEVNULL, stderr=sys.stderr)
+        except FileNotFoundError:
+            raise CommandError(f'{command[0]} is not installed, see requirements/production.txt')
+
+    def handle(self, *args, **options):
+        hosts = [host.strip() for host in options['replica_hosts'].split(',') if host.strip()]
+        if not hosts:
+            raise CommandError('No replicas, pass --replica-hosts or set DB_REPLICA_HOSTS')
+        url = f'http://127.0.0.1:{options["port"]}'
+        paths = [options['path'].format(page=page) for page in range(1, options['pages'] + 1)]
+
+        baseline = None
+        for count in range(len(hosts) + 1):
+            process = self.start_server(hosts[:count], options)
+            try:
+                asyncio.run(wait_until_up(url))
+                if options['warmup']:
+                    asyncio.run(run_load(url, paths, options['concurrency'], options['warmup']))
+                result = asyncio.run(run_load(url, paths, options['concurrency'], options['duration']))
+            finally:
+                process.terminate()
+                process.wait()
+            baseline = baseline or result['rps']
+            scaling = f', {round(result["rps"] / baseline, 2)}x' if baseline else ''
+            self.stdout.write(
+                f'{count} replicas: {result["rps"]} requests/s{scaling}, p50 {result["p50_ms"]} ms, '
+                f'p99 {result["p99_ms"]} ms, {result["requests"]} requests, {result["errors"]} errors'
+            )
@@ -0,0 +1,31 @@
+from urllib.parse import urlencode
+
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIRequestFactory
+
+from api.v1.views import MovieViewSet
+from movies.models import FilmWork
+from utils.benchmark import format_result, measure, uncached
+
+MOVIES_URL = 'http://testserver/api/v1/movies/'
+DEFAULT_QUERIES = ['movie', 'serial 100', 'genre7', 'Иван']
+
+
+class Command(BaseCommand):
+    help = 'Measure latency of full text search on /api/v1/movies/?query='
+
+    def add_arguments(self, parser):
+        parser.add_argument('--queries', nargs='+', default=DEFAULT_QUERIES)
+        parser.add_argument('--per-page', type=int, default=50)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        view = MovieViewSet.as_view({'get': 'list'})
+        factory = APIRequestFactory()
+
+        self.stdout.write(f'{FilmWork.objects.count()} film works, {options["per_page"]} per page')
+        for text in options['queries']:
+            url = f'{MOVIES_URL}?{urlencode({"query": text, "per_page": options["per_page"]})}'
+            response = view(factory.get(url)).render()
+            result = measure(lambda: uncached(view, factory.get(url)), repeat=options['repeat'])
+            self.stdout.write(format_result(f'{text!r} ({response.data["count"]} results)', result))
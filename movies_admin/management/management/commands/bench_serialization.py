@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Prefetch
+from rest_framework.renderers import JSONRenderer
+
+from api.v1.serializer import MovieSerializer
+from movies.models import FilmWork, FilmWorkPerson, Genre
+from movies.rows import movie_rows
+from utils.benchmark import format_result, measure
+
+
+class Command(BaseCommand):
+    help = ('Compare serialization of movie pages from prefetch_related, plain instances batched by the '
+            'relation loader, and aggregated rows')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--per-page', type=int, default=50)
+        parser.add_argument('--pages', type=int, default=20)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        per_page = options['per_page']
+        pages = options['pages']
+        queryset = FilmWork.objects.order_by('created_at', 'id')
+        renderer = JSONRenderer()
+
+        # Plain prefetch_related leaves relation order to the database; order it
+        # by the through table id like movie_rows does so pages can be compared.
+        # FilmWork.actors, .directors and .writers read the prefetched cast.
+        through_table = FilmWork.genres.through._meta.db_table
+        prefetches = [
+            Prefetch('genres', queryset=Genre.objects.extra(order_by=[f'{through_table}.id'])),
+            Prefetch('cast', queryset=FilmWorkPerson.objects.select_related('person').order_by('id')),
+        ]
+
+        def prefetch_page(page):
+            items = queryset.prefetch_related(*prefetches)
+            items = items[page * per_page:(page + 1) * per_page]
+            return renderer.render(MovieSerializer(items, many=True).data)
+
+        def loader_page(page):
+            # A new context, so each page loads its relations again.
+            items = queryset[page * per_page:(page + 1) * per_page]
+            return renderer.render(MovieSerializer(items, many=True, context={}).data)
+
+        def rows_page(page):
+            items = movie_rows(queryset)[page * per_page:(page + 1) * per_page]
+            return renderer.render(MovieSerializer(items, many=True).data)
+
+        for page in range(pages):
+            rendered = rows_page(page)
+            if prefetch_page(page) != rendered or loader_page(page) != rendered:
+                raise CommandError(f'Page {page} differs between prefetch, loader and row serialization')
+        self.stdout.write(self.style.SUCCESS(f'{pages} pages of {per_page} are byte-identical'))
+
+        for name, render_page in (('prefetch', prefetch_page), ('loader', loader_page), ('rows', rows_page)):
+            result = measure(lambda: [render_page(page) for page in range(pages)], repeat=options['repeat'])
+            throughput = round(pages * per_page / result['median_ms'] * 1000)
+            self.stdout.write(format_result(f'{name:>8}', result) + f' for {pages} pages, {throughput} items/s')
@@ -0,0 +1,39 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from movies.models import ChangeEvent
+
+
+class Command(BaseCommand):
+    help = ('Delete change log events older than the retention period. The newest of them stays as a '
+            'compacted marker, so /api/v1/changes/ tells consumers that are further behind to sync again')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.CHANGE_LOG_RETENTION_DAYS)
+        parser.add_argument('--batch-size', type=int, default=10000,
+                            help='Events deleted per statement, each in its own transaction')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - datetime.timedelta(days=options['days'])
+        old = ChangeEvent.objects.filter(created_at__lt=cutoff).order_by('-created_at', '-id')
+        horizon = old.values_list('id', flat=True).first()
+        if horizon is None:
+            self.stdout.write(f'No events older than {options["days"]} days')
+            return
+
+        # Marked first: from now on readers behind it are sent to sync again,
+        # even while the events below are still being deleted.
+        ChangeEvent.objects.filter(id=horizon).update(
+            model='', object_id=None, action=ChangeEvent.Action.compacted, film_work_ids=[])
+        deleted = 0
+        while True:
+            ids = list(ChangeEvent.objects.filter(id__lt=horizon).order_by('id')
+                       .values_list('id', flat=True)[:options['batch_size']])
+            if not ids:
+                break
+            deleted += ChangeEvent.objects.filter(id__lte=ids[-1]).delete()[0]
+            self.stdout.write(f'{deleted} events deleted...')
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} events, the log starts at {horizon}'))
@@ -0,0 +1,42 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from etl.pipeline import ETLPipeline
+from etl.sinks import HttpBulkSink, JsonLinesSink
+from etl.state import JsonFileStorage, State
+
+
+class Command(BaseCommand):
+    help = 'Push changed film works to the search index sink and remove deleted ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sink', choices=['http', 'jsonl'], default='http')
+        parser.add_argument('--url', default=settings.ETL_SINK_URL)
+        parser.add_argument('--index', default=settings.ETL_INDEX)
+        parser.add_argument('--path', default='movies.jsonl', help='Output file of the jsonl sink')
+        parser.add_argument('--state-file', default=settings.ETL_STATE_FILE)
+        parser.add_argument('--batch-size', type=int, default=settings.ETL_BATCH_SIZE)
+        parser.add_argument('--interval', type=int, default=0,
+                            help='Repeat every N seconds instead of running once')
+
+    def handle(self, *args, **options):
+        if options['sink'] == 'http':
+            if not options['url']:
+                raise CommandError('Set ETL_SINK_URL or pass --url for the http sink')
+            sink = HttpBulkSink(options['url'], options['index'])
+        else:
+            sink = JsonLinesSink(options['path'])
+
+        state = State(JsonFileStorage(options['state_file']))
+        pipeline = ETLPipeline(sink, state, batch_size=options['batch_size'])
+        while True:
+            stats = pipeline.run()
+            self.stdout.write(self.style.SUCCESS(
+                f'{stats["documents"]} documents synced and {stats["deleted"]} deleted in {stats["seconds"]} s, '
+                f'{stats["documents_per_second"]} documents/s'
+            ))
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,167 @@
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from utils.benchmark import percentile
+
+SERVERS = {
+    'wsgi': ['gunicorn', 'config.wsgi:application', '--workers', '{workers}', '--bind', '127.0.0.1:{port}'],
+    'asgi': ['uvicorn', 'config.asgi:application', '--workers', '{workers}', '--port', '{port}',
+             '--no-access-log', '--lifespan', 'off'],
+}
+DEFAULT_PATHS = {
+    'wsgi': '/api/v1/movies/?page={page}',
+    'asgi': '/api/v1/async/movies/?page={page}',
+}
+
+
+async def read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('Connection closed')
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    if headers.get('transfer-encoding') == 'chunked':
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        await reader.readexactly(int(headers.get('content-length', 0)))
+    return status, headers.get('connection') == 'close'
+
+
+async def client(host, port, paths, deadline, latencies, errors):
+    # One keep-alive connection per simulated client, like a pooled HTTP client.
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        path = random.choice(paths)
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            start = time.perf_counter()
+            writer.write(f'GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\n\r\n'.encode())
+            status, closed = await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+            if closed:
+                writer.close()
+                writer = None
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+            errors.append('connection')
+            if writer is not None:
+                writer.close()
+            writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def run_load(url, paths, concurrency, duration):
+    parts = urlsplit(url)
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        client(parts.hostname, parts.port or 80, paths, deadline, latencies, errors) for _ in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - started
+    timings = [latency * 1000 for latency in latencies]
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(timings, 50), 1),
+        'p99_ms': round(percentile(timings, 99), 1),
+    }
+
+
+async def wait_until_up(url, timeout=30):
+    parts = urlsplit(url)
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            _, writer = await asyncio.open_connection(parts.hostname, parts.port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.2)
+    raise CommandError(f'Server at {url} did not start within {timeout} s')
+
+
+class Command(BaseCommand):
+    help = ('Compare requests per second and latency of the WSGI movie endpoints under gunicorn '
+            'with the async ones under uvicorn, at the same number of workers')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument('--concurrency', type=int, default=32, help='Simultaneous keep-alive clients')
+        parser.add_argument('--duration', type=float, default=15, help='Seconds per server')
+        parser.add_argument('--warmup', type=float, default=3, help='Seconds of load before measuring')
+        parser.add_argument('--pages', type=int, default=100, help='Requests spread over pages 1..N')
+        parser.add_argument('--wsgi-path', default=DEFAULT_PATHS['wsgi'])
+        parser.add_argument('--asgi-path', default=DEFAULT_PATHS['asgi'])
+        parser.add_argument('--wsgi-url', help='Use a running WSGI server instead of starting gunicorn')
+        parser.add_argument('--asgi-url', help='Use a running ASGI server instead of starting uvicorn')
+        parser.add_argument('--port', type=int, default=8101, help='First port of the started servers')
+        parser.add_argument('--with-cache', action='store_true',
+                            help='Keep the response cache of the WSGI endpoints; off by default so both '
+                                 'paths read the database')
+
+    def start_server(self, kind, port, options):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE',
+                                                                     'config.settings.production'))
+        if not options['with_cache']:
+            env['CACHE_BACKEND'] = 'django.core.cache.backends.dummy.DummyCache'
+        command = [part.format(workers=options['workers'], port=port) for part in SERVERS[kind]]
+        try:
+            # BASE_DIR is the config package, the servers run from the project root.
+            return subprocess.Popen(command, cwd=os.path.dirname(settings.BASE_DIR), env=env,
+                                    stdout=subprocess.DEVNULL, stderr=sys.stderr)
+        except FileNotFoundError:
+            raise CommandError(f'{command[0]} is not installed, see requirements/production.txt')
+
+    def handle(self, *args, **options):
+        results = {}
+        for offset, kind in enumerate(('wsgi', 'asgi')):
+            url = options[f'{kind}_url']
+            process = None
+            if not url:
+                port = options['port'] + offset
+                url = f'http://127.0.0.1:{port}'
+                process = self.start_server(kind, port, options)
+            try:
+                asyncio.run(wait_until_up(url))
+                paths = [options[f'{kind}_path'].format(page=page) for page in range(1, options['pages'] + 1)]
+                if options['warmup']:
+                    asyncio.run(run_load(url, paths, options['concurrency'], options['warmup']))
+                results[kind] = asyncio.run(run_load(url, paths, options['concurrency'], options['duration']))
+            finally:
+                if process is not None:
+                    process.terminate()
+                    process.wait()
+            result = results[kind]
+            self.stdout.write(
+                f'{kind}: {result["rps"]} requests/s, p50 {result["p50_ms"]} ms, p99 {result["p99_ms"]} ms, '
+                f'{result["requests"]} requests, {result["errors"]} errors'
+            )
+
+        if results['wsgi']['rps']:
+            self.stdout.write(self.style.SUCCESS(
+                f'asgi/wsgi: {round(results["asgi"]["rps"] / results["wsgi"]["rps"], 2)}x requests/s, '
+                f'p99 {results["asgi"]["p99_ms"]} vs {results["wsgi"]["p99_ms"]} ms'
+            ))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from movies.documents import render_documents
+from movies.models import FilmWork, FilmWorkDocument
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the denormalized FilmWorkDocument table from scratch'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        total = FilmWork.objects.count()
+        self.stdout.write(self.style.WARNING(f'Rebuilding {total} film work documents...'))
+
+        with transaction.atomic():
+            FilmWorkDocument.objects.all().delete()
+            ids = FilmWork.objects.order_by('id').values_list('id', flat=True)
+            last_id = None
+            done = 0
+            while True:
+                batch = ids.filter(id__gt=last_id) if last_id else ids
+                batch = list(batch[:batch_size])
+                if not batch:
+                    break
+                FilmWorkDocument.objects.bulk_create(render_documents(FilmWork.objects.filter(id__in=batch)))
+                last_id = batch[-1]
+                done += len(batch)
+                self.stdout.write(self.style.SUCCESS(f'{done}/{total} documents rebuilt...'))
+
+        self.stdout.write(self.style.SUCCESS('Documents rebuilt successfully'))
@@ -0,0 +1,202 @@
+import datetime
+import json
+import logging
+import platform
+import random
+import resource
+import sys
+import time
+import tracemalloc
+import uuid
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import override_settings
+
+from movies.catalog import bump_catalog_version
+from movies.factories import MovieFactory
+from movies.models import FilmWork, Genre, Person
+from utils.benchmark import compare_reports, latency_summary
+from utils.instrumentation import measured
+
+# film works, persons, genres
+DATASETS = {
+    '10k': (10000, 1000, 20),
+    '100k': (100000, 10000, 50),
+    '1m': (1000000, 100000, 100),
+}
+PER_PAGE = 50
+
+
+class Command(BaseCommand):
+    help = ('Seed a dataset of a given size, measure the API, admin and fixture loading, and write a JSON '
+            'report that can be compared with a baseline')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dataset', choices=list(DATASETS), default='10k')
+        parser.add_argument('--reset', action='store_true',
+                            help='Delete film works, persons and genres first if the catalog has another size')
+        parser.add_argument('--seed', type=int, default=123)
+        parser.add_argument('--workers', type=int, default=1, help='Processes of the bulk fixture load')
+        parser.add_argument('--repeat', type=int, default=20, help='Requests per scenario')
+        parser.add_argument('--pages', nargs='+', type=int, default=[1, 10, 100],
+                            help='List page depths, the last page is always added')
+        parser.add_argument('--factory-sample', type=int, default=50,
+                            help='Film works created with movies.factories, then rolled back')
+        parser.add_argument('--output', help='Write the JSON report to this file')
+        parser.add_argument('--baseline', help='Report to compare with, regressions fail the command')
+        parser.add_argument('--max-slowdown', type=float, default=1.25)
+        parser.add_argument('--min-delta-ms', type=float, default=2.0)
+
+    def handle(self, *args, **options):
+        film_works, persons, genres = DATASETS[options['dataset']]
+        results = {}
+        seed = self.seed(options, film_works, persons, genres)
+        if seed is not None:
+            results['fixtures_bulk_load'] = seed
+        results['fixtures_factories'] = self.factory_load(options['factory_sample'])
+
+        user = get_user_model().objects.create_superuser(f'bench-{uuid.uuid4().hex[:8]}', password=None)
+        # Every request is sampled; their log lines would drown the report.
+        logger = logging.getLogger('utils.instrumentation')
+        level = logger.level
+        logger.setLevel(logging.ERROR)
+        try:
+            with override_settings(CACHES={'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': 'run_benchmarks',
+            }}):
+                results.update(self.requests(options, user))
+        finally:
+            logger.setLevel(level)
+            user.delete()
+
+        report = {
+            'meta': {
+                'dataset': options['dataset'],
+                'vendor': connection.vendor,
+                'film_works': FilmWork.objects.count(),
+                'persons': Person.objects.count(),
+                'genres': Genre.objects.count(),
+                'repeat': options['repeat'],
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                # Kilobytes on Linux, bytes on macOS.
+                'max_rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            },
+            'results': results,
+        }
+        for name, result in results.items():
+            self.stdout.write(f'{name}: ' + ', '.join(f'{key} {value}' for key, value in result.items()))
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump(report, file, indent=2)
+            self.stdout.write(f'Report written to {options["output"]}')
+
+        if options['baseline']:
+            with open(options['baseline']) as file:
+                baseline = json.load(file)
+            if baseline['meta']['dataset'] != report['meta']['dataset'] or \
+                    baseline['meta']['vendor'] != report['meta']['vendor']:
+                raise CommandError(f'The baseline is for {baseline["meta"]["dataset"]} on '
+                                   f'{baseline["meta"]["vendor"]}, not {options["dataset"]} on {connection.vendor}')
+            regressions = compare_reports(baseline, report, options['max_slowdown'], options['min_delta_ms'])
+            if regressions:
+                raise CommandError('Regressions against the baseline:\n' + '\n'.join(regressions))
+            self.stdout.write(self.style.SUCCESS(f'No regressions against {options["baseline"]}'))
+
+    def seed(self, options, film_works, persons, genres):
+        existing = FilmWork.objects.count()
+        if existing == film_works:
+            self.stdout.write(f'Reusing the {existing} film works in the database')
+            return None
+        if existing or Person.objects.exists() or Genre.objects.exists():
+            if not options['reset']:
+                raise CommandError(f'The catalog has {existing} film works, not {film_works}; '
+                                   f'pass --reset to delete it and seed again')
+            self.reset()
+
+        started = time.perf_counter()
+        # Users are left out: their generated names would clash on a reseed.
+        call_command('add_fixtures', bulk=True, users=0, genres=genres, persons=persons, film_works=film_works,
+                     seed=options['seed'], workers=options['workers'], copy=True, stdout=sys.stderr)
+        seconds = time.perf_counter() - started
+        return {'seconds': round(seconds, 2), 'film_works_per_s': round(film_works / seconds)}
+
+    def reset(self):
+        if connection.vendor == 'postgresql':
+            tables = ', '.join(model._meta.db_table for model in (FilmWork, Person, Genre))
+            with connection.cursor() as cursor:
+                cursor.execute(f'TRUNCATE {tables} CASCADE')
+            return
+        for model in (FilmWork, Person, Genre):
+            model.objects.all().delete()
+
+    def factory_load(self, count):
+        genres = list(Genre.objects.all()[:20])
+        persons = list(Person.objects.all()[:100])
+        with transaction.atomic():
+            started = time.perf_counter()
+            for _ in range(count):
+                MovieFactory(
+                    genres=random.sample(genres, min(len(genres), 3)),
+                    actors=random.sample(persons, min(len(persons), 10)),
+                    writers=random.sample(persons, min(len(persons), 2)),
+                    directors=random.sample(persons, min(len(persons), 1)),
+                )
+            seconds = time.perf_counter() - started
+            transaction.set_rollback(True)
+        return {'seconds': round(seconds, 3), 'film_works_per_s': round(count / seconds)}
+
+    def scenarios(self, options):
+        last_page = max(1, -(-FilmWork.objects.count() // PER_PAGE))
+        pages = sorted({page for page in options['pages'] if page <= last_page} | {last_page})
+        for page in pages:
+            yield f'api_list_page_{page}', False, [f'/api/v1/movies/?page={page}']
+        film_work_ids = FilmWork.objects.order_by('id').values_list('id', flat=True)
+        step = max(1, FilmWork.objects.count() // options['repeat'])
+        ids = [film_work_ids[index] for index in range(0, step * options['repeat'], step)]
+        yield 'api_retrieve', False, [f'/api/v1/movies/{film_work_id}/' for film_work_id in ids]
+        for model in ('filmwork', 'person', 'genre'):
+            yield f'admin_{model}_changelist', True, [f'/admin/movies/{model}/']
+
+    def run(self, client, paths, repeat):
+        # Responses would come from the cache after the first run. A new
+        # catalog version misses them but keeps the per-process caches of a
+        # running server warm.
+        def request(number):
+            bump_catalog_version()
+            return measured(client, paths[number % len(paths)])
+
+        request(0)
+        timings = []
+        queries = 0
+        db = []
+        for number in range(repeat):
+            metrics = request(number)
+            if metrics.status != 200:
+                raise CommandError(f'{paths[number % len(paths)]} answered {metrics.status}')
+            timings.append(metrics.total_seconds * 1000)
+            db.append(metrics.db_seconds * 1000)
+            queries = max(queries, metrics.queries)
+
+        tracemalloc.start()
+        request(0)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return dict(latency_summary(timings), queries=queries, db_p50_ms=latency_summary(db)['p50_ms'],
+                    peak_kib=round(peak / 1024))
+
+    def requests(self, options, user):
+        anonymous, admin = Client(), Client()
+        admin.force_login(user)
+        results = {}
+        for name, needs_admin, paths in self.scenarios(options):
+            results[name] = self.run(admin if needs_admin else anonymous, paths, options['repeat'])
+        admin.logout()
+        return results
@@ -1,25 +1,54 @@
+import uuid
+
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
 
-from movies.models import FilmWork, Genre, Person
+from movies.admin_cast import (CastInlineForm, CastInlineFormSet, PrefetchedAutocompleteSelect,
+                               PrefetchedModelChoiceField)
+from movies.admin_filters import RatingFilter, autocomplete_filter, autocomplete_filter_media
+from movies.models import FilmWork, FilmWorkPerson, Genre, Person, Role
+from movies.reference import role_cache
+from utils.counting import EstimatedCountPaginator
 
 
-class DirectorsInline(admin.TabularInline):
-    model = FilmWork.directors.through
+class CastInline(admin.TabularInline):
+    model = FilmWorkPerson
+    fields = ('person',)
+    role = None
     extra = 0
+    autocomplete_fields = ('person',)
+    form = CastInlineForm
+    formset = CastInlineFormSet
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == 'person':
+            kwargs['form_class'] = PrefetchedModelChoiceField
+            kwargs['widget'] = PrefetchedAutocompleteSelect(db_field, self.admin_site, using=kwargs.get('using'))
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).filter(role=self.role)
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        formset.role = self.role
+        return formset
+
+
+class DirectorsInline(CastInline):
+    role = Role.PersonRole.director
     verbose_name = "режиссер"
     verbose_name_plural = "режиссеры"
 
 
-class WritersInline(admin.TabularInline):
-    model = FilmWork.writers.through
-    extra = 0
+class WritersInline(CastInline):
+    role = Role.PersonRole.writer
     verbose_name = "сценарист"
     verbose_name_plural = "сценаристы"
 
 
-class ActorsInline(admin.TabularInline):
-    model = FilmWork.actors.through
-    extra = 0
+class ActorsInline(CastInline):
+    role = Role.PersonRole.actor
     verbose_name = "актер"
     verbose_name_plural = "актеры"
 
@@ -34,11 +63,12 @@ class FilmWorkAdmin(admin.ModelAdmin):
         }),
         ('Advanced options', {
             'classes': ('collapse',),
-            'fields': ('age_qualification', 'file_path', 'rating', 'writers', 'genres', 'directors', 'actors'),
+            'fields': ('age_qualification', 'file_path', 'rating', 'genres'),
         }),
     )
 
-    raw_id_fields = ('genres', 'writers', 'directors', 'actors')
+    # The cast is edited in the inlines only.
+    autocomplete_fields = ('genres',)
 
     inlines = [
         DirectorsInline,
@@ -46,19 +76,71 @@ class FilmWorkAdmin(admin.ModelAdmin):
         ActorsInline
     ]
 
-    list_filter = ('type', 'age_qualification', 'directors', 'actors', 'writers', 'rating',)
-    search_fields = ('title', 'description', 'id',)
+    list_filter = (
+        'type',
+        'age_qualification',
+        autocomplete_filter('persons', 'режиссер', 'directors__id', role=Role.PersonRole.director),
+        autocomplete_filter('persons', 'актер', 'actors__id', role=Role.PersonRole.actor),
+        autocomplete_filter('persons', 'сценарист', 'writers__id', role=Role.PersonRole.writer),
+        RatingFilter,
+    )
+    search_fields = ('title', 'description',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    # Checked by api.tests.test_query_budgets.
+    query_budgets = {'changelist': 4, 'change': 12}
+
+    @property
+    def media(self):
+        return super().media + autocomplete_filter_media(FilmWork._meta.get_field('persons'), self.admin_site)
+
+    def get_search_results(self, request, queryset, search_term):
+        # An id is matched exactly: icontains on the uuid column can not use
+        # an index and would turn the trigram searches into a full scan.
+        try:
+            film_work_id = uuid.UUID(search_term.strip())
+        except ValueError:
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(pk=film_work_id), False
+
+
+class PersonChangeList(ChangeList):
+
+    def get_results(self, request):
+        super().get_results(request)
+        # One query on the through table for the roles of the whole page,
+        # titles from the reference cache. Prefetching roles would join the
+        # role table for every page.
+        persons = list(self.result_list)
+        role_ids = {person.pk: [] for person in persons}
+        through = Person.roles.through.objects.filter(person_id__in=role_ids).order_by('id')
+        for person_id, role_id in through.values_list('person_id', 'role_id'):
+            role_ids[person_id].append(role_id)
+        titles = role_cache.titles({role_id for ids in role_ids.values() for role_id in ids})
+        for person in persons:
+            person.role_titles = [titles[role_id] for role_id in role_ids[person.pk] if role_id in titles]
 
 
 @admin.register(Person)
 class PersonAdmin(admin.ModelAdmin):
     list_display = ('first_name', 'last_name', 'get_roles')
+    search_fields = ('first_name', 'last_name',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    query_budgets = {'changelist': 6, 'change': 6}
+
+    def get_changelist(self, request, **kwargs):
+        # An ARRAY_AGG annotation would turn the changelist count and OFFSET
+        # into GROUP BY queries, so roles are loaded per page instead.
+        return PersonChangeList
 
     def get_roles(self, obj):
-        return ",\n".join([role.title for role in obj.roles.all()])
+        return ",\n".join(obj.role_titles)
 
 
 @admin.register(Genre)
 class GenreAdmin(admin.ModelAdmin):
     list_display = ('title', 'description',)
     search_fields = ('title', 'description',)
+    show_full_result_count = False
+    query_budgets = {'changelist': 4, 'change': 4}
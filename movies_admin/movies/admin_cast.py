@@ -0,0 +1,156 @@
+from django import forms
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.forms.models import BaseInlineFormSet
+from django.utils.functional import cached_property
+
+
+class PrefetchedAutocompleteSelect(AutocompleteSelect):
+    """
+    AutocompleteSelect that takes the label of the selected option from
+    labels prefetched by the formset. The stock widget runs one query per
+    rendered row to find it.
+    """
+    labels = None
+
+    def optgroups(self, name, value, attr=None):
+        selected = [str(v) for v in value if str(v) not in self.choices.field.empty_values]
+        if self.labels is None or any(v not in self.labels for v in selected):
+            return super().optgroups(name, value, attr)
+        options = []
+        if not self.is_required and not self.allow_multiple_selected:
+            options.append(self.create_option(name, '', '', False, 0))
+        for index, option_value in enumerate(selected, start=len(options)):
+            options.append(self.create_option(name, option_value, self.labels[option_value], True, index))
+        return [(None, options, 0)]
+
+
+class PrefetchedModelChoiceField(forms.ModelChoiceField):
+    """
+    ModelChoiceField that resolves submitted values from objects prefetched
+    by the formset instead of one query per row.
+    """
+    objects = None
+
+    def to_python(self, value):
+        if self.objects is not None and str(value) in self.objects:
+            return self.objects[str(value)]
+        return super().to_python(value)
+
+
+class CastInlineForm(forms.ModelForm):
+    def _get_validation_exclusions(self):
+        # The person field has already resolved the person, so the existence
+        # check in ForeignKey.validate would only repeat a query per row.
+        return super()._get_validation_exclusions() + ['person']
+
+    def validate_unique(self):
+        # CastInlineFormSet.validate_unique checks the whole cast at once.
+        # The per row check would run a query per row and reject swapping
+        # two persons, which the diff in CastInlineFormSet.save allows.
+        pass
+
+
+class CastInlineFormSet(BaseInlineFormSet):
+    """
+    Formset over a film work to person through table.
+
+    Every person and through row shown or submitted is loaded once. The cast
+    is saved as a diff: removed and replaced rows go in one DELETE, and added
+    and replaced rows go in one bulk_create, instead of a query per row.
+    """
+    person_field = 'person'
+    # Set by CastInline when the through table keeps every role.
+    role = None
+
+    @cached_property
+    def persons(self):
+        field = self.model._meta.get_field(self.person_field)
+        ids = {obj.person_id for obj in self.get_queryset()}
+        if self.is_bound:
+            for i in range(self.total_form_count()):
+                value = self.data.get(f'{self.add_prefix(i)}-{self.person_field}')
+                try:
+                    value = field.target_field.to_python(value)
+                except ValidationError:
+                    continue
+                if value:
+                    ids.add(value)
+        persons = field.remote_field.model._default_manager.in_bulk(ids)
+        return {str(pk): person for pk, person in persons.items()}
+
+    @cached_property
+    def existing_objects(self):
+        return {str(obj.pk): obj for obj in self.get_queryset()}
+
+    @cached_property
+    def person_labels(self):
+        field = self.form.base_fields[self.person_field]
+        return {pk: field.label_from_instance(person) for pk, person in self.persons.items()}
+
+    def add_fields(self, form, index):
+        super().add_fields(form, index)
+        # The hidden primary key field would otherwise fetch its row again.
+        pk_name = self.model._meta.pk.name
+        pk_field = form.fields[pk_name]
+        form.fields[pk_name] = PrefetchedModelChoiceField(
+            pk_field.queryset, initial=pk_field.initial, required=False, widget=pk_field.widget)
+        form.fields[pk_name].objects = self.existing_objects
+
+        field = form.fields[self.person_field]
+        if isinstance(field, PrefetchedModelChoiceField):
+            field.objects = self.persons
+        widget = getattr(field.widget, 'widget', field.widget)
+        if isinstance(widget, PrefetchedAutocompleteSelect):
+            widget.labels = self.person_labels
+
+    def validate_unique(self):
+        # The cast as it will be saved: a person may move between rows, but
+        # not be in the role twice, which the unique constraint would reject.
+        persons = set()
+        duplicate = False
+        for form in self.forms:
+            if not form.is_valid() or (self.can_delete and self._should_delete_form(form)):
+                continue
+            person = form.cleaned_data.get(self.person_field)
+            if person is None:
+                continue
+            if person.pk in persons:
+                duplicate = True
+                form._errors[NON_FIELD_ERRORS] = self.error_class([self.get_form_error()])
+                del form.cleaned_data[self.person_field]
+            persons.add(person.pk)
+        if duplicate:
+            raise ValidationError(self.get_unique_error_message([self.person_field]))
+
+    def save(self, commit=True):
+        if not commit:
+            return super().save(commit=commit)
+
+        self.new_objects, self.changed_objects, self.deleted_objects = [], [], []
+        delete_ids = []
+        for form in self.initial_forms:
+            obj = form.instance
+            if obj.pk is None:
+                continue
+            if self.can_delete and self._should_delete_form(form):
+                delete_ids.append(obj.pk)
+                self.deleted_objects.append(obj)
+            elif form.has_changed():
+                # A replaced person is a new row, the old one is deleted.
+                delete_ids.append(obj.pk)
+                obj.pk = None
+                self.changed_objects.append((obj, form.changed_data))
+        for form in self.extra_forms:
+            if not form.has_changed() or (self.can_delete and self._should_delete_form(form)):
+                continue
+            if self.role:
+                form.instance.role = self.role
+            self.new_objects.append(form.instance)
+
+        if delete_ids:
+            self.model._default_manager.filter(pk__in=delete_ids).delete()
+        objects = [obj for obj, _ in self.changed_objects] + self.new_objects
+        if objects:
+            self.model._default_manager.bulk_create(objects)
+        return objects
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class MoviesConfig(AppConfig):
     name = 'movies'
+
+    def ready(self):
+        from movies import checks, signals  # noqa: F401
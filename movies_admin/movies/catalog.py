@@ -0,0 +1,59 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+
+from movies.models import FilmWork
+
+CATALOG_VERSION_KEY = 'movies:catalog:version'
+CATALOG_CHANGED_AT_KEY = 'movies:catalog:changed_at'
+
+
+def catalog_version():
+    """
+    A counter bumped on every change of film works, persons, genres or their
+    relations. Cached API responses are keyed by it, so invalidating all of
+    them is a single increment.
+    """
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        # Start from the clock, so a counter lost to eviction or a restart
+        # never repeats a version that is still cached somewhere.
+        cache.add(CATALOG_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def bump_catalog_version():
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        catalog_version()
+    cache.set(CATALOG_CHANGED_AT_KEY, time.time(), None)
+
+
+def catalog_changed_at():
+    # Unix time of the last bump, 0 if unknown. See utils.replicas and
+    # api.v1.caching.
+    return cache.get(CATALOG_CHANGED_AT_KEY, 0)
+
+
+def schedule_bump():
+    # After commit, otherwise a concurrent request could cache the old rows
+    # under the new version.
+    transaction.on_commit(bump_catalog_version)
+
+
+def genre_film_counts(version, using='default'):
+    """
+    {genre id: number of film works}, counted for every genre with one
+    GROUP BY over the through table once per version.
+    """
+    def film_counts():
+        through = FilmWork.genres.through.objects.using(using)
+        return dict(through.order_by().values('genre_id').annotate(count=Count('id')).values_list('genre_id', 'count'))
+
+    return cache.get_or_set(f'movies:catalog:{version}:genre_film_counts:{using}', film_counts,
+                            settings.MOVIES_CACHE_TIMEOUT)
@@ -0,0 +1,27 @@
+from movies.models import ChangeEvent
+
+
+def record_changes(events, using='default'):
+    """
+    Appends (model name, object id, action, film work ids) events to the
+    change log, in the transaction of the change they describe.
+
+    A sequence would hand ids out in insert order, not in commit order: a
+    consumer could read id 11 and skip a later committed 10. On PostgreSQL
+    events are therefore inserted with a negative placeholder id and
+    numbered when their transaction commits, under an advisory lock held
+    only to the end of the commit (migration 0011). Until then the
+    transaction sees its own events under their placeholder ids. SQLite
+    runs one write transaction at a time, so insert order is commit order.
+    """
+    events = [ChangeEvent(model=model, object_id=object_id, action=action,
+                          film_work_ids=sorted(str(pk) for pk in film_work_ids))
+              for model, object_id, action, film_work_ids in events]
+    if not events:
+        return
+    ChangeEvent.objects.using(using).bulk_create(events)
+
+
+def record_change(instance, action, film_work_ids=()):
+    record_changes([(instance._meta.model_name, instance.pk, action, film_work_ids)],
+                   using=instance._state.db or 'default')
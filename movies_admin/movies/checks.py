@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+# Backends whose entries are only seen by the process that wrote them.
+PROCESS_LOCAL_CACHES = ('django.core.cache.backends.locmem.LocMemCache',)
+
+
+@register()
+def shared_cache_check(app_configs, **kwargs):
+    """
+    The catalog version (movies.catalog) and the reference cache versions
+    (movies.reference) live in the default cache. Unless every process sees
+    the same cache, a write bumps the version of its own process only and
+    the others keep serving cached responses for MOVIES_CACHE_TIMEOUT, and
+    answering 304 to the ETags derived from their old version.
+    """
+    if settings.DEBUG:
+        return []
+    if settings.CACHES['default']['BACKEND'] not in PROCESS_LOCAL_CACHES:
+        return []
+    return [Warning(
+        'The default cache is local to each process, so workers and management commands do not see '
+        'each other\'s catalog version bumps.',
+        hint='Point CACHE_BACKEND/CACHE_LOCATION at a cache shared by all processes (e.g. memcached), '
+             'or run a single worker and no other process that writes to the catalog.',
+        id='movies.W001',
+    )]
@@ -0,0 +1,67 @@
+import json
+from functools import partial
+from threading import local
+
+from django.conf import settings
+from django.db import transaction
+
+from movies.models import FilmWork, FilmWorkDocument
+from movies.rows import MovieRowSerializer, movie_rows
+
+# {alias: film work ids} waiting for the transaction of the connection to
+# commit. Django connections belong to a thread, and so does this.
+_pending = local()
+
+
+def documents_enabled():
+    return getattr(settings, 'FILM_WORK_DOCUMENTS', False)
+
+
+def render_documents(film_works):
+    serializer = MovieRowSerializer()
+    # Genre titles from the database: a rename re-renders its film works
+    # before the reference cache is invalidated on commit.
+    for row in movie_rows(film_works, cached_titles=False):
+        payload = json.dumps(serializer.to_representation(row), ensure_ascii=False, separators=(',', ':'))
+        yield FilmWorkDocument(film_work_id=row['id'], payload=payload)
+
+
+def refresh_documents(film_work_ids, using='default'):
+    film_work_ids = list(film_work_ids)
+    with transaction.atomic(using=using):
+        FilmWorkDocument.objects.using(using).filter(film_work_id__in=film_work_ids).delete()
+        FilmWorkDocument.objects.using(using).bulk_create(
+            render_documents(FilmWork.objects.using(using).filter(id__in=film_work_ids)))
+
+
+def pending_ids(using):
+    if not hasattr(_pending, 'ids'):
+        _pending.ids = {}
+    return _pending.ids.setdefault(using, set())
+
+
+def refresh_pending(using):
+    ids = pending_ids(using)
+    if ids:
+        film_work_ids = set(ids)
+        ids.clear()
+        refresh_documents(film_work_ids, using)
+
+
+def schedule_refresh(film_work_ids, using='default'):
+    """
+    Collects film works touched in the current transaction and re-renders
+    them once on commit, so a change form saving a whole cast costs one refresh.
+
+    Every call registers a callback, as one registered in a savepoint that
+    is rolled back would be lost. The first to run refreshes all of them.
+    Ids of a rolled back transaction wait for the next commit, when they
+    are re-rendered as they are.
+    """
+    if not documents_enabled() or not film_work_ids:
+        return
+    if not transaction.get_connection(using).in_atomic_block:
+        refresh_documents(film_work_ids, using)
+        return
+    pending_ids(using).update(film_work_ids)
+    transaction.on_commit(partial(refresh_pending, using), using=using)
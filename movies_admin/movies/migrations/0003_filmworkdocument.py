@@ -0,0 +1,26 @@
+# Generated by Django 3.2 on 2026-10-18 18:08
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0002_add_roles'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FilmWorkDocument',
+            fields=[
+                ('film_work', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='document', serialize=False, to='movies.filmwork')),
+                ('payload', models.TextField(verbose_name='документ')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'документ кинопроизведения',
+                'verbose_name_plural': 'документы кинопроизведений',
+            },
+        ),
+    ]
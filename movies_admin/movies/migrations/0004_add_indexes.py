@@ -0,0 +1,100 @@
+from django.db import migrations, models
+
+# CREATE INDEX CONCURRENTLY cannot run inside a transaction, so this
+# migration is not atomic and can be applied to a live database.
+
+INDEXES = [
+    ('filmwork', models.Index(fields=['created_at', 'id'], name='film_work_created_id_idx')),
+    ('filmwork', models.Index(fields=['updated_at', 'id'], name='film_work_updated_id_idx')),
+    ('filmwork', models.Index(fields=['rating', 'id'], name='film_work_rating_id_idx')),
+    ('filmwork', models.Index(fields=['creation_date', 'id'], name='film_work_creation_id_idx')),
+    ('filmwork', models.Index(fields=['title', 'id'], name='film_work_title_id_idx')),
+    ('filmwork', models.Index(fields=['type', 'rating'], name='film_work_type_rating_idx')),
+    ('person', models.Index(fields=['last_name', 'first_name'], name='person_name_idx')),
+    ('person', models.Index(fields=['updated_at', 'id'], name='person_updated_id_idx')),
+    ('genre', models.Index(fields=['updated_at', 'id'], name='genre_updated_id_idx')),
+]
+
+# Django compiles icontains to UPPER(column::text) LIKE UPPER(%s) on
+# PostgreSQL, so the trigram indexes are built over UPPER(column).
+TRIGRAM_INDEXES = [
+    ('film_work_title_trgm_idx', 'movies_filmwork', 'title'),
+    ('film_work_description_trgm_idx', 'movies_filmwork', 'description'),
+    ('person_first_name_trgm_idx', 'movies_person', 'first_name'),
+    ('person_last_name_trgm_idx', 'movies_person', 'last_name'),
+]
+
+# The person side of the through tables only has a single column index on
+# person_id, the film side is covered by the (filmwork_id, person_id) unique.
+THROUGH_INDEXES = [
+    ('filmwork_actors_person_fw_idx', 'movies_filmwork_actors'),
+    ('filmwork_directors_person_fw_idx', 'movies_filmwork_directors'),
+    ('filmwork_writers_person_fw_idx', 'movies_filmwork_writers'),
+]
+
+
+def is_postgresql(schema_editor):
+    return schema_editor.connection.vendor == 'postgresql'
+
+
+def add_indexes(apps, schema_editor):
+    for model_name, index in INDEXES:
+        model = apps.get_model('movies', model_name)
+        if is_postgresql(schema_editor):
+            schema_editor.add_index(model, index, concurrently=True)
+        else:
+            schema_editor.add_index(model, index)
+
+
+def remove_indexes(apps, schema_editor):
+    for model_name, index in INDEXES:
+        model = apps.get_model('movies', model_name)
+        if is_postgresql(schema_editor):
+            schema_editor.remove_index(model, index, concurrently=True)
+        else:
+            schema_editor.remove_index(model, index)
+
+
+def add_raw_indexes(apps, schema_editor):
+    concurrently = 'CONCURRENTLY ' if is_postgresql(schema_editor) else ''
+    for name, table in THROUGH_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX {concurrently}IF NOT EXISTS {name} ON {table} (person_id, filmwork_id)'
+        )
+    if not is_postgresql(schema_editor):
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} USING gin (UPPER({column}) gin_trgm_ops)'
+        )
+
+
+def remove_raw_indexes(apps, schema_editor):
+    concurrently = 'CONCURRENTLY ' if is_postgresql(schema_editor) else ''
+    names = [name for name, _ in THROUGH_INDEXES]
+    if is_postgresql(schema_editor):
+        names += [name for name, _, _ in TRIGRAM_INDEXES]
+    for name in names:
+        schema_editor.execute(f'DROP INDEX {concurrently}IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('movies', '0003_filmworkdocument'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name=model_name, index=index) for model_name, index in INDEXES
+            ],
+            database_operations=[
+                migrations.RunPython(add_indexes, remove_indexes),
+            ],
+        ),
+        migrations.RunPython(add_raw_indexes, remove_raw_indexes),
+    ]
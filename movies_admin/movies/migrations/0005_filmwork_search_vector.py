@@ -0,0 +1,195 @@
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+SEARCH_INDEX = django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='film_work_search_vector_idx')
+
+# Title is weighted A, description B, genre titles and person names C. Every
+# part is indexed with both the russian and the english configuration.
+CREATE_TRIGGERS = '''
+CREATE OR REPLACE FUNCTION movies_filmwork_text_vector(title text, description text) RETURNS tsvector AS $$
+    SELECT setweight(to_tsvector('russian', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('russian', coalesce(description, '')), 'B')
+        || setweight(to_tsvector('english', coalesce(description, '')), 'B')
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION movies_filmwork_names_vector(film_work_id uuid) RETURNS tsvector AS $$
+    SELECT setweight(to_tsvector('russian', coalesce(string_agg(name, ' '), '')), 'C')
+        || setweight(to_tsvector('english', coalesce(string_agg(name, ' '), '')), 'C')
+    FROM (
+        SELECT g.title AS name FROM movies_filmwork_genres t
+            JOIN movies_genre g ON g.id = t.genre_id WHERE t.filmwork_id = film_work_id
+        UNION ALL
+        SELECT p.first_name || ' ' || coalesce(p.last_name, '') FROM movies_filmwork_actors t
+            JOIN movies_person p ON p.id = t.person_id WHERE t.filmwork_id = film_work_id
+        UNION ALL
+        SELECT p.first_name || ' ' || coalesce(p.last_name, '') FROM movies_filmwork_directors t
+            JOIN movies_person p ON p.id = t.person_id WHERE t.filmwork_id = film_work_id
+        UNION ALL
+        SELECT p.first_name || ' ' || coalesce(p.last_name, '') FROM movies_filmwork_writers t
+            JOIN movies_person p ON p.id = t.person_id WHERE t.filmwork_id = film_work_id
+    ) names
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION movies_filmwork_search_vector_trigger() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := movies_filmwork_text_vector(NEW.title, NEW.description)
+        || movies_filmwork_names_vector(NEW.id);
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION movies_filmwork_refresh_search_vector(film_work_ids uuid[]) RETURNS void AS $$
+    UPDATE movies_filmwork
+    SET search_vector = movies_filmwork_text_vector(title, description) || movies_filmwork_names_vector(id)
+    WHERE id = ANY(film_work_ids)
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION movies_through_search_vector_trigger() RETURNS trigger AS $$
+BEGIN
+    PERFORM movies_filmwork_refresh_search_vector(ARRAY(SELECT DISTINCT filmwork_id FROM changed));
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION movies_person_search_vector_trigger() RETURNS trigger AS $$
+BEGIN
+    PERFORM movies_filmwork_refresh_search_vector(ARRAY(
+        SELECT filmwork_id FROM movies_filmwork_actors WHERE person_id IN (SELECT id FROM changed)
+        UNION SELECT filmwork_id FROM movies_filmwork_directors WHERE person_id IN (SELECT id FROM changed)
+        UNION SELECT filmwork_id FROM movies_filmwork_writers WHERE person_id IN (SELECT id FROM changed)
+    ));
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION movies_genre_search_vector_trigger() RETURNS trigger AS $$
+BEGIN
+    PERFORM movies_filmwork_refresh_search_vector(ARRAY(
+        SELECT DISTINCT filmwork_id FROM movies_filmwork_genres WHERE genre_id IN (SELECT id FROM changed)
+    ));
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER movies_filmwork_search_vector
+    BEFORE INSERT OR UPDATE OF title, description ON movies_filmwork
+    FOR EACH ROW EXECUTE FUNCTION movies_filmwork_search_vector_trigger();
+
+CREATE TRIGGER movies_person_search_vector
+    AFTER UPDATE ON movies_person REFERENCING NEW TABLE AS changed
+    FOR EACH STATEMENT EXECUTE FUNCTION movies_person_search_vector_trigger();
+
+CREATE TRIGGER movies_genre_search_vector
+    AFTER UPDATE ON movies_genre REFERENCING NEW TABLE AS changed
+    FOR EACH STATEMENT EXECUTE FUNCTION movies_genre_search_vector_trigger();
+'''
+
+# Statement level triggers with transition tables, so adding a whole cast
+# refreshes each film work once. PostgreSQL allows a single event per
+# trigger when transition tables are used.
+THROUGH_TABLES = ('movies_filmwork_genres', 'movies_filmwork_actors',
+                  'movies_filmwork_directors', 'movies_filmwork_writers')
+CREATE_THROUGH_TRIGGER = '''
+CREATE TRIGGER {table}_search_vector_{event}
+    AFTER {event} ON {table} REFERENCING {transition} TABLE AS changed
+    FOR EACH STATEMENT EXECUTE FUNCTION movies_through_search_vector_trigger();
+'''
+
+BACKFILL_BATCH_SIZE = 1000
+BACKFILL_IDS = 'SELECT id FROM movies_filmwork WHERE id > %s ORDER BY id LIMIT %s'
+BACKFILL_BATCH = '''
+UPDATE movies_filmwork
+SET search_vector = movies_filmwork_text_vector(title, description) || movies_filmwork_names_vector(id)
+WHERE id = ANY(%s) AND search_vector IS NULL
+'''
+
+DROP_TRIGGERS = '''
+DROP TRIGGER IF EXISTS movies_filmwork_search_vector ON movies_filmwork;
+DROP TRIGGER IF EXISTS movies_person_search_vector ON movies_person;
+DROP TRIGGER IF EXISTS movies_genre_search_vector ON movies_genre;
+DROP FUNCTION IF EXISTS movies_genre_search_vector_trigger();
+DROP FUNCTION IF EXISTS movies_person_search_vector_trigger();
+DROP FUNCTION IF EXISTS movies_through_search_vector_trigger();
+DROP FUNCTION IF EXISTS movies_filmwork_refresh_search_vector(uuid[]);
+DROP FUNCTION IF EXISTS movies_filmwork_search_vector_trigger();
+DROP FUNCTION IF EXISTS movies_filmwork_names_vector(uuid);
+DROP FUNCTION IF EXISTS movies_filmwork_text_vector(text, text);
+'''
+
+
+def is_postgresql(schema_editor):
+    return schema_editor.connection.vendor == 'postgresql'
+
+
+def create_triggers(apps, schema_editor):
+    if not is_postgresql(schema_editor):
+        return
+    schema_editor.execute(CREATE_TRIGGERS)
+    for table in THROUGH_TABLES:
+        for event, transition in (('insert', 'NEW'), ('delete', 'OLD')):
+            schema_editor.execute(CREATE_THROUGH_TRIGGER.format(table=table, event=event, transition=transition))
+
+
+def backfill_search_vectors(apps, schema_editor):
+    # Outside a transaction, one batch of primary keys at a time: a single
+    # UPDATE would lock every film work until the whole table is done. Rows
+    # written meanwhile get their vector from the triggers.
+    if not is_postgresql(schema_editor):
+        return
+    last_id = '00000000-0000-0000-0000-000000000000'
+    with schema_editor.connection.cursor() as cursor:
+        while True:
+            cursor.execute(BACKFILL_IDS, [last_id, BACKFILL_BATCH_SIZE])
+            ids = [row[0] for row in cursor.fetchall()]
+            if not ids:
+                break
+            cursor.execute(BACKFILL_BATCH, [ids])
+            last_id = ids[-1]
+
+
+def drop_triggers(apps, schema_editor):
+    if not is_postgresql(schema_editor):
+        return
+    for table in THROUGH_TABLES:
+        for event in ('insert', 'delete'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {table}_search_vector_{event} ON {table}')
+    schema_editor.execute(DROP_TRIGGERS)
+
+
+def add_search_index(apps, schema_editor):
+    if is_postgresql(schema_editor):
+        schema_editor.add_index(apps.get_model('movies', 'filmwork'), SEARCH_INDEX, concurrently=True)
+
+
+def remove_search_index(apps, schema_editor):
+    if is_postgresql(schema_editor):
+        schema_editor.remove_index(apps.get_model('movies', 'filmwork'), SEARCH_INDEX, concurrently=True)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('movies', '0004_add_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='filmwork',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_triggers, drop_triggers, atomic=True),
+        migrations.RunPython(backfill_search_vectors, migrations.RunPython.noop),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name='filmwork', index=SEARCH_INDEX),
+            ],
+            database_operations=[
+                migrations.RunPython(add_search_index, remove_search_index),
+            ],
+        ),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations, models
+
+AGE_INDEX = models.Index(fields=['age_qualification', 'id'], name='film_work_age_id_idx')
+
+
+def add_age_index(apps, schema_editor):
+    model = apps.get_model('movies', 'filmwork')
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.add_index(model, AGE_INDEX, concurrently=True)
+    else:
+        schema_editor.add_index(model, AGE_INDEX)
+
+
+def remove_age_index(apps, schema_editor):
+    model = apps.get_model('movies', 'filmwork')
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.remove_index(model, AGE_INDEX, concurrently=True)
+    else:
+        schema_editor.remove_index(model, AGE_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('movies', '0005_filmwork_search_vector'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name='filmwork', index=AGE_INDEX),
+            ],
+            database_operations=[
+                migrations.RunPython(add_age_index, remove_age_index),
+            ],
+        ),
+    ]
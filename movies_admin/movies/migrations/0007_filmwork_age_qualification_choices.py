@@ -0,0 +1,18 @@
+# Generated by Django 3.2 on 2026-10-18 18:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0006_filmwork_age_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='filmwork',
+            name='age_qualification',
+            field=models.IntegerField(choices=[(0, 'A'), (6, 'B'), (12, 'C'), (16, 'D'), (18, 'F')], verbose_name='возрастное ограничение'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+from django.db import migrations
+
+# A transaction that rewrites whole casts can set movies.defer_search_vector
+# locally and skip the per statement refresh of the through table triggers,
+# provided it then writes the film work titles, which rebuilds the vectors.
+# See api.v1.bulk.
+DEFERRABLE_TRIGGER = '''
+CREATE OR REPLACE FUNCTION movies_through_search_vector_trigger() RETURNS trigger AS $$
+BEGIN
+    IF current_setting('movies.defer_search_vector', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+    PERFORM movies_filmwork_refresh_search_vector(ARRAY(SELECT DISTINCT filmwork_id FROM changed));
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+'''
+
+ORIGINAL_TRIGGER = '''
+CREATE OR REPLACE FUNCTION movies_through_search_vector_trigger() RETURNS trigger AS $$
+BEGIN
+    PERFORM movies_filmwork_refresh_search_vector(ARRAY(SELECT DISTINCT filmwork_id FROM changed));
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+'''
+
+
+def is_postgresql(schema_editor):
+    return schema_editor.connection.vendor == 'postgresql'
+
+
+def make_deferrable(apps, schema_editor):
+    if is_postgresql(schema_editor):
+        schema_editor.execute(DEFERRABLE_TRIGGER)
+
+
+def restore(apps, schema_editor):
+    if is_postgresql(schema_editor):
+        schema_editor.execute(ORIGINAL_TRIGGER)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0007_filmwork_age_qualification_choices'),
+    ]
+
+    operations = [
+        migrations.RunPython(make_deferrable, restore),
+    ]
@@ -0,0 +1,206 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+ROLES = (
+    ('actors', 'Actor'),
+    ('directors', 'Director'),
+    ('writers', 'Writer'),
+)
+
+# Genre titles and person names of the search vector now come from one cast
+# table. The argument is qualified: in an SQL function a column of the same
+# name would win.
+CREATE_CAST_TRIGGERS = '''
+CREATE OR REPLACE FUNCTION movies_filmwork_names_vector(film_work_id uuid) RETURNS tsvector AS $$
+    SELECT setweight(to_tsvector('russian', coalesce(string_agg(name, ' '), '')), 'C')
+        || setweight(to_tsvector('english', coalesce(string_agg(name, ' '), '')), 'C')
+    FROM (
+        SELECT g.title AS name FROM movies_filmwork_genres t
+            JOIN movies_genre g ON g.id = t.genre_id WHERE t.filmwork_id = movies_filmwork_names_vector.film_work_id
+        UNION ALL
+        SELECT p.first_name || ' ' || coalesce(p.last_name, '') FROM movies_filmworkperson t
+            JOIN movies_person p ON p.id = t.person_id WHERE t.film_work_id = movies_filmwork_names_vector.film_work_id
+    ) names
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION movies_person_search_vector_trigger() RETURNS trigger AS $$
+BEGIN
+    PERFORM movies_filmwork_refresh_search_vector(ARRAY(
+        SELECT DISTINCT film_work_id FROM movies_filmworkperson WHERE person_id IN (SELECT id FROM changed)
+    ));
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION movies_cast_search_vector_trigger() RETURNS trigger AS $$
+BEGIN
+    IF current_setting('movies.defer_search_vector', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+    PERFORM movies_filmwork_refresh_search_vector(ARRAY(SELECT DISTINCT film_work_id FROM changed));
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER movies_filmworkperson_search_vector_insert
+    AFTER INSERT ON movies_filmworkperson REFERENCING NEW TABLE AS changed
+    FOR EACH STATEMENT EXECUTE FUNCTION movies_cast_search_vector_trigger();
+
+CREATE TRIGGER movies_filmworkperson_search_vector_delete
+    AFTER DELETE ON movies_filmworkperson REFERENCING OLD TABLE AS changed
+    FOR EACH STATEMENT EXECUTE FUNCTION movies_cast_search_vector_trigger();
+'''
+
+# Migrations 0004, 0005 and 0008 as they were for the per role tables.
+DROP_CAST_TRIGGERS = '''
+DROP TRIGGER IF EXISTS movies_filmworkperson_search_vector_insert ON movies_filmworkperson;
+DROP TRIGGER IF EXISTS movies_filmworkperson_search_vector_delete ON movies_filmworkperson;
+DROP FUNCTION IF EXISTS movies_cast_search_vector_trigger();
+
+CREATE OR REPLACE FUNCTION movies_filmwork_names_vector(film_work_id uuid) RETURNS tsvector AS $$
+    SELECT setweight(to_tsvector('russian', coalesce(string_agg(name, ' '), '')), 'C')
+        || setweight(to_tsvector('english', coalesce(string_agg(name, ' '), '')), 'C')
+    FROM (
+        SELECT g.title AS name FROM movies_filmwork_genres t
+            JOIN movies_genre g ON g.id = t.genre_id WHERE t.filmwork_id = film_work_id
+        UNION ALL
+        SELECT p.first_name || ' ' || coalesce(p.last_name, '') FROM movies_filmwork_actors t
+            JOIN movies_person p ON p.id = t.person_id WHERE t.filmwork_id = film_work_id
+        UNION ALL
+        SELECT p.first_name || ' ' || coalesce(p.last_name, '') FROM movies_filmwork_directors t
+            JOIN movies_person p ON p.id = t.person_id WHERE t.filmwork_id = film_work_id
+        UNION ALL
+        SELECT p.first_name || ' ' || coalesce(p.last_name, '') FROM movies_filmwork_writers t
+            JOIN movies_person p ON p.id = t.person_id WHERE t.filmwork_id = film_work_id
+    ) names
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION movies_person_search_vector_trigger() RETURNS trigger AS $$
+BEGIN
+    PERFORM movies_filmwork_refresh_search_vector(ARRAY(
+        SELECT filmwork_id FROM movies_filmwork_actors WHERE person_id IN (SELECT id FROM changed)
+        UNION SELECT filmwork_id FROM movies_filmwork_directors WHERE person_id IN (SELECT id FROM changed)
+        UNION SELECT filmwork_id FROM movies_filmwork_writers WHERE person_id IN (SELECT id FROM changed)
+    ));
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+'''
+
+CREATE_THROUGH_TRIGGER = '''
+CREATE TRIGGER {table}_search_vector_{event}
+    AFTER {event} ON {table} REFERENCING {transition} TABLE AS changed
+    FOR EACH STATEMENT EXECUTE FUNCTION movies_through_search_vector_trigger();
+'''
+
+
+def is_postgresql(schema_editor):
+    return schema_editor.connection.vendor == 'postgresql'
+
+
+def role_tables(apps):
+    film_work = apps.get_model('movies', 'FilmWork')
+    for relation, role in ROLES:
+        field = film_work._meta.get_field(relation)
+        yield field.remote_field.through._meta.db_table, field.m2m_column_name(), field.m2m_reverse_name(), role
+
+
+def copy_cast(apps, schema_editor):
+    # Ordered by the old ids, so each role keeps its order in the cast.
+    cast = apps.get_model('movies', 'FilmWorkPerson')._meta.db_table
+    for table, film_work, person, role in role_tables(apps):
+        schema_editor.execute(
+            f'INSERT INTO {cast} (film_work_id, person_id, role) '
+            f'SELECT {film_work}, {person}, %s FROM {table} ORDER BY id',
+            [role]
+        )
+
+
+def copy_cast_back(apps, schema_editor):
+    # The names do not change, so the search vectors are left as they are.
+    if is_postgresql(schema_editor):
+        schema_editor.execute("SELECT set_config('movies.defer_search_vector', 'on', true)")
+    cast = apps.get_model('movies', 'FilmWorkPerson')._meta.db_table
+    for table, film_work, person, role in role_tables(apps):
+        schema_editor.execute(
+            f'INSERT INTO {table} ({film_work}, {person}) '
+            f'SELECT film_work_id, person_id FROM {cast} WHERE role = %s ORDER BY id',
+            [role]
+        )
+    if is_postgresql(schema_editor):
+        schema_editor.execute("SELECT set_config('movies.defer_search_vector', 'off', true)")
+
+
+def create_cast_triggers(apps, schema_editor):
+    if is_postgresql(schema_editor):
+        schema_editor.execute(CREATE_CAST_TRIGGERS)
+
+
+def drop_cast_triggers(apps, schema_editor):
+    for table, film_work, person, role in role_tables(apps):
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS filmwork_{table.rsplit("_", 1)[-1]}_person_fw_idx '
+            f'ON {table} ({person}, {film_work})'
+        )
+    if not is_postgresql(schema_editor):
+        return
+    schema_editor.execute(DROP_CAST_TRIGGERS)
+    for table, *_ in role_tables(apps):
+        for event, transition in (('insert', 'NEW'), ('delete', 'OLD')):
+            schema_editor.execute(CREATE_THROUGH_TRIGGER.format(table=table, event=event, transition=transition))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0008_defer_through_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FilmWorkPerson',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('role', models.CharField(choices=[('Actor', 'Actor'), ('Writer', 'Writer'), ('Director', 'Director')],
+                                          max_length=8, verbose_name='роль')),
+                ('film_work', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE,
+                                                related_name='cast', to='movies.filmwork')),
+                ('person', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE,
+                                             related_name='credits', to='movies.person')),
+            ],
+            options={
+                'verbose_name': 'участник',
+                'verbose_name_plural': 'участники',
+            },
+        ),
+        migrations.AddField(
+            model_name='filmwork',
+            name='persons',
+            field=models.ManyToManyField(related_name='film_works', through='movies.FilmWorkPerson',
+                                         to='movies.Person'),
+        ),
+        # The indexes are built once the rows are in.
+        migrations.RunPython(copy_cast, copy_cast_back),
+        migrations.AddIndex(
+            model_name='filmworkperson',
+            index=models.Index(fields=['person', 'role', 'film_work'], name='film_work_person_role_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='filmworkperson',
+            constraint=models.UniqueConstraint(fields=('film_work', 'role', 'person'),
+                                               name='film_work_person_unique'),
+        ),
+        migrations.RunPython(create_cast_triggers, drop_cast_triggers),
+        migrations.RemoveField(
+            model_name='filmwork',
+            name='actors',
+        ),
+        migrations.RemoveField(
+            model_name='filmwork',
+            name='directors',
+        ),
+        migrations.RemoveField(
+            model_name='filmwork',
+            name='writers',
+        ),
+    ]
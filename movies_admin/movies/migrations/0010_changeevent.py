@@ -0,0 +1,28 @@
+# Generated by Django 3.2 on 2026-10-18 19:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0009_filmworkperson'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('model', models.CharField(max_length=16, verbose_name='модель')),
+                ('object_id', models.UUIDField(null=True, verbose_name='объект')),
+                ('action', models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('deleted', 'Deleted'), ('relations', 'Relations'), ('compacted', 'Compacted')], max_length=16, verbose_name='действие')),
+                ('film_work_ids', models.JSONField(default=list, verbose_name='кинопроизведения')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'verbose_name': 'изменение',
+                'verbose_name_plural': 'изменения',
+            },
+        ),
+    ]
@@ -0,0 +1,67 @@
+from django.db import migrations
+
+# Events are inserted with a negative placeholder id and numbered from the
+# id sequence when their transaction commits, under an advisory lock held
+# from there to the end of the commit. Ids therefore become visible in
+# increasing order, and writers only serialize for the length of a commit.
+# See movies.changes.
+CHANGE_LOG_LOCK = 0x6d6f76696573
+
+CREATE_NUMBERING = f'''
+CREATE SEQUENCE movies_changeevent_pending_id_seq;
+ALTER TABLE movies_changeevent ALTER COLUMN id SET DEFAULT -nextval('movies_changeevent_pending_id_seq');
+
+CREATE OR REPLACE FUNCTION movies_changeevent_number_trigger() RETURNS trigger AS $$
+BEGIN
+    -- Every pending event of the transaction is numbered by the first call,
+    -- the calls for the others find none left.
+    IF NOT EXISTS (SELECT 1 FROM movies_changeevent WHERE id < 0) THEN
+        RETURN NULL;
+    END IF;
+    PERFORM pg_advisory_xact_lock({CHANGE_LOG_LOCK});
+    UPDATE movies_changeevent AS event SET id = numbered.id
+    FROM (
+        SELECT pending.id AS pending_id, nextval('movies_changeevent_id_seq') AS id
+        FROM (SELECT id FROM movies_changeevent WHERE id < 0 ORDER BY id DESC) pending
+    ) numbered
+    WHERE event.id = numbered.pending_id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE CONSTRAINT TRIGGER movies_changeevent_number
+    AFTER INSERT ON movies_changeevent DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW WHEN (NEW.id < 0) EXECUTE FUNCTION movies_changeevent_number_trigger();
+'''
+
+DROP_NUMBERING = '''
+DROP TRIGGER IF EXISTS movies_changeevent_number ON movies_changeevent;
+DROP FUNCTION IF EXISTS movies_changeevent_number_trigger();
+ALTER TABLE movies_changeevent ALTER COLUMN id SET DEFAULT nextval('movies_changeevent_id_seq');
+DROP SEQUENCE IF EXISTS movies_changeevent_pending_id_seq;
+'''
+
+
+def is_postgresql(schema_editor):
+    return schema_editor.connection.vendor == 'postgresql'
+
+
+def create_numbering(apps, schema_editor):
+    if is_postgresql(schema_editor):
+        schema_editor.execute(CREATE_NUMBERING)
+
+
+def drop_numbering(apps, schema_editor):
+    if is_postgresql(schema_editor):
+        schema_editor.execute(DROP_NUMBERING)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0010_changeevent'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_numbering, drop_numbering),
+    ]
@@ -1,7 +1,10 @@
 import uuid
 
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models.signals import m2m_changed
 from django.utils.translation import gettext_lazy as _
 
 
@@ -18,8 +21,78 @@ class BaseModel(models.Model):
         abstract = True
 
 
+class Role(BaseModel):
+    class PersonRole(models.TextChoices):
+        actor = 'Actor'
+        writer = 'Writer'
+        director = 'Director'
+
+    title = models.CharField(_('название'), max_length=8, choices=PersonRole.choices)
+
+    class Meta:
+        verbose_name = _('роль')
+        verbose_name_plural = _('роли')
+
+    def __str__(self):
+        return self.title
+
+
+class Cast:
+    """
+    The persons of one role in a film work, kept as FilmWorkPerson rows.
+    Stands in for the per role many-to-many fields film works used to have,
+    so film_work.actors.all(), .add() and .set() keep working and send
+    m2m_changed like they did.
+    """
+
+    def __init__(self, film_work, role):
+        self.film_work = film_work
+        self.role = role
+        self.using = film_work._state.db or 'default'
+
+    def all(self):
+        # prefetch_related('cast') loads every role of a film work at once.
+        prefetched = getattr(self.film_work, '_prefetched_objects_cache', {}).get('cast')
+        if prefetched is not None:
+            return [credit.person for credit in prefetched if credit.role == self.role]
+        return Person.objects.using(self.using).filter(
+            credits__film_work=self.film_work, credits__role=self.role
+        ).order_by('credits__id')
+
+    def add(self, *persons):
+        pk_set = [getattr(person, 'pk', person) for person in persons]
+        self._changed('pre_add', set(pk_set))
+        FilmWorkPerson.objects.using(self.using).bulk_create([
+            FilmWorkPerson(film_work=self.film_work, person_id=pk, role=self.role) for pk in pk_set
+        ], ignore_conflicts=True)
+        self._changed('post_add', set(pk_set))
+
+    def clear(self):
+        self._changed('pre_clear', None)
+        FilmWorkPerson.objects.using(self.using).filter(film_work=self.film_work, role=self.role).delete()
+        self._changed('post_clear', None)
+
+    def set(self, persons):
+        self.clear()
+        self.add(*persons)
+
+    def _changed(self, action, pk_set):
+        m2m_changed.send(sender=FilmWorkPerson, instance=self.film_work, action=action, reverse=False,
+                         model=Person, pk_set=pk_set, using=self.using)
+
+
+class CastDescriptor:
+    def __init__(self, role):
+        self.role = role
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return Cast(instance, self.role)
+
+
 class FilmWork(BaseModel):
-    class AgeQualification(models.TextChoices):
+    class AgeQualification(models.IntegerChoices):
         A = 0
         B = 6
         C = 12
@@ -35,32 +108,29 @@ class FilmWork(BaseModel):
     creation_date = models.DateField(_('дата создания'), null=True)
     age_qualification = models.IntegerField(_('возрастное ограничение'), choices=AgeQualification.choices)
     type = models.TextField(_('тип'), choices=FilmWorkType.choices)
-    directors = models.ManyToManyField('Person', related_name='director')
     rating = models.DecimalField(_('рейтинг'), max_digits=3, decimal_places=1, null=True, blank=True)
-    actors = models.ManyToManyField('Person', related_name='actor')
-    writers = models.ManyToManyField('Person', related_name='writer')
+    persons = models.ManyToManyField('Person', through='FilmWorkPerson', related_name='film_works')
+    actors = CastDescriptor(Role.PersonRole.actor)
+    writers = CastDescriptor(Role.PersonRole.writer)
+    directors = CastDescriptor(Role.PersonRole.director)
     genres = models.ManyToManyField('Genre')
     file_path = models.TextField(_('ссылка'))
+    # Maintained by database triggers, see migration 0005.
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         verbose_name = _('кинопроизведение')
         verbose_name_plural = _('кинопроизведения')
-
-    def __str__(self):
-        return self.title
-
-
-class Role(BaseModel):
-    class PersonRole(models.TextChoices):
-        actor = 'Actor'
-        writer = 'Writer'
-        director = 'Director'
-
-    title = models.CharField(_('название'), max_length=8, choices=PersonRole.choices)
-
-    class Meta:
-        verbose_name = _('роль')
-        verbose_name_plural = _('роли')
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='film_work_created_id_idx'),
+            models.Index(fields=['updated_at', 'id'], name='film_work_updated_id_idx'),
+            models.Index(fields=['rating', 'id'], name='film_work_rating_id_idx'),
+            models.Index(fields=['creation_date', 'id'], name='film_work_creation_id_idx'),
+            models.Index(fields=['title', 'id'], name='film_work_title_id_idx'),
+            models.Index(fields=['type', 'rating'], name='film_work_type_rating_idx'),
+            models.Index(fields=['age_qualification', 'id'], name='film_work_age_id_idx'),
+            GinIndex(fields=['search_vector'], name='film_work_search_vector_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -74,6 +144,10 @@ class Person(BaseModel):
     class Meta:
         verbose_name = _('персона')
         verbose_name_plural = _('персоны')
+        indexes = [
+            models.Index(fields=['last_name', 'first_name'], name='person_name_idx'),
+            models.Index(fields=['updated_at', 'id'], name='person_updated_id_idx'),
+        ]
 
     def __str__(self):
         return f'{self.first_name} {self.last_name}'
@@ -86,6 +160,76 @@ class Genre(BaseModel):
     class Meta:
         verbose_name = _('жанр')
         verbose_name_plural = _('жанры')
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='genre_updated_id_idx'),
+        ]
 
     def __str__(self):
         return self.title
+
+
+class FilmWorkPerson(models.Model):
+    """
+    A person in the cast of a film work. One table for every role: the cast
+    of a film work and the filmography of a person are both one index range.
+    """
+    id = models.BigAutoField(primary_key=True)
+    film_work = models.ForeignKey(FilmWork, on_delete=models.CASCADE, related_name='cast', db_index=False)
+    person = models.ForeignKey(Person, on_delete=models.CASCADE, related_name='credits', db_index=False)
+    role = models.CharField(_('роль'), max_length=8, choices=Role.PersonRole.choices)
+
+    class Meta:
+        verbose_name = _('участник')
+        verbose_name_plural = _('участники')
+        # The unique constraint also serves lookups by film work.
+        constraints = [
+            models.UniqueConstraint(fields=['film_work', 'role', 'person'], name='film_work_person_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['person', 'role', 'film_work'], name='film_work_person_role_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.role} {self.person_id}'
+
+
+class FilmWorkDocument(models.Model):
+    film_work = models.OneToOneField(FilmWork, primary_key=True, on_delete=models.CASCADE, related_name='document')
+    payload = models.TextField(_('документ'))
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _('документ кинопроизведения')
+        verbose_name_plural = _('документы кинопроизведений')
+
+    def __str__(self):
+        return str(self.film_work_id)
+
+
+class ChangeEvent(models.Model):
+    """
+    An entry of the append-only change log of the catalog, see
+    movies.changes. Consumers of /api/v1/changes/ resume from the last id
+    they saw.
+    """
+    class Action(models.TextChoices):
+        created = 'created'
+        updated = 'updated'
+        deleted = 'deleted'
+        relations = 'relations'
+        # Replaces the oldest kept event when older ones are deleted.
+        compacted = 'compacted'
+
+    id = models.BigAutoField(primary_key=True)
+    model = models.CharField(_('модель'), max_length=16)
+    object_id = models.UUIDField(_('объект'), null=True)
+    action = models.CharField(_('действие'), max_length=16, choices=Action.choices)
+    film_work_ids = models.JSONField(_('кинопроизведения'), default=list)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = _('изменение')
+        verbose_name_plural = _('изменения')
+
+    def __str__(self):
+        return f'{self.id} {self.action} {self.model} {self.object_id}'
@@ -0,0 +1,117 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from movies.models import Genre, Role
+
+
+class ReferenceCache:
+    """
+    Per-process id -> title and title -> id maps of a small table that
+    rarely changes, so titles can be resolved from foreign keys without a
+    join.
+
+    Each map keeps at most REFERENCE_CACHE_MAX_SIZE entries, least recently
+    used first out, for REFERENCE_CACHE_TTL seconds. Saving or deleting a row
+    bumps a version in the shared cache (see movies.signals), which makes
+    every process drop its maps on their next lookup.
+    """
+
+    def __init__(self, model, field='title'):
+        self.model = model
+        self.field = field
+        self.version_key = f'movies:reference:{model._meta.label_lower}:version'
+        self._lock = threading.Lock()
+        self._titles = OrderedDict()
+        self._ids = OrderedDict()
+        self._version = None
+
+    def lookup(self, ids):
+        """
+        ({id: title} of the cached ids, set of the others), without a query.
+        """
+        return self._get(self._titles, ids)
+
+    def titles(self, ids, using='default'):
+        found, missing = self.lookup(ids)
+        if missing:
+            rows = self.model._base_manager.using(using).filter(pk__in=missing).values_list('pk', self.field)
+            found.update(self._store(rows))
+        return found
+
+    def read(self, ids, using='default'):
+        """
+        {id: title} straight from the database, neither read from nor stored
+        in the maps, which may still hold a title renamed in the current
+        transaction or by another process.
+        """
+        return dict(self.model._base_manager.using(using).filter(pk__in=ids).values_list('pk', self.field))
+
+    def title(self, pk, using='default'):
+        return self.titles([pk], using=using).get(pk)
+
+    def ids(self, titles, using='default'):
+        found, missing = self._get(self._ids, titles)
+        if missing:
+            rows = self.model._base_manager.using(using).filter(**{f'{self.field}__in': missing})
+            found.update({title: pk for pk, title in self._store(rows.values_list('pk', self.field)).items()})
+        return found
+
+    def id_for(self, title, using='default'):
+        return self.ids([title], using=using).get(title)
+
+    def clear(self):
+        with self._lock:
+            self._titles.clear()
+            self._ids.clear()
+
+    def invalidate(self):
+        try:
+            cache.incr(self.version_key)
+        except ValueError:
+            cache.add(self.version_key, time.time_ns(), None)
+        self.clear()
+
+    def schedule_invalidate(self):
+        transaction.on_commit(self.invalidate)
+
+    def _check_version(self):
+        version = cache.get(self.version_key)
+        if version != self._version:
+            self.clear()
+            self._version = version
+
+    def _get(self, entries, keys):
+        self._check_version()
+        now = time.monotonic()
+        found = {}
+        missing = set()
+        with self._lock:
+            for key in set(keys):
+                entry = entries.get(key)
+                if entry is None or entry[1] <= now:
+                    missing.add(key)
+                    continue
+                entries.move_to_end(key)
+                found[key] = entry[0]
+        return found, missing
+
+    def _store(self, rows):
+        rows = dict(rows)
+        expires_at = time.monotonic() + settings.REFERENCE_CACHE_TTL
+        with self._lock:
+            for pk, title in rows.items():
+                for entries, key, value in ((self._titles, pk, title), (self._ids, title, pk)):
+                    entries[key] = (value, expires_at)
+                    entries.move_to_end(key)
+                    while len(entries) > settings.REFERENCE_CACHE_MAX_SIZE:
+                        entries.popitem(last=False)
+        return rows
+
+
+genre_cache = ReferenceCache(Genre)
+role_cache = ReferenceCache(Role)
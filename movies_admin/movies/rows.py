@@ -0,0 +1,301 @@
+import json
+from itertools import islice
+
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.db.models.query import ValuesIterable
+from rest_framework.fields import CharField, ChoiceField, ListField
+from rest_framework.serializers import ModelSerializer
+
+from movies.models import FilmWork, FilmWorkPerson, Person
+from movies.reference import genre_cache
+
+MOVIE_FIELDS = ('id', 'title', 'description', 'creation_date', 'rating', 'type',
+                'age_qualification', 'created_at', 'updated_at')
+PERSON_RELATIONS = ('actors', 'directors', 'writers')
+RELATIONS = ('genres',) + PERSON_RELATIONS
+ROLE_RELATIONS = {getattr(FilmWork, relation).role: relation for relation in PERSON_RELATIONS}
+# Aggregated columns of a movie row: the genre ids, and the whole cast as
+# (role, first name, last name) triples, see aggregate_values.
+AGGREGATES = ('genres', 'cast')
+BATCH_SIZE = 1000
+
+
+def person_name(first_name, last_name):
+    return f'{first_name} {last_name}'
+
+
+def genre_ids(rows):
+    return {genre_id for row in rows for genre_id in row['genres']}
+
+
+def apply_genre_titles(rows, titles):
+    for row in rows:
+        row['genres'] = [titles[genre_id] for genre_id in row['genres'] if genre_id in titles]
+
+
+def resolve_genre_titles(rows, using='default', cached=True):
+    # Rows carry genre ids straight from the through table; the titles come
+    # from the reference cache instead of a join with the genre table.
+    ids = genre_ids(rows)
+    apply_genre_titles(rows, genre_cache.titles(ids, using=using) if cached else genre_cache.read(ids, using=using))
+
+
+def load_relations(film_work_ids, using='default', cached_titles=True):
+    """
+    Fetches genre titles and person names for film_work_ids with one
+    values_list() query for genres and one for the cast, without building
+    model instances.
+    PostgreSQL returns one aggregated row per film work instead of a row per
+    relation.
+    """
+    relations = {film_work_id: {relation: [] for relation in RELATIONS} for film_work_id in film_work_ids}
+    if not relations:
+        return relations
+    if connections[using].vendor == 'postgresql':
+        _load_grouped_relations(relations, using)
+    else:
+        genres = FilmWork.genres.through.objects.using(using).filter(filmwork_id__in=film_work_ids)
+        for film_work_id, genre_id in genres.order_by('id').values_list('filmwork_id', 'genre_id'):
+            relations[film_work_id]['genres'].append(genre_id)
+
+        cast = FilmWorkPerson.objects.using(using).filter(film_work_id__in=film_work_ids)
+        rows = cast.order_by('id').values_list('film_work_id', 'role', 'person__first_name', 'person__last_name')
+        for film_work_id, role, first_name, last_name in rows:
+            relations[film_work_id][ROLE_RELATIONS[role]].append(person_name(first_name, last_name))
+    resolve_genre_titles(relations.values(), using, cached=cached_titles)
+    return relations
+
+
+class BatchedMovieRowIterable(ValuesIterable):
+    cached_titles = True
+
+    def __iter__(self):
+        rows = super().__iter__()
+        batch_size = max(self.chunk_size, BATCH_SIZE)
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                return
+            relations = load_relations([row['id'] for row in batch], using=self.queryset.db,
+                                       cached_titles=self.cached_titles)
+            for row in batch:
+                row.update(relations[row['id']])
+                yield row
+
+
+class UncachedBatchedMovieRowIterable(BatchedMovieRowIterable):
+    cached_titles = False
+
+
+# The relation subqueries wrap the already filtered, ordered and sliced
+# page, so PostgreSQL evaluates them for the returned rows only and never for
+# rows skipped by OFFSET. ROW_NUMBER() keeps the page order.
+AGGREGATED_SQL = 'SELECT page.*, {relations} FROM ({sql}) page ORDER BY page.{row_number}'
+# Numbers the rows of the wrapped query in its own order, which the outer
+# query does not inherit from the ORDER BY of a subquery.
+ROW_NUMBER = '_row_number'
+
+
+def _relation_parts(aggregate):
+    """
+    (through table, film work column, join, aggregate) of an aggregated
+    column. Genres aggregate the genre ids of the through table alone, see
+    resolve_genre_titles; the cast joins person names.
+    """
+    if aggregate == 'genres':
+        through = FilmWork.genres.through._meta
+        film_work, genre = through.get_field('filmwork'), through.get_field('genre')
+        return through.db_table, film_work.column, '', f'ARRAY_AGG(t.{genre.column} ORDER BY t.id)'
+    cast, person = FilmWorkPerson._meta, Person._meta
+    film_work, target = cast.get_field('film_work'), cast.get_field('person')
+    join = f'JOIN {person.db_table} r ON r.id = t.{target.column} '
+    value = (f'JSON_BUILD_ARRAY(t.{cast.get_field("role").column}, r.{person.get_field("first_name").column}, '
+             f'r.{person.get_field("last_name").column})')
+    return cast.db_table, film_work.column, join, f'JSON_AGG({value} ORDER BY t.id)'
+
+
+def _relation_sql(aggregate):
+    through, film_work, join, values = _relation_parts(aggregate)
+    return f'(SELECT {values} FROM {through} t {join}WHERE t.{film_work} = page.id)'
+
+
+def aggregate_values(aggregate, values):
+    """
+    {relation: list} of an aggregated column. Genres stay ids until
+    resolve_genre_titles; the cast is split by role.
+    """
+    values = values or []
+    if aggregate == 'genres':
+        return {'genres': values}
+    relations = {relation: [] for relation in PERSON_RELATIONS}
+    for role, first_name, last_name in values:
+        relations[ROLE_RELATIONS[role]].append(person_name(first_name, last_name))
+    return relations
+
+
+def grouped_relation_sql(aggregate):
+    """
+    PostgreSQL query of (film work id, array) pairs for one aggregated
+    column, taking the list of film work ids as its only parameter.
+    """
+    through, film_work, join, values = _relation_parts(aggregate)
+    return (
+        f'SELECT t.{film_work}, {values} FROM {through} t {join}'
+        f'WHERE t.{film_work} = ANY(%s) GROUP BY t.{film_work}'
+    )
+
+
+def _load_grouped_relations(relations, using):
+    with connections[using].cursor() as cursor:
+        for aggregate in AGGREGATES:
+            cursor.execute(grouped_relation_sql(aggregate), [list(relations)])
+            for film_work_id, values in cursor.fetchall():
+                relations[film_work_id].update(aggregate_values(aggregate, values))
+    return relations
+
+
+def _window_ordering(query, using):
+    # The ORDER BY of the query, with references to annotations replaced by
+    # the annotations themselves: a window cannot refer to output columns.
+    ordering = []
+    for expression, (sql, params, is_ref) in query.get_compiler(using).get_order_by():
+        if is_ref:
+            expression = expression.copy()
+            expression.set_source_expressions([expression.get_source_expressions()[0].source])
+        ordering.append(expression)
+    return ordering or None
+
+
+def aggregated_rows(queryset, subqueries):
+    """
+    (row dict, subquery values) pairs of a values() queryset, read in one
+    query with AGGREGATED_SQL. Subqueries refer to the row as page.
+    """
+    names = [*queryset.query.extra_select, *queryset.query.values_select, *queryset.query.annotation_select]
+    query = queryset.query.clone()
+    query.add_annotation(Window(RowNumber(), order_by=_window_ordering(query, queryset.db)), ROW_NUMBER)
+    compiler = query.get_compiler(queryset.db)
+    try:
+        sql, params = compiler.as_sql()
+    except EmptyResultSet:
+        return []
+    converters = compiler.get_converters([column[0] for column in compiler.select[:len(names)]])
+
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(AGGREGATED_SQL.format(sql=sql, relations=', '.join(subqueries), row_number=ROW_NUMBER), params)
+        rows = cursor.fetchall()
+    if converters:
+        rows = compiler.apply_converters(rows, converters)
+    return [({name: row[index] for index, name in enumerate(names)}, row[-len(subqueries):]) for row in rows]
+
+
+class AggregatedMovieRowIterable(ValuesIterable):
+    cached_titles = True
+
+    def __iter__(self):
+        items = []
+        for item, values in aggregated_rows(self.queryset, [_relation_sql(aggregate) for aggregate in AGGREGATES]):
+            for aggregate, value in zip(AGGREGATES, values):
+                item.update(aggregate_values(aggregate, value))
+            items.append(item)
+        resolve_genre_titles(items, self.queryset.db, cached=self.cached_titles)
+        yield from items
+
+
+class UncachedAggregatedMovieRowIterable(AggregatedMovieRowIterable):
+    cached_titles = False
+
+
+def movie_rows(queryset, cached_titles=True):
+    """
+    Turns a FilmWork queryset into plain dict rows that already carry genre
+    titles and person names, ready for MovieSerializer.
+
+    On PostgreSQL the relations are aggregate subqueries around the page, so
+    a page is read in one query. Other backends batch a query for genres and
+    one for the cast per chunk.
+
+    Copies that outlive the request, like FilmWorkDocument and the ETL
+    sinks, pass cached_titles=False and read genre titles from the database.
+    """
+    rows = queryset.values(*MOVIE_FIELDS)
+    if connections[queryset.db].vendor == 'postgresql':
+        rows._iterable_class = AggregatedMovieRowIterable if cached_titles else UncachedAggregatedMovieRowIterable
+    else:
+        rows._iterable_class = BatchedMovieRowIterable if cached_titles else UncachedBatchedMovieRowIterable
+    return rows
+
+
+def stream_movie_rows(queryset, chunk_size=BATCH_SIZE):
+    """
+    Like movie_rows, but reads the queryset through a server-side cursor and
+    loads relations once per chunk, so memory use does not grow with the
+    size of the queryset. Per row subqueries would cost more than a grouped
+    query per chunk over a whole table.
+    """
+    rows = queryset.values(*MOVIE_FIELDS)
+    rows._iterable_class = BatchedMovieRowIterable
+    return rows.iterator(chunk_size=chunk_size)
+
+
+class DocumentRowIterable(ValuesIterable):
+    def __iter__(self):
+        rows = list(super().__iter__())
+        # Film works saved before FILM_WORK_DOCUMENTS was enabled, or not
+        # rebuilt yet, are read like movie_rows reads them.
+        missing = [row['id'] for row in rows if row['payload'] is None]
+        relations = load_relations(missing, using=self.queryset.db)
+        for row in rows:
+            payload = row.pop('payload')
+            if payload is None:
+                row.update(relations[row['id']])
+            else:
+                row['document'] = json.loads(payload)
+            yield row
+
+
+def document_rows(queryset):
+    """
+    Like movie_rows, but reads the pre-rendered payload kept in
+    FilmWorkDocument, joined on the primary key. Film works without one get
+    their relations loaded instead.
+    """
+    rows = queryset.values(*MOVIE_FIELDS, payload=F('document__payload'))
+    rows._iterable_class = DocumentRowIterable
+    return rows
+
+
+class MovieRowSerializer(ModelSerializer):
+    """
+    Representation of movie_rows and document_rows: the film work of
+    /api/v1/movies/, also kept in FilmWorkDocument and sent to the ETL
+    sinks.
+    """
+    genres = ListField(child=CharField(), read_only=True)
+    actors = ListField(child=CharField(), read_only=True)
+    directors = ListField(child=CharField(), read_only=True)
+    writers = ListField(child=CharField(), read_only=True)
+    type = ChoiceField(choices=FilmWork.FilmWorkType.choices)
+
+    class Meta:
+        model = FilmWork
+        fields = ['id', 'title', 'description', 'creation_date',
+                  'rating', 'type', 'genres', 'actors', 'directors',
+                  'writers']
+
+    def to_representation(self, row):
+        if 'document' in row:
+            return row['document']
+        # Relations are already formatted, so only the scalar fields go
+        # through their serializer field.
+        representation = {}
+        for field in self._readable_fields:
+            if field.field_name in RELATIONS:
+                representation[field.field_name] = row[field.field_name]
+                continue
+            value = row[field.source]
+            representation[field.field_name] = None if value is None else field.to_representation(value)
+        return representation
@@ -0,0 +1,134 @@
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from movies.catalog import schedule_bump
+from movies.changes import record_change, record_changes
+from movies.documents import documents_enabled, schedule_refresh
+from movies.models import ChangeEvent, FilmWork, Genre, Person, Role
+from movies.reference import genre_cache, role_cache
+
+# FilmWork.actors, .directors and .writers send m2m_changed as FilmWork.persons.
+FILM_WORK_RELATIONS = (FilmWork.genres, FilmWork.persons)
+
+
+def related_film_work_ids(instance, using):
+    if isinstance(instance, Genre):
+        condition = Q(genres=instance)
+    else:
+        condition = Q(persons=instance)
+    return set(FilmWork.objects.using(using).filter(condition).values_list('id', flat=True).distinct())
+
+
+def saved_action(created):
+    return ChangeEvent.Action.created if created else ChangeEvent.Action.updated
+
+
+@receiver(post_save, sender=FilmWork)
+def film_work_saved(sender, instance, created, using, **kwargs):
+    schedule_refresh({instance.pk}, using)
+    record_change(instance, saved_action(created), {instance.pk})
+
+
+@receiver(post_delete, sender=FilmWork)
+def film_work_deleted(sender, instance, **kwargs):
+    record_change(instance, ChangeEvent.Action.deleted, {instance.pk})
+
+
+@receiver(post_save, sender=Person)
+@receiver(post_save, sender=Genre)
+def related_saved(sender, instance, created, using, **kwargs):
+    # The change log lists the film works of a renamed person or genre.
+    film_work_ids = set() if created else related_film_work_ids(instance, using)
+    if documents_enabled():
+        schedule_refresh(film_work_ids, using)
+    record_change(instance, saved_action(created), film_work_ids)
+
+
+@receiver(pre_delete, sender=Person)
+@receiver(pre_delete, sender=Genre)
+def related_deleting(sender, instance, using, **kwargs):
+    instance._film_work_ids = related_film_work_ids(instance, using)
+
+
+@receiver(post_delete, sender=Person)
+@receiver(post_delete, sender=Genre)
+def related_deleted(sender, instance, using, **kwargs):
+    film_work_ids = getattr(instance, '_film_work_ids', set())
+    schedule_refresh(film_work_ids, using)
+    record_change(instance, ChangeEvent.Action.deleted, film_work_ids)
+
+
+def film_work_relation_changed(sender, instance, action, reverse, pk_set, using, **kwargs):
+    if action == 'pre_clear' and reverse:
+        instance._film_work_ids = related_film_work_ids(instance, using)
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        film_work_ids = {instance.pk}
+    elif action == 'post_clear':
+        film_work_ids = getattr(instance, '_film_work_ids', set())
+    else:
+        film_work_ids = pk_set
+    # Relations are part of the film work: ?since= exports and the ETL only
+    # see changes that move updated_at.
+    if film_work_ids:
+        FilmWork.objects.using(using).filter(pk__in=film_work_ids).update(updated_at=timezone.now())
+    schedule_refresh(film_work_ids, using)
+    record_change(instance, ChangeEvent.Action.relations, film_work_ids)
+
+
+for relation in FILM_WORK_RELATIONS:
+    m2m_changed.connect(film_work_relation_changed, sender=relation.through)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Role)
+def reference_changed(sender, **kwargs):
+    # Connected before catalog_changed: a request that sees the new catalog
+    # version must also see the new reference version, or it would cache
+    # old genre titles under the new version.
+    (genre_cache if sender is Genre else role_cache).schedule_invalidate()
+
+
+@receiver(post_save, sender=FilmWork)
+@receiver(post_save, sender=Person)
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=FilmWork)
+@receiver(post_delete, sender=Person)
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Role)
+def catalog_changed(sender, **kwargs):
+    schedule_bump()
+
+
+def catalog_relation_changed(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        schedule_bump()
+
+
+# Person.roles is part of the /api/v1/persons/ responses.
+for relation in FILM_WORK_RELATIONS + (Person.roles,):
+    m2m_changed.connect(catalog_relation_changed, sender=relation.through)
+
+
+def person_roles_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        instance._person_ids = set(instance.person.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        if not reverse:
+            person_ids = {instance.pk}
+        elif action == 'post_clear':
+            person_ids = getattr(instance, '_person_ids', set())
+        else:
+            person_ids = pk_set
+        record_changes([('person', pk, ChangeEvent.Action.relations, ()) for pk in person_ids],
+                       using=instance._state.db or 'default')
+
+
+m2m_changed.connect(person_roles_changed, sender=Person.roles.through)
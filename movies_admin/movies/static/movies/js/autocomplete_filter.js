@@ -0,0 +1,17 @@
+'use strict';
+{
+    const $ = django.jQuery;
+
+    // Reload the changelist with the picked object, see movies.admin_filters.
+    $(document).on('change', '.admin-autocomplete-filter', function() {
+        const params = new URLSearchParams(window.location.search);
+        params.delete('p');
+        params.delete('e');
+        if (this.value) {
+            params.set(this.dataset.lookup, this.value);
+        } else {
+            params.delete(this.dataset.lookup);
+        }
+        window.location.search = params.toString();
+    });
+}
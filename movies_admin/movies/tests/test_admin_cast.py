@@ -0,0 +1,78 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from movies.models import FilmWork, FilmWorkPerson, Genre, Person, Role
+
+# Prefixes of the directors, writers and actors inlines of FilmWorkAdmin.
+CAST_PREFIXES = ('cast', 'cast-2', 'cast-3')
+
+
+class CastInlineTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.film_work = FilmWork.objects.create(
+            title='Cast', type=FilmWork.FilmWorkType.movie, age_qualification=FilmWork.AgeQualification.A,
+            file_path='cast.mp4', creation_date='2000-01-01',
+        )
+        cls.genre = Genre.objects.create(title='Drama')
+        cls.first, cls.second = Person.objects.bulk_create([
+            Person(first_name='First', last_name='Person'), Person(first_name='Second', last_name='Person'),
+        ])
+        cls.user = get_user_model().objects.create_superuser('cast', password=None)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def post_actors(self, rows):
+        """
+        Posts the change form with rows as the actors inline, a list of
+        (FilmWorkPerson id or None, person).
+        """
+        data = {
+            'title': self.film_work.title, 'type': self.film_work.type, 'description': '',
+            'creation_date': self.film_work.creation_date, 'genres': [self.genre.pk],
+            'age_qualification': self.film_work.age_qualification, 'file_path': self.film_work.file_path,
+            'rating': '',
+        }
+        for prefix in CAST_PREFIXES:
+            forms = rows if prefix == 'cast-3' else []
+            data.update({
+                f'{prefix}-TOTAL_FORMS': len(forms),
+                f'{prefix}-INITIAL_FORMS': sum(1 for pk, _ in forms if pk),
+                f'{prefix}-MIN_NUM_FORMS': 0,
+                f'{prefix}-MAX_NUM_FORMS': 1000,
+            })
+            for index, (pk, person) in enumerate(forms):
+                data.update({
+                    f'{prefix}-{index}-id': pk or '',
+                    f'{prefix}-{index}-film_work': self.film_work.pk,
+                    f'{prefix}-{index}-person': person.pk,
+                })
+        return self.client.post(f'/admin/movies/filmwork/{self.film_work.pk}/change/', data)
+
+    def actors(self):
+        return set(FilmWorkPerson.objects.filter(film_work=self.film_work, role=Role.PersonRole.actor)
+                   .values_list('person_id', flat=True))
+
+    def test_duplicate_person(self):
+        response = self.post_actors([(None, self.first), (None, self.first)])
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Please correct the duplicate data for person')
+        self.assertEqual(self.actors(), set())
+
+    def test_duplicate_of_existing_row(self):
+        credit = FilmWorkPerson.objects.create(film_work=self.film_work, person=self.first,
+                                               role=Role.PersonRole.actor)
+        response = self.post_actors([(credit.pk, self.first), (None, self.first)])
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Please correct the duplicate data for person')
+        self.assertEqual(self.actors(), {self.first.pk})
+
+    def test_swap_persons(self):
+        first, second = FilmWorkPerson.objects.bulk_create([
+            FilmWorkPerson(film_work=self.film_work, person=self.first, role=Role.PersonRole.actor),
+            FilmWorkPerson(film_work=self.film_work, person=self.second, role=Role.PersonRole.actor),
+        ])
+        response = self.post_actors([(first.pk, self.second), (second.pk, self.first)])
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.actors(), {self.first.pk, self.second.pk})
@@ -0,0 +1,61 @@
+import threading
+import uuid
+from unittest import skipUnless
+
+from django.db import connection, connections, transaction
+from django.test import TransactionTestCase
+
+from movies.changes import record_changes
+from movies.models import ChangeEvent
+
+
+def event(model):
+    return model, uuid.uuid4(), ChangeEvent.Action.updated, ()
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Events are numbered at commit on PostgreSQL')
+class ChangeLogOrderTests(TransactionTestCase):
+    """
+    Change log ids follow commit order, and writers only wait for each
+    other's commits.
+    """
+
+    def ids(self):
+        return dict(ChangeEvent.objects.values_list('model', 'id'))
+
+    def test_ids_follow_commit_order(self):
+        recorded = threading.Event()
+        commit = threading.Event()
+
+        def slow_writer():
+            try:
+                with transaction.atomic():
+                    record_changes([event('slow')])
+                    recorded.set()
+                    commit.wait(10)
+            finally:
+                connections.close_all()
+
+        thread = threading.Thread(target=slow_writer)
+        thread.start()
+        try:
+            self.assertTrue(recorded.wait(10))
+            with connection.cursor() as cursor:
+                # Fails instead of waiting for the slow writer to commit.
+                cursor.execute("SET lock_timeout = '2s'")
+            with transaction.atomic():
+                record_changes([event('fast')])
+        finally:
+            commit.set()
+            thread.join()
+        ids = self.ids()
+        self.assertLess(ids['fast'], ids['slow'])
+
+    def test_ids_follow_insert_order_in_a_transaction(self):
+        with transaction.atomic():
+            record_changes([event('first'), event('second')])
+            record_changes([event('third')])
+        ids = self.ids()
+        self.assertLess(0, ids['first'])
+        self.assertLess(ids['first'], ids['second'])
+        self.assertLess(ids['second'], ids['third'])
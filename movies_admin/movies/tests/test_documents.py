@@ -0,0 +1,83 @@
+import json
+
+from django.db import transaction
+from django.test import TestCase, override_settings
+
+from api.v1.serializer import MovieSerializer
+from movies.documents import schedule_refresh
+from movies.models import FilmWork, FilmWorkDocument, Genre, Person
+from movies.rows import MovieRowSerializer, document_rows, movie_rows
+
+
+def create_film_work(title):
+    film_work = FilmWork.objects.create(
+        title=title, type=FilmWork.FilmWorkType.movie, age_qualification=FilmWork.AgeQualification.A,
+        file_path=f'{title}.mp4', creation_date='2000-01-01', rating=7.5,
+    )
+    film_work.genres.add(Genre.objects.create(title=f'{title} genre'))
+    film_work.actors.add(Person.objects.create(first_name=title, last_name='Actor'))
+    return film_work
+
+
+def document(film_work):
+    return json.loads(FilmWorkDocument.objects.get(film_work=film_work).payload)
+
+
+class DocumentRowsTests(TestCase):
+    """
+    Film works saved before FILM_WORK_DOCUMENTS was enabled are read like
+    movie_rows reads them, with the same representation.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.without_document = create_film_work('Without')
+        with override_settings(FILM_WORK_DOCUMENTS=True):
+            cls.with_document = create_film_work('With')
+
+    def test_fallback(self):
+        self.assertFalse(FilmWorkDocument.objects.filter(film_work=self.without_document).exists())
+        queryset = FilmWork.objects.order_by('title')
+        expected = MovieSerializer(movie_rows(queryset), many=True).data
+        self.assertEqual(MovieSerializer(document_rows(queryset), many=True).data, expected)
+        self.assertEqual([MovieRowSerializer().to_representation(row) for row in movie_rows(queryset)], expected)
+        self.assertEqual([item['title'] for item in expected], ['With', 'Without'])
+
+    @override_settings(FILM_WORK_DOCUMENTS=True)
+    def test_api(self):
+        response = self.client.get('/api/v1/movies/')
+        self.assertEqual({item['title'] for item in response.json()['results']}, {'With', 'Without'})
+
+
+@override_settings(FILM_WORK_DOCUMENTS=True)
+class ScheduleRefreshTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        with override_settings(FILM_WORK_DOCUMENTS=False):
+            cls.first = create_film_work('First')
+            cls.second = create_film_work('Second')
+
+    def test_refresh_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.first.title = 'Renamed'
+            self.first.save()
+            self.first.actors.add(Person.objects.create(first_name='Second', last_name='Actor'))
+            self.assertFalse(FilmWorkDocument.objects.exists())
+        self.assertTrue(callbacks)
+        self.assertEqual(document(self.first)['title'], 'Renamed')
+        self.assertEqual(document(self.first)['actors'], ['First Actor', 'Second Actor'])
+        self.assertFalse(FilmWorkDocument.objects.filter(film_work=self.second).exists())
+
+    def test_rolled_back_savepoint(self):
+        # The callback registered in the savepoint is dropped with it, the
+        # one of the next call refreshes both.
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    schedule_refresh({self.first.pk})
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            schedule_refresh({self.second.pk}, using='default')
+        self.assertEqual(document(self.first)['title'], 'First')
+        self.assertEqual(document(self.second)['title'], 'Second')
@@ -0,0 +1,70 @@
+import uuid
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from movies.models import ChangeEvent, FilmWork, FilmWorkPerson, Person
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Checks PostgreSQL plans and index names')
+class QueryPlanTestCase(TestCase):
+    """
+    The test tables are small enough to be cheaper to scan, so the plans are
+    asked whether an index is usable at all rather than whether it is
+    cheapest.
+    """
+
+    def setUp(self):
+        with connection.cursor() as cursor:
+            # Until the transaction of the test is rolled back.
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assertUsesIndex(self, queryset, *indexes):
+        plan = queryset.explain()
+        self.assertTrue(any(index in plan for index in indexes), f'{" or ".join(indexes)} not used\n{plan}')
+
+
+class HotPathPlanTests(QueryPlanTestCase):
+    """
+    The API, ETL and admin hot paths use their indexes.
+    """
+
+    def test_movies_keyset_page(self):
+        self.assertUsesIndex(FilmWork.objects.filter(created_at__gt=timezone.now()).order_by('created_at', 'id')[:50],
+                             'film_work_created_id_idx')
+
+    def test_movies_by_rating(self):
+        self.assertUsesIndex(FilmWork.objects.order_by('rating', 'id')[:50], 'film_work_rating_id_idx')
+
+    def test_etl_changed_film_works(self):
+        self.assertUsesIndex(FilmWork.objects.filter(updated_at__gt=timezone.now()).order_by('updated_at', 'id')[:100],
+                             'film_work_updated_id_idx')
+
+    def test_etl_changed_persons(self):
+        self.assertUsesIndex(Person.objects.filter(updated_at__gt=timezone.now()).order_by('updated_at', 'id')[:100],
+                             'person_updated_id_idx')
+
+    def test_persons_keyset_page(self):
+        self.assertUsesIndex(Person.objects.filter(id__gt=uuid.uuid4()).order_by('id')[:51], 'movies_person_pkey')
+
+    def test_change_feed_page(self):
+        self.assertUsesIndex(ChangeEvent.objects.filter(id__gt=0).order_by('id')[:501], 'movies_changeevent_pkey')
+
+    def test_person_filmography(self):
+        self.assertUsesIndex(FilmWorkPerson.objects.filter(person_id=uuid.uuid4()).values('role', 'film_work_id'),
+                             'film_work_person_role_idx')
+
+    def test_film_work_cast(self):
+        self.assertUsesIndex(FilmWorkPerson.objects.filter(film_work_id=uuid.uuid4()).values('role', 'person_id'),
+                             'film_work_person_unique')
+
+    def test_admin_title_search(self):
+        self.assertUsesIndex(FilmWork.objects.filter(title__icontains='star'), 'film_work_title_trgm_idx')
+
+    def test_admin_description_search(self):
+        self.assertUsesIndex(FilmWork.objects.filter(description__icontains='star'), 'film_work_description_trgm_idx')
+
+    def test_person_name_search(self):
+        self.assertUsesIndex(Person.objects.filter(last_name__icontains='ова'), 'person_last_name_trgm_idx')
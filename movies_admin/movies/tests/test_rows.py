@@ -0,0 +1,41 @@
+from django.db.models import F, Value
+from django.test import TestCase
+
+from api.v1.queries import person_rows
+from movies.models import FilmWork, Person
+from movies.rows import movie_rows
+
+
+class RowOrderTests(TestCase):
+    """
+    Rows come in the order of the queryset, whose ORDER BY the aggregating
+    query wraps on PostgreSQL.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        FilmWork.objects.bulk_create([
+            FilmWork(title=f'Film {index:02}', type=FilmWork.FilmWorkType.movie, rating=index % 7,
+                     age_qualification=FilmWork.AgeQualification.A, file_path='', creation_date='2000-01-01')
+            for index in range(40)
+        ])
+        Person.objects.bulk_create([Person(first_name=f'Person {index:02}', last_name='') for index in range(20)])
+
+    def assertRowOrder(self, rows, queryset):
+        self.assertEqual([row['id'] for row in rows], list(queryset.values_list('id', flat=True)))
+
+    def test_movie_rows(self):
+        queryset = FilmWork.objects.all()
+        for ordering, page in ((('-rating', 'title'), slice(25)), (('rating', '-title'), slice(10, 30))):
+            with self.subTest(ordering=ordering, page=page):
+                self.assertRowOrder(movie_rows(queryset.order_by(*ordering)[page]), queryset.order_by(*ordering)[page])
+
+    def test_annotation_ordering(self):
+        # Like the search rank, annotated after movie_rows, so it is selected.
+        rows = movie_rows(FilmWork.objects.all()).annotate(score=F('rating') * Value(-1)).order_by('score', 'title')
+        expected = FilmWork.objects.annotate(score=F('rating') * Value(-1)).order_by('score', 'title')
+        self.assertRowOrder(rows[:25], expected[:25])
+
+    def test_person_rows(self):
+        persons = Person.objects.order_by('-first_name')[:15]
+        self.assertRowOrder(person_rows(persons), persons)
@@ -2,6 +2,7 @@ import random
 
 from movies.factories import MovieFactory, SerialFactory, UserFactory, GenreFactory, PersonFactory
 from movies.models import Person, Genre, Role
+from movies.reference import role_cache
 
 
 def add_users(self):
@@ -32,8 +33,8 @@ def add_persons(self):
     self.stdout.write(self.style.WARNING(f'Starting create persons, wait for a moment...'))
     try:
         persons = []
+        roles = list(role_cache.ids(Role.PersonRole.values).values())
         for i in range(100):
-            roles = Role.objects.all()
             person = PersonFactory.create(roles=random.choices(roles, k=random.randint(1, len(roles))))
             if i % 100 == 0:
                 self.stdout.write(self.style.SUCCESS(f'{i}/1000 persons created...'))
@@ -52,9 +53,11 @@ def add_film_work(self, film_work_type):
         objects_count = 200
     self.stdout.write(self.style.WARNING(f'Starting create {film_work_type}, wait for a moment...'))
     try:
-        actors = Person.objects.filter(roles__title='Actor')
-        writers = Person.objects.filter(roles__title='Writer')
-        directors = Person.objects.filter(roles__title='Director')
+        # Filter on the through table by role id, without joining roles.
+        role_ids = role_cache.ids(Role.PersonRole.values)
+        actors = Person.objects.filter(roles=role_ids[Role.PersonRole.actor])
+        writers = Person.objects.filter(roles=role_ids[Role.PersonRole.writer])
+        directors = Person.objects.filter(roles=role_ids[Role.PersonRole.director])
         genres = Genre.objects.all()[:100]
         for i in range(objects_count):
             current_actors = random.choices(actors, k=random.randint(1, 20))
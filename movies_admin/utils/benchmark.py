@@ -0,0 +1,87 @@
+import statistics
+import time
+
+from django.core.cache import cache
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def measure(func, repeat=5, warmup=1):
+    for _ in range(warmup):
+        func()
+
+    timings = []
+    queries = 0
+    for _ in range(repeat):
+        # The query log is capped; once full, captured queries can not be counted.
+        reset_queries()
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        queries = len(context.captured_queries)
+
+    return {
+        'min_ms': round(min(timings), 3),
+        'median_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'max_ms': round(max(timings), 3),
+        'queries': queries,
+    }
+
+
+def format_result(name, result):
+    return (f'{name}: median {result["median_ms"]} ms, p95 {result["p95_ms"]} ms, '
+            f'min {result["min_ms"]} ms, {result["queries"]} queries')
+
+
+def uncached(view, request):
+    # Measure the query path, not the response cache. This clears the whole
+    # default cache, so do not point it at a shared production cache.
+    cache.clear()
+    return view(request).render()
+
+
+def latency_summary(timings):
+    return {
+        'runs': len(timings),
+        'p50_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'p99_ms': round(percentile(timings, 99), 3),
+        'max_ms': round(max(timings), 3),
+    }
+
+
+def compare_reports(baseline, report, max_slowdown=1.25, min_delta_ms=2.0, max_memory_growth=1.5):
+    """
+    Regressions of report against baseline, both run_benchmarks reports, as
+    a list of messages. Only the median is compared, tail latencies are too
+    noisy on a developer machine. It must grow by max_slowdown and by
+    min_delta_ms to count, so noise on fast requests is not flagged.
+    """
+    regressions = []
+    for name, result in report['results'].items():
+        before = baseline['results'].get(name)
+        if before is None:
+            continue
+        if result.get('queries', 0) > before.get('queries', 0):
+            regressions.append(f'{name}: {result["queries"]} queries, was {before["queries"]}')
+        if 'p50_ms' in result and 'p50_ms' in before and (
+            result['p50_ms'] > before['p50_ms'] * max_slowdown and result['p50_ms'] - before['p50_ms'] > min_delta_ms
+        ):
+            regressions.append(f'{name}: p50 {result["p50_ms"]} ms, was {before["p50_ms"]} ms')
+        rate, rate_before = result.get('film_works_per_s'), before.get('film_works_per_s')
+        if rate is not None and rate_before is not None and rate * max_slowdown < rate_before:
+            regressions.append(f'{name}: {rate} film works/s, was {rate_before}')
+        peak, peak_before = result.get('peak_kib'), before.get('peak_kib')
+        if peak is not None and peak_before is not None and peak > peak_before * max_memory_growth:
+            regressions.append(f'{name}: peak memory {result["peak_kib"]} KiB, was {before["peak_kib"]} KiB')
+    return regressions
@@ -0,0 +1,280 @@
+import csv
+import datetime
+import io
+import multiprocessing
+import os
+import random
+import time
+import uuid
+from decimal import Decimal
+
+import django
+from django.apps import apps
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import CommandError
+from django.db import connections, transaction
+from django.utils import timezone
+
+from movies.catalog import bump_catalog_version
+from movies.models import FilmWork, FilmWorkPerson, Genre, Person, Role, User
+from utils.fake import Faker
+
+FILM_WORK_RELATIONS = {
+    'actors': (1, 20),
+    'writers': (1, 3),
+    'directors': (1, 5),
+}
+GENRES_PER_FILM_WORK = (1, 5)
+AGE_QUALIFICATIONS = [int(value) for value, _ in FilmWork.AgeQualification.choices]
+GENRE_COLUMNS = ('id', 'title', 'description', 'created_at', 'updated_at')
+PERSON_COLUMNS = ('id', 'first_name', 'last_name', 'created_at', 'updated_at')
+FILM_WORK_COLUMNS = ('id', 'title', 'description', 'creation_date', 'age_qualification', 'type',
+                     'rating', 'file_path', 'created_at', 'updated_at')
+FILM_WORK_GENRE_COLUMNS = ('filmwork_id', 'genre_id')
+CAST_COLUMNS = ('film_work_id', 'person_id', 'role')
+
+
+class BulkWriter:
+    """
+    Inserts rows given as tuples of column values, either with bulk_create
+    or, on PostgreSQL, with COPY FROM STDIN.
+    """
+
+    def __init__(self, batch_size=10000, use_copy=False, using='default'):
+        self.batch_size = batch_size
+        self.using = using
+        self.use_copy = use_copy and connections[using].vendor == 'postgresql'
+
+    def insert(self, model, columns, rows):
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            if self.use_copy:
+                self.copy(model, columns, batch)
+            else:
+                objects = [model(**dict(zip(columns, row))) for row in batch]
+                model.objects.using(self.using).bulk_create(objects, batch_size=self.batch_size)
+        return len(rows)
+
+    def copy(self, model, columns, rows):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(['' if value is None else value for value in row])
+        buffer.seek(0)
+        db_columns = ', '.join(model._meta.get_field(column).column for column in columns)
+        with connections[self.using].cursor() as cursor:
+            cursor.copy_expert(f'COPY {model._meta.db_table} ({db_columns}) FROM STDIN WITH (FORMAT csv)', buffer)
+
+
+def make_uuid(rng):
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def generate_users(rng, faker, count, now):
+    # Hashing is deliberately slow, so every generated user shares one hash.
+    password = make_password('pi3.1415')
+    return [
+        User(id=make_uuid(rng), username=faker.unique.user_name(), email=faker.unique.email(),
+             password=password, date_joined=now)
+        for _ in range(count)
+    ]
+
+
+def generate_genres(rng, count, now):
+    return [(make_uuid(rng), f'genre{n}', f'description{n}', now, now) for n in range(count)]
+
+
+def generate_persons(rng, faker, count, roles, now):
+    persons = []
+    person_roles = []
+    pools = {role.title: [] for role in roles}
+    for _ in range(count):
+        person_id = make_uuid(rng)
+        persons.append((person_id, faker.first_name(), faker.last_name(), now, now))
+        for role in rng.sample(roles, rng.randint(1, len(roles))):
+            person_roles.append((person_id, role.id))
+            pools[role.title].append(person_id)
+    return persons, person_roles, pools
+
+
+def generate_film_works(rng, count, offset, pools, genre_ids, now):
+    film_works = []
+    genres, cast = [], []
+    for n in range(offset, offset + count):
+        film_work_id = make_uuid(rng)
+        film_work_type = rng.choice(FilmWork.FilmWorkType.values)
+        kind = film_work_type.lower()
+        creation_date = datetime.date(1950, 1, 1) + datetime.timedelta(days=rng.randint(0, 365 * 70))
+        film_works.append((
+            film_work_id, f'{film_work_type} #{n}', f'Description of {kind} #{n}', creation_date,
+            rng.choice(AGE_QUALIFICATIONS), film_work_type, Decimal(rng.randint(0, 100)) / 10,
+            f'/movie_storage/{kind}{n}', now, now
+        ))
+        for genre_id in rng.sample(genre_ids, min(len(genre_ids), rng.randint(*GENRES_PER_FILM_WORK))):
+            genres.append((film_work_id, genre_id))
+        for relation, (low, high) in FILM_WORK_RELATIONS.items():
+            pool = pools[relation]
+            role = getattr(FilmWork, relation).role
+            for person_id in rng.sample(pool, min(len(pool), rng.randint(low, high))):
+                cast.append((film_work_id, person_id, role))
+    return film_works, genres, cast
+
+
+def role_pools(pools):
+    return {
+        'actors': pools.get(Role.PersonRole.actor, []),
+        'writers': pools.get(Role.PersonRole.writer, []),
+        'directors': pools.get(Role.PersonRole.director, []),
+    }
+
+
+def write_tables(writer, tables):
+    # Tables name models by label: auto-created through models cannot be
+    # pickled when shards are sent back from a worker process.
+    with transaction.atomic(using=writer.using):
+        for label, columns, rows in tables:
+            writer.insert(apps.get_model(label), columns, rows)
+
+
+# Per-process state of the shard workers, filled by init_worker.
+_worker = {}
+
+
+def init_worker(options, context):
+    django.setup()
+    _worker.clear()
+    _worker.update(context)
+    _worker['writer'] = BulkWriter(batch_size=options['batch_size'], use_copy=options['copy'])
+
+
+def finish_shard(tables, started, **extra):
+    result = {'pid': os.getpid(), 'rows': sum(len(rows) for _, _, rows in tables), **extra}
+    if _worker['write']:
+        write_tables(_worker['writer'], tables)
+    else:
+        result['tables'] = tables
+    result['seconds'] = time.perf_counter() - started
+    return result
+
+
+def person_shard(task):
+    shard, offset, count = task
+    started = time.perf_counter()
+    seed = _worker['seed'] + shard
+    persons, person_roles, pools = generate_persons(
+        random.Random(seed), Faker(seed=seed), count, _worker['roles'], _worker['now'])
+    tables = [
+        (Person._meta.label, PERSON_COLUMNS, persons),
+        (Person.roles.through._meta.label, ('person_id', 'role_id'), person_roles),
+    ]
+    return finish_shard(tables, started, pools=pools)
+
+
+def film_work_shard(task):
+    shard, offset, count = task
+    started = time.perf_counter()
+    seed = _worker['seed'] + _worker['person_shards'] + shard
+    film_works, genres, cast = generate_film_works(
+        random.Random(seed), count, offset, _worker['pools'], _worker['genre_ids'], _worker['now'])
+    tables = [
+        (FilmWork._meta.label, FILM_WORK_COLUMNS, film_works),
+        (FilmWork.genres.through._meta.label, FILM_WORK_GENRE_COLUMNS, genres),
+        (FilmWorkPerson._meta.label, CAST_COLUMNS, cast),
+    ]
+    return finish_shard(tables, started)
+
+
+def make_shards(total, batch_size):
+    return [(shard, offset, min(batch_size, total - offset))
+            for shard, offset in enumerate(range(0, total, batch_size))]
+
+
+def run_shards(func, shards, options, context):
+    """
+    Runs shard functions in a process pool. Each shard seeds its own Random
+    and Faker with seed + shard, so the output does not depend on the number
+    of workers. Workers insert on their own connections, except on SQLite
+    where concurrent writers lock each other out and the parent writes instead.
+    """
+    workers = options['workers']
+    if workers == 1:
+        init_worker(options, context)
+        yield from map(func, shards)
+        return
+    connections.close_all()
+    with multiprocessing.Pool(workers, initializer=init_worker, initargs=(options, context)) as pool:
+        yield from pool.imap(func, shards)
+
+
+def check_empty_catalog():
+    # Generated rows are numbered from zero and seeded, so a second run would
+    # collide with the first, and a worker would die halfway through a shard.
+    tables = [model._meta.db_table for model in (Genre, Person, FilmWork) if model.objects.exists()]
+    if tables:
+        raise CommandError(f'{", ".join(tables)} already have rows; --bulk needs an empty catalog, '
+                           f'run `manage.py flush` first')
+
+
+def add_bulk_fixtures(self, options):
+    check_empty_catalog()
+    seed = options['seed']
+    rng = random.Random(seed)
+    faker = Faker(seed=seed)
+    batch_size = options['batch_size']
+    writer = BulkWriter(batch_size=batch_size, use_copy=options['copy'])
+    now = timezone.now()
+    started = time.perf_counter()
+    total_rows = 0
+    workers = {}
+
+    self.stdout.write(self.style.WARNING(
+        f'Starting bulk load with seed {seed} and {options["workers"]} workers, wait for a moment...'))
+    with transaction.atomic():
+        users = User.objects.bulk_create(generate_users(rng, faker, options['users'], now))
+        total_rows += len(users)
+        self.stdout.write(self.style.SUCCESS(f'{len(users)} users created...'))
+
+        genres = generate_genres(rng, options['genres'], now)
+        total_rows += writer.insert(Genre, GENRE_COLUMNS, genres)
+        self.stdout.write(self.style.SUCCESS(f'{len(genres)} genres created...'))
+
+    person_shards = make_shards(options['persons'], batch_size)
+    film_work_shards = make_shards(options['film_works'], batch_size)
+    context = {
+        'seed': seed,
+        'now': now,
+        'write': options['workers'] == 1 or connections['default'].vendor != 'sqlite',
+        'roles': list(Role.objects.order_by('title')),
+        'genre_ids': [genre[0] for genre in genres],
+        'person_shards': len(person_shards),
+    }
+
+    pools = {}
+    phases = (
+        ('persons', person_shard, person_shards, options['persons']),
+        ('film works', film_work_shard, film_work_shards, options['film_works']),
+    )
+    for name, func, shards, total in phases:
+        if name == 'film works':
+            context['pools'] = role_pools(pools)
+        done = 0
+        for (_, _, count), result in zip(shards, run_shards(func, shards, options, context)):
+            if 'tables' in result:
+                write_tables(writer, result.pop('tables'))
+            for role, person_ids in result.get('pools', {}).items():
+                pools.setdefault(role, []).extend(person_ids)
+            stats = workers.setdefault(result['pid'], [0, 0.0])
+            stats[0] += result['rows']
+            stats[1] += result['seconds']
+            total_rows += result['rows']
+            done += count
+            self.stdout.write(self.style.SUCCESS(f'{done}/{total} {name} created...'))
+
+    # Bulk inserts bypass the signals that invalidate cached API responses.
+    bump_catalog_version()
+    for pid, (rows, seconds) in workers.items():
+        self.stdout.write(f'worker {pid}: {rows} rows in {seconds:.1f} s, {rows / seconds:.0f} rows/s')
+    elapsed = time.perf_counter() - started
+    self.stdout.write(self.style.SUCCESS(
+        f'Bulk load finished: {total_rows} rows in {elapsed:.1f} s, {total_rows / elapsed:.0f} rows/s'
+    ))
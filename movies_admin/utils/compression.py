@@ -0,0 +1,105 @@
+import re
+
+import brotli
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_sequence, compress_string
+
+from utils.instrumentation import timed
+
+# API responses only: HTML pages carry CSRF tokens, which compression can leak
+# (BREACH).
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'text/csv')
+# Preferred first when the client accepts both with the same q-value.
+ENCODINGS = ('br', 'gzip')
+re_qvalue = re.compile(r'^\s*q\s*=\s*([01](?:\.\d{0,3})?)\s*$', re.IGNORECASE)
+
+
+def parse_accept_encoding(accept_encoding):
+    """
+    {coding: q-value} of an Accept-Encoding header. A coding without a
+    q-value is accepted with 1, one with a malformed q-value is not.
+    """
+    qvalues = {}
+    for item in accept_encoding.split(','):
+        coding, *params = item.split(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        qvalue = 1.0
+        for param in params:
+            if param.strip().lower().startswith('q'):
+                match = re_qvalue.match(param)
+                qvalue = min(float(match.group(1)), 1.0) if match else 0.0
+        qvalues[coding] = qvalue
+    return qvalues
+
+
+def accepted_encoding(request):
+    qvalues = parse_accept_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    # * stands for every coding not listed by name.
+    candidates = [(qvalues.get(encoding, qvalues.get('*', 0.0)), encoding) for encoding in ENCODINGS]
+    qvalue, encoding = max(candidates, key=lambda candidate: candidate[0])
+    return encoding if qvalue > 0 else None
+
+
+def brotli_sequence(sequence):
+    compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+    for item in sequence:
+        data = compressor.process(item)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+def compress(content, encoding):
+    if encoding == 'br':
+        return brotli.compress(content, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return compress_string(content)
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compresses JSON, NDJSON and CSV responses with brotli or gzip, whichever
+    the Accept-Encoding of the client gives the higher q-value, brotli when
+    they are equal. A coding with q=0 is never used.
+
+    Responses smaller than COMPRESSION_MIN_SIZE are sent as they are, the
+    saving would not pay for the time. Like GZipMiddleware, an ETag is made
+    weak because the bytes no longer match the representation it was made
+    for, and responses that already have a Content-Encoding are left alone.
+    """
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding') or response.status_code == 206:
+            return response
+        if not response.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES):
+            return response
+        if not response.streaming and len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = accepted_encoding(request)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if encoding == 'br':
+                response.streaming_content = brotli_sequence(response.streaming_content)
+            else:
+                response.streaming_content = compress_sequence(response.streaming_content)
+            del response['Content-Length']
+        else:
+            with timed('compress'):
+                compressed = compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(response.content))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,58 @@
+import hashlib
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+ESTIMATE_MIN_ROWS = 10000
+COUNT_CACHE_TIMEOUT = 60
+
+
+def _table_estimate(queryset):
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)',
+            [queryset.model._meta.db_table]
+        )
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def estimate_count(queryset, exact=False):
+    """
+    Returns the number of rows in queryset without running COUNT(*) on every call.
+
+    Unfiltered querysets read the planner statistics from pg_class, which is
+    free but only accurate for large tables, so small tables still get an
+    exact count. Everything else is counted once and cached for a short time.
+    """
+    if exact:
+        return queryset.count()
+
+    if not queryset.query.where:
+        estimate = _table_estimate(queryset)
+        if estimate is not None and estimate >= ESTIMATE_MIN_ROWS:
+            return estimate
+
+    sql, params = queryset.query.sql_with_params()
+    key = 'count:{}'.format(hashlib.md5(f'{queryset.db}:{sql}:{params}'.encode()).hexdigest())
+    return cache.get_or_set(key, queryset.count, COUNT_CACHE_TIMEOUT)
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator for admin changelists of large tables. The count comes from
+    estimate_count, so the last page may be short or empty when the planner
+    statistics are stale.
+    """
+
+    @cached_property
+    def count(self):
+        if isinstance(self.object_list, QuerySet):
+            return estimate_count(self.object_list.order_by())
+        return super().count
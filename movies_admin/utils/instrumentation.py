@@ -0,0 +1,225 @@
+import asyncio
+import json
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+# Metrics of the request being served, if it was sampled. Context variables
+# follow sync_to_async into its thread, so queries of sync views served by
+# ASGI are counted too.
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.timings = {}
+        self.endpoint = None
+        self.budget = None
+        self.size = None
+        self.status = None
+        self.total_seconds = None
+
+    def add_time(self, name, seconds):
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    @property
+    def over_budget(self):
+        return self.budget is not None and self.queries > self.budget
+
+    def finish(self, request, response):
+        self.total_seconds = time.perf_counter() - self.started
+        self.status = response.status_code
+        match = getattr(request, 'resolver_match', None)
+        if match is not None:
+            self.endpoint, self.budget = endpoint_budget(match, request.method)
+        if not response.streaming:
+            self.size = len(response.content)
+
+    def server_timing(self):
+        metrics = [f'db;dur={self.db_seconds * 1000:.2f};desc="{self.queries} queries"']
+        metrics += [f'{name};dur={seconds * 1000:.2f}' for name, seconds in self.timings.items()]
+        metrics.append(f'total;dur={self.total_seconds * 1000:.2f}')
+        return ', '.join(metrics)
+
+    def as_dict(self):
+        return {
+            'endpoint': self.endpoint,
+            'queries': self.queries,
+            'query_budget': self.budget,
+            'db_ms': round(self.db_seconds * 1000, 2),
+            **{f'{name}_ms': round(seconds * 1000, 2) for name, seconds in self.timings.items()},
+            'total_ms': round(self.total_seconds * 1000, 2),
+            'bytes': self.size,
+        }
+
+
+def record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_seconds += time.perf_counter() - start
+
+
+def install(connection, **kwargs):
+    # The pooled backend sends connection_created on every checkout.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+connection_created.connect(install, dispatch_uid='utils.instrumentation.install')
+
+
+@contextmanager
+def collect(metrics):
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def timed(name):
+    """
+    Adds the time spent in the block to the named Server-Timing metric of
+    the current request. Free when the request is not sampled.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add_time(name, time.perf_counter() - start)
+
+
+def query_budget(queries):
+    """
+    Declares the most queries a function view may run, e.g.
+
+        @query_budget(1)
+        @api_view(['GET'])
+        def health(request): ...
+
+    Class based views declare query_budgets = {'list': 3, ...} by action,
+    ModelAdmins by admin view ('changelist', 'change', ...).
+    """
+    def decorator(view):
+        view.query_budget = queries
+        return view
+    return decorator
+
+
+def endpoint_budget(match, method):
+    """
+    (name, query budget or None) of the view that served a request, e.g.
+    ('MovieViewSet.list', 3) or ('PersonAdmin.changelist', 6).
+    """
+    func = match.func
+    model_admin = getattr(func, 'model_admin', None)
+    if model_admin is not None:
+        view = match.url_name.rsplit('_', 1)[-1]
+        return f'{type(model_admin).__name__}.{view}', getattr(model_admin, 'query_budgets', {}).get(view)
+    actions = getattr(func, 'actions', None)
+    if actions:
+        action = actions.get(method.lower())
+        cls = func.cls
+        return f'{cls.__name__}.{action}', getattr(cls, 'query_budgets', {}).get(action)
+    return match._func_path, getattr(func, 'query_budget', None)
+
+
+def measured(client, path, method='get', **kwargs):
+    """
+    Test helper: makes the request with sampling forced on and returns its
+    RequestMetrics, e.g. assert measured(client, url).queries <= 3.
+    """
+    from django.test.utils import override_settings
+
+    with override_settings(REQUEST_METRICS_SAMPLE_RATE=1):
+        response = getattr(client, method)(path, **kwargs)
+    return response.request_metrics
+
+
+class RequestMetricsMiddleware:
+    """
+    Counts the queries and times the database and serialization work of a
+    sample of requests (REQUEST_METRICS_SAMPLE_RATE). Sampled responses get
+    a Server-Timing header and one JSON log line, at WARNING when the view
+    ran more queries than its declared budget.
+
+    Responses of async views only have total time: their asyncpg queries
+    do not go through Django connections. Streaming responses are measured
+    up to the first byte.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # Marks the instance as a coroutine function for Django's handler.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+        for connection in connections.all():
+            install(connection)
+        with collect(RequestMetrics()) as metrics:
+            response = self.get_response(request)
+        return self.report(request, response, metrics)
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+        with collect(RequestMetrics()) as metrics:
+            response = await self.get_response(request)
+        return self.report(request, response, metrics)
+
+    def sampled(self):
+        rate = settings.REQUEST_METRICS_SAMPLE_RATE
+        return rate >= 1 or (rate > 0 and random.random() < rate)
+
+    def process_template_response(self, request, response):
+        # Template and DRF responses are rendered after the view returns.
+        metrics = _current.get()
+        if metrics is not None:
+            start = time.perf_counter()
+            response.add_post_render_callback(
+                lambda response: metrics.add_time('render', time.perf_counter() - start)
+            )
+        return response
+
+    def report(self, request, response, metrics):
+        metrics.finish(request, response)
+        response['Server-Timing'] = metrics.server_timing()
+        response.request_metrics = metrics
+        level = logging.WARNING if metrics.over_budget else logging.INFO
+        logger.log(level, json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'status': metrics.status,
+            **metrics.as_dict(),
+        }))
+        return response
@@ -0,0 +1,49 @@
+from functools import partial
+
+from django.db.backends.postgresql import base, creation
+
+from utils.pooled_postgresql.pool import close_all, get_pool
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    """
+    Closes the pooled connections of the alias before the test database is
+    created, and every pooled connection to it, test mirrors' included,
+    before it is dropped: PostgreSQL refuses to drop a database with open
+    connections, and closing the Django connection only returns it to the
+    pool.
+    """
+
+    def _create_test_db(self, verbosity, autoclobber, keepdb=False):
+        close_all(self.connection.alias)
+        return super()._create_test_db(verbosity, autoclobber, keepdb)
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        close_all(database=test_database_name)
+        return super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    The PostgreSQL backend, with connections borrowed from the pool of the
+    worker process (settings_dict['POOL']) instead of opened per request.
+    Closing the Django connection hands the psycopg2 one back to the pool.
+    """
+    creation_class = DatabaseCreation
+
+    @property
+    def pool(self):
+        return get_pool(self.alias, self.settings_dict)
+
+    def get_new_connection(self, conn_params):
+        # Released to the pool it came from, even if settings_dict changes.
+        self._pool = self.pool
+        connection = self._pool.acquire(partial(super().get_new_connection, conn_params))
+        # Set by the parent on new connections only.
+        self.isolation_level = self.settings_dict['OPTIONS'].get('isolation_level', connection.isolation_level)
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self._pool.release(self.connection)
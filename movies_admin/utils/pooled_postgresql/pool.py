@@ -0,0 +1,231 @@
+import os
+import threading
+import time
+
+import psycopg2
+from psycopg2 import extensions
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of psycopg2 connections for one database alias in one
+    process.
+
+    A connection is checked before it is handed out: closed ones, ones in a
+    transaction and ones older than max_age are replaced, and ones idle for
+    check_after seconds or more must answer SELECT 1 first. When max_size
+    connections are in use, acquire() waits up to timeout seconds.
+    """
+
+    def __init__(self, max_size, max_age=None, check_after=None, timeout=None):
+        self.max_size = max_size
+        self.max_age = max_age
+        self.check_after = check_after
+        self.timeout = timeout
+        self._condition = threading.Condition()
+        # (connection, released at), the most recently used last.
+        self._idle = []
+        self._opened_at = {}
+        self._size = 0
+        self._in_use = 0
+        # Set by close_all: released connections are closed, not kept.
+        self._retired = False
+        self._stats = {
+            'checkouts': 0,
+            'created': 0,
+            'closed': 0,
+            'failed_checks': 0,
+            'waits': 0,
+            'wait_seconds_total': 0.0,
+            'wait_seconds_max': 0.0,
+            'timeouts': 0,
+        }
+
+    def acquire(self, connect):
+        started = time.monotonic()
+        while True:
+            connection, released_at = self._checkout(started)
+            if connection is None:
+                return self._open(connect)
+            if self._is_healthy(connection, released_at):
+                return connection
+            with self._condition:
+                self._stats['failed_checks'] += 1
+            self._discard(connection)
+
+    def release(self, connection):
+        if not connection.closed and connection.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+            # Left in a transaction, e.g. by an error; never hand that on.
+            try:
+                connection.rollback()
+            except psycopg2.Error:
+                pass
+        if (
+            self._retired
+            or connection.closed
+            or connection.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE
+            or self._is_expired(connection)
+        ):
+            self._discard(connection)
+            return
+        with self._condition:
+            self._in_use -= 1
+            self._idle.append((connection, time.monotonic()))
+            self._condition.notify()
+
+    def stats(self):
+        with self._condition:
+            return dict(
+                self._stats,
+                max_size=self.max_size,
+                size=self._size,
+                in_use=self._in_use,
+                idle=len(self._idle),
+            )
+
+    def close(self):
+        with self._condition:
+            idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            with self._condition:
+                self._in_use += 1
+            self._discard(connection)
+
+    def _checkout(self, started):
+        # Returns an idle connection, or (None, None) when the caller may
+        # open a new one; its slot is already counted in _size.
+        with self._condition:
+            waited = False
+            while not self._idle and self._size >= self.max_size:
+                remaining = None if self.timeout is None else started + self.timeout - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise psycopg2.OperationalError(
+                        f'No pooled connection available within {self.timeout} s, {self.max_size} in use'
+                    )
+                waited = True
+                self._condition.wait(remaining)
+            if waited:
+                wait = time.monotonic() - started
+                self._stats['waits'] += 1
+                self._stats['wait_seconds_total'] += wait
+                self._stats['wait_seconds_max'] = max(self._stats['wait_seconds_max'], wait)
+            self._stats['checkouts'] += 1
+            self._in_use += 1
+            if self._idle:
+                return self._idle.pop()
+            self._size += 1
+            return None, None
+
+    def _open(self, connect):
+        try:
+            connection = connect()
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._in_use -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._opened_at[connection] = time.monotonic()
+            self._stats['created'] += 1
+        return connection
+
+    def _is_expired(self, connection):
+        return self.max_age is not None and time.monotonic() - self._opened_at[connection] >= self.max_age
+
+    def _is_healthy(self, connection, released_at):
+        if connection.closed or self._is_expired(connection):
+            return False
+        if connection.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+            return False
+        if self.check_after is not None and time.monotonic() - released_at >= self.check_after:
+            # The server or a proxy may have dropped it while it sat idle.
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+            except psycopg2.Error:
+                return False
+            # The ping opens a transaction unless the connection autocommits.
+            if connection.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+                connection.rollback()
+        return True
+
+    def _discard(self, connection):
+        try:
+            connection.close()
+        except psycopg2.Error:
+            pass
+        with self._condition:
+            self._opened_at.pop(connection, None)
+            self._size -= 1
+            self._in_use -= 1
+            self._stats['closed'] += 1
+            self._condition.notify()
+
+
+def pool_key(alias, settings_dict):
+    # The connection parameters are part of the key: when they change, e.g.
+    # when the test runner points NAME at the test database, connections to
+    # the old database are never handed out for the new one.
+    return (os.getpid(), alias, settings_dict['NAME'], settings_dict['HOST'], settings_dict['PORT'],
+            settings_dict['USER'])
+
+
+def get_pool(alias, settings_dict):
+    """
+    The pool of the alias and its connection parameters in the current
+    process. Pools are keyed by pid, so a worker forked by gunicorn or
+    uvicorn starts its own rather than share the sockets of its parent.
+    """
+    key = pool_key(alias, settings_dict)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                # Pools of the alias with older parameters are closed.
+                _retire([other for other in _pools if other[:2] == key[:2]])
+                options = settings_dict.get('POOL', {})
+                pool = _pools[key] = ConnectionPool(
+                    max_size=options.get('MAX_SIZE', 10),
+                    max_age=options.get('MAX_AGE'),
+                    check_after=options.get('CHECK_AFTER'),
+                    timeout=options.get('TIMEOUT'),
+                )
+    return pool
+
+
+def _retire(keys):
+    for key in keys:
+        pool = _pools.pop(key)
+        pool._retired = True
+        pool.close()
+
+
+def close_all(alias=None, database=None):
+    """
+    Closes the idle connections of the pools of this process, or of those
+    of one alias or connected to one database, and drops the pools.
+    Connections still in use are closed when they are released.
+    """
+    pid = os.getpid()
+    with _pools_lock:
+        _retire([key for key in _pools if key[0] == pid and alias in (None, key[1]) and database in (None, key[2])])
+
+
+def _current_pools():
+    pid = os.getpid()
+    return {key[1]: pool for key, pool in list(_pools.items()) if key[0] == pid}
+
+
+def pool_stats():
+    return {alias: pool.stats() for alias, pool in _current_pools().items()}
+
+
+def connections_in_use(alias):
+    pool = _current_pools().get(alias)
+    return 0 if pool is None else pool.stats()['in_use']
@@ -0,0 +1,155 @@
+import asyncio
+import itertools
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from movies.catalog import catalog_changed_at
+from utils.pooled_postgresql.pool import connections_in_use
+
+PIN_COOKIE = 'db_pin_primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+REPLICA_PREFIX = 'replica_'
+
+# Routing of the request being served, see ReplicaMiddleware.
+_current = ContextVar('replica_routing', default=None)
+_turn = itertools.count()
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias.startswith(REPLICA_PREFIX)]
+
+
+def choose_replica(aliases):
+    """
+    The replica with the fewest connections in use by this process. Ties,
+    e.g. without pools or in a worker that serves one request at a time,
+    go round-robin.
+    """
+    start = next(_turn) % len(aliases)
+    return min(aliases[start:] + aliases[:start], key=connections_in_use)
+
+
+def reads_from_replica(request):
+    # The API and admin changelists; change forms stay on the primary, they
+    # are read right before a write.
+    if request.method not in SAFE_METHODS:
+        return False
+    if request.path.startswith('/api/'):
+        return True
+    match = getattr(request, 'resolver_match', None)
+    return bool(match and match.url_name and match.url_name.endswith('_changelist'))
+
+
+class ReplicaRouting:
+    def __init__(self, request, pinned):
+        self.request = request
+        self.pinned = pinned
+        self.wrote = False
+        self.replica = None
+
+    def db_for_read(self):
+        if self.pinned or self.wrote or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        if not reads_from_replica(self.request):
+            return DEFAULT_DB_ALIAS
+        # One replica for the whole request, so its queries agree.
+        if self.replica is None:
+            self.replica = choose_replica(replica_aliases())
+        return self.replica
+
+
+class ReplicaRouter:
+    """
+    Sends the reads of API requests and admin changelists to the replica
+    databases (DB_REPLICA_HOSTS), everything else to the primary.
+
+    Reads stay on the primary in a transaction, after a write in the same
+    request, and for DB_REPLICA_PIN_SECONDS after the client wrote or the
+    catalog changed (see ReplicaMiddleware), so nobody reads a replica that
+    has not caught up with a write they depend on. Outside of requests,
+    e.g. in management commands, everything goes to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        routing = _current.get()
+        return None if routing is None else routing.db_for_read()
+
+    def db_for_write(self, model, **hints):
+        routing = _current.get()
+        if routing is not None:
+            routing.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db.startswith(REPLICA_PREFIX):
+            return False
+        return None
+
+
+class ReplicaMiddleware:
+    """
+    Sets up ReplicaRouter for each request. A request that writes gets a
+    cookie that keeps the reads of the client on the primary for
+    DB_REPLICA_PIN_SECONDS. Every client reads from the primary for as long
+    after a catalog change, so responses and reference titles cached under
+    the new catalog version are never read from a replica that lags.
+
+    Streaming responses read after the request returned, from the primary
+    unless they pick their database up front.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # Marks the instance as a coroutine function for Django's handler.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not replica_aliases():
+            return self.get_response(request)
+        routing = ReplicaRouting(request, self.pinned(request))
+        token = _current.set(routing)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.pin(response, routing)
+
+    async def __acall__(self, request):
+        if not replica_aliases():
+            return await self.get_response(request)
+        routing = ReplicaRouting(request, self.pinned(request))
+        token = _current.set(routing)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.pin(response, routing)
+
+    def pinned(self, request):
+        now = time.time()
+        try:
+            if float(request.COOKIES.get(PIN_COOKIE, 0)) > now:
+                return True
+        except ValueError:
+            pass
+        return now - catalog_changed_at() < settings.DB_REPLICA_PIN_SECONDS
+
+    def pin(self, response, routing):
+        if routing.wrote:
+            seconds = settings.DB_REPLICA_PIN_SECONDS
+            response.set_cookie(PIN_COOKIE, f'{time.time() + seconds:.3f}', max_age=max(1, round(seconds)),
+                                httponly=True, samesite='Lax')
+        return response
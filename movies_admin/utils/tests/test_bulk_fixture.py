@@ -0,0 +1,29 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from movies.models import FilmWork, Genre, Person, User
+
+SMALL = {'users': 2, 'genres': 3, 'persons': 10, 'film_works': 10, 'batch_size': 5}
+
+
+def add_bulk_fixtures(**options):
+    call_command('add_fixtures', bulk=True, stdout=StringIO(), **dict(SMALL, **options))
+
+
+class BulkFixtureTests(TestCase):
+    def test_empty_catalog(self):
+        add_bulk_fixtures()
+        self.assertEqual(Genre.objects.count(), 3)
+        self.assertEqual(Person.objects.count(), 10)
+        self.assertEqual(FilmWork.objects.count(), 10)
+
+    def test_existing_catalog(self):
+        Genre.objects.create(title='genre0')
+        users = User.objects.count()
+        with self.assertRaisesMessage(CommandError, 'movies_genre already have rows'):
+            add_bulk_fixtures(workers=2)
+        self.assertEqual(User.objects.count(), users)
+        self.assertEqual(Genre.objects.count(), 1)
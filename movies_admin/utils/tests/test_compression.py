@@ -0,0 +1,59 @@
+import gzip
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from utils.compression import CompressionMiddleware, accepted_encoding
+
+
+def request(accept_encoding):
+    return RequestFactory().get('/api/v1/movies/', HTTP_ACCEPT_ENCODING=accept_encoding)
+
+
+class AcceptedEncodingTests(SimpleTestCase):
+    def assertEncoding(self, accept_encoding, expected):
+        with self.subTest(accept_encoding=accept_encoding):
+            self.assertEqual(accepted_encoding(request(accept_encoding)), expected)
+
+    def test_preference(self):
+        self.assertEncoding('gzip, deflate, br', 'br')
+        self.assertEncoding('gzip', 'gzip')
+        self.assertEncoding('GZIP', 'gzip')
+        self.assertEncoding('deflate', None)
+        self.assertEncoding('', None)
+
+    def test_qvalues(self):
+        self.assertEncoding('br;q=0, gzip', 'gzip')
+        self.assertEncoding('br; q=0.000, gzip', 'gzip')
+        self.assertEncoding('br;q=0.5, gzip;q=0.8', 'gzip')
+        self.assertEncoding('br;q=1.0, gzip;q=1.0', 'br')
+        self.assertEncoding('br;q=0, gzip;q=0', None)
+        self.assertEncoding('br;q=high, gzip', 'gzip')
+        # Another coding named like one of ours is not it.
+        self.assertEncoding('x-gzip-br', None)
+
+    def test_wildcard(self):
+        self.assertEncoding('*', 'br')
+        self.assertEncoding('br;q=0, *', 'gzip')
+        self.assertEncoding('*;q=0.5, gzip', 'gzip')
+        self.assertEncoding('gzip;q=0, *;q=0', None)
+
+
+@override_settings(COMPRESSION_MIN_SIZE=0)
+class CompressionMiddlewareTests(SimpleTestCase):
+    content = b'{"results": []}' * 100
+
+    def respond(self, accept_encoding):
+        response = HttpResponse(self.content, content_type='application/json')
+        return CompressionMiddleware(lambda request: response)(request(accept_encoding))
+
+    def test_refused_encoding(self):
+        response = self.respond('br;q=0, gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), self.content)
+
+    def test_nothing_accepted(self):
+        response = self.respond('br;q=0, gzip;q=0')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content, self.content)
+        self.assertIn('Accept-Encoding', response['Vary'])
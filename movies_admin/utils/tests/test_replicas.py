@@ -0,0 +1,120 @@
+import uuid
+from contextlib import ExitStack
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
+from django.test import Client, RequestFactory, SimpleTestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import resolve
+
+from movies.models import FilmWork
+from utils.replicas import PIN_COOKIE, ReplicaRouting
+
+REPLICA = 'replica_1'
+ROUTERS = ['utils.replicas.ReplicaRouter']
+
+
+def routing_for(method, path):
+    request = getattr(RequestFactory(), method)(path)
+    request.resolver_match = resolve(path)
+    return ReplicaRouting(request, pinned=False)
+
+
+@override_settings(DATABASE_ROUTERS=ROUTERS)
+class ReplicaRoutingTests(SimpleTestCase):
+    databases = {DEFAULT_DB_ALIAS}
+
+    def test_api_read(self):
+        self.assertEqual(routing_for('get', '/api/v1/movies/').db_for_read(), REPLICA)
+
+    def test_admin_changelist(self):
+        self.assertEqual(routing_for('get', '/admin/movies/filmwork/').db_for_read(), REPLICA)
+
+    def test_admin_change_form(self):
+        routing = routing_for('get', f'/admin/movies/filmwork/{uuid.uuid4()}/change/')
+        self.assertEqual(routing.db_for_read(), DEFAULT_DB_ALIAS)
+
+    def test_admin_changelist_action(self):
+        self.assertEqual(routing_for('post', '/admin/movies/filmwork/').db_for_read(), DEFAULT_DB_ALIAS)
+
+    def test_read_in_a_transaction(self):
+        routing = routing_for('get', '/api/v1/movies/')
+        with transaction.atomic():
+            self.assertEqual(routing.db_for_read(), DEFAULT_DB_ALIAS)
+
+    def test_read_outside_a_request(self):
+        self.assertIn(router.db_for_read(FilmWork), (None, DEFAULT_DB_ALIAS))
+
+
+@override_settings(DATABASE_ROUTERS=ROUTERS)
+class ReplicaRequestTests(TransactionTestCase):
+    """
+    The queries of whole requests go to the replica or the primary. The
+    replica is the test database under another connection, so the rows
+    must be committed: it is never behind.
+    """
+    databases = {DEFAULT_DB_ALIAS, REPLICA}
+
+    def setUp(self):
+        self.film_work = FilmWork.objects.create(
+            title='Replica routing', type=FilmWork.FilmWorkType.movie,
+            age_qualification=FilmWork.AgeQualification.A, file_path='replicas.mp4',
+        )
+        self.user = get_user_model().objects.create_superuser('replicas', password=None)
+        # Forgets the catalog change of the rows above, which would keep
+        # every client on the primary.
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def request(self, client, method, path, **kwargs):
+        # The response and {alias: queries} of one request.
+        with ExitStack() as stack:
+            captured = {alias: stack.enter_context(CaptureQueriesContext(connections[alias]))
+                        for alias in self.databases}
+            response = getattr(client, method)(path, **kwargs)
+        return response, {alias: len(context.captured_queries) for alias, context in captured.items()
+                          if context.captured_queries}
+
+    def assertReads(self, alias, response, queries, status=200):
+        self.assertEqual(response.status_code, status)
+        self.assertEqual(list(queries), [alias], queries)
+
+    def test_api_reads(self):
+        for path in ('/api/v1/movies/?page=1', f'/api/v1/movies/{self.film_work.pk}/', '/api/v1/persons/',
+                     '/api/v1/changes/?after=0'):
+            with self.subTest(path=path):
+                self.assertReads(REPLICA, *self.request(Client(), 'get', path))
+
+    def test_admin_changelist(self):
+        client = Client()
+        client.force_login(self.user)
+        response, queries = self.request(client, 'get', '/admin/movies/filmwork/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(REPLICA, queries)
+
+    def test_admin_change_form(self):
+        client = Client()
+        client.force_login(self.user)
+        self.assertReads(DEFAULT_DB_ALIAS, *self.request(
+            client, 'get', f'/admin/movies/filmwork/{self.film_work.pk}/change/'))
+
+    def test_read_after_write(self):
+        writer = Client()
+        writer.force_login(self.user)
+        created = uuid.uuid4()
+        item = {'id': str(created), 'title': 'Written', 'type': FilmWork.FilmWorkType.movie,
+                'age_qualification': FilmWork.AgeQualification.A, 'file_path': 'written.mp4'}
+        response, queries = self.request(writer, 'post', '/api/v1/movies/bulk/', data=[item],
+                                         content_type='application/json')
+        self.assertReads(DEFAULT_DB_ALIAS, response, queries)
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+        # The writer reads its write, and every client reads from the
+        # primary right after a catalog change.
+        self.assertReads(DEFAULT_DB_ALIAS, *self.request(writer, 'get', f'/api/v1/movies/{created}/'))
+        self.assertReads(DEFAULT_DB_ALIAS, *self.request(Client(), 'get', '/api/v1/movies/?page=1'))
+
+        # Past the window, and past the responses cached by the reads above.
+        with override_settings(DB_REPLICA_PIN_SECONDS=0):
+            self.assertReads(REPLICA, *self.request(Client(), 'get', f'/api/v1/movies/{created}/?check=window'))